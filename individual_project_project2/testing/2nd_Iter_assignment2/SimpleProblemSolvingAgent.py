@@ -1,33 +1,52 @@
 import math
 import random
+from itertools import count
 from math import exp
 from heapq import heappush, heappop
 
+INF = float("inf")
+
 class Graph:
     """Simple undirected, weighted graph."""
     def __init__(self, edges):
         self.edges = edges
+        # state -> {neighbor: cost}, so cost() is a dict lookup instead of a scan
+        self._cost = {a: dict(nbrs) for a, nbrs in edges.items()}
 
     def neighbors(self, state):
         return [n for n, _ in self.edges.get(state, [])]
 
     def cost(self, a, b):
-        for nbr, c in self.edges.get(a, []):
-            if nbr == b:
-                return c
-        raise KeyError(f"No edge {a} → {b}")
+        try:
+            return self._cost[a][b]
+        except KeyError:
+            raise KeyError(f"No edge {a} → {b}") from None
+
+class Problem:
+    """
+    Base of the problems the searches below run on: an initial state, a goal
+    test and a heuristic h(state).  Subclasses add successors(state), which
+    yields (state, step cost) pairs.
+    """
+    def __init__(self, initial, goal):
+        self.initial = initial
+        self.goal = goal
+
+    def goal_test(self, state):
+        return state == self.goal
 
-class RomaniaProblem:
+    def h(self, state):
+        return 0
+
+class RomaniaProblem(Problem):
     """Search problem on the Romania map."""
     def __init__(self, initial, goal, graph, coord):
-        self.initial = initial
-        self.goal = goal
+        super().__init__(initial, goal)
         self.graph = graph
         self.coord = coord
 
     def successors(self, state):
-        for nbr, c in self.graph.edges.get(state, []):
-            yield nbr, c
+        return self.graph.edges.get(state, [])
 
     def h(self, state):
         x1, y1 = self.coord[state]
@@ -35,15 +54,13 @@ class RomaniaProblem:
         return math.hypot(x2 - x1, y2 - y1)
 
 class Node:
+    __slots__ = ("state", "parent", "path_cost")
+
     def __init__(self, state, parent=None, path_cost=0):
         self.state = state
         self.parent = parent
         self.path_cost = path_cost
 
-    def expand(self, problem):
-        for s2, cost in problem.successors(self.state):
-            yield Node(s2, self, self.path_cost + cost)
-
     def solution_path(self):
         node, path = self, []
         while node:
@@ -57,40 +74,60 @@ def exp_schedule(k=20, lam=0.005, limit=1000):
     return schedule
 
 def best_first_graph_search(problem, f):
-    frontier = []
-    entry_finder = {}
+    """
+    Shared core of greedy, uniform-cost, A* and weighted A*: always expand the
+    frontier node with the lowest f(node).
+
+    Frontier entries are (f, path_cost, counter, node), so ties never compare
+    Nodes and a cheaper re-push of a state is popped before the older entry.
+    A Node is only created for a successor that actually goes on the frontier,
+    and entries whose state was expanded in the meantime are skipped.
+    """
+    counter = count()
     start = Node(problem.initial, path_cost=0)
-    heappush(frontier, (f(start), start))
-    entry_finder[start.state] = start.path_cost
+    frontier = [(f(start), 0, next(counter), start)]
+    best_cost = {start.state: 0}
     explored = set()
     while frontier:
-        _, node = heappop(frontier)
-        if node.state == problem.goal:
+        _, _, _, node = heappop(frontier)
+        state = node.state
+        if state in explored:
+            continue
+        if problem.goal_test(state):
             return node
-        explored.add(node.state)
-        for child in node.expand(problem):
-            if (child.state not in explored and
-                (child.state not in entry_finder or child.path_cost < entry_finder[child.state])):
-                entry_finder[child.state] = child.path_cost
-                heappush(frontier, (f(child), child))
+        explored.add(state)
+        for s2, step in problem.successors(state):
+            cost = node.path_cost + step
+            if s2 not in explored and cost < best_cost.get(s2, INF):
+                best_cost[s2] = cost
+                child = Node(s2, node, cost)
+                heappush(frontier, (f(child), cost, next(counter), child))
     return None
 
 def greedy_best_first_search(problem):
     return best_first_graph_search(problem, lambda n: problem.h(n.state))
 
+def uniform_cost_search(problem):
+    return best_first_graph_search(problem, lambda n: n.path_cost)
+
 def astar_search(problem):
     return best_first_graph_search(problem, lambda n: n.path_cost + problem.h(n.state))
 
+def weighted_astar_search(problem, weight=1.5):
+    """A* with f = g + weight * h: faster, and at most 'weight' times the optimal cost."""
+    return best_first_graph_search(problem, lambda n: n.path_cost + weight * problem.h(n.state))
+
 def hill_climbing(problem):
+    # Neighbours are compared as states; a Node is only built for the move taken
     current = Node(problem.initial)
     while True:
-        neighbors = list(current.expand(problem))
+        neighbors = list(problem.successors(current.state))
         if not neighbors:
             return current
-        best = min(neighbors, key=lambda n: problem.h(n.state))
-        if problem.h(best.state) >= problem.h(current.state):
+        state, step = min(neighbors, key=lambda n: problem.h(n[0]))
+        if problem.h(state) >= problem.h(current.state):
             return current
-        current = best
+        current = Node(state, current, current.path_cost + step)
 
 def simulated_annealing(problem, schedule=exp_schedule()):
     current = Node(problem.initial)
@@ -98,13 +135,13 @@ def simulated_annealing(problem, schedule=exp_schedule()):
         T = schedule(t)
         if T == 0:
             return current
-        neighbors = list(current.expand(problem))
+        neighbors = list(problem.successors(current.state))
         if not neighbors:
             return current
-        next_choice = random.choice(neighbors)
-        delta_e = problem.h(current.state) - problem.h(next_choice.state)
+        state, step = random.choice(neighbors)
+        delta_e = problem.h(current.state) - problem.h(state)
         if delta_e > 0 or random.random() < math.exp(delta_e / T):
-            current = next_choice
+            current = Node(state, current, current.path_cost + step)
     return current
 
 class SimpleProblemSolvingAgent:
@@ -150,6 +187,12 @@ class SimpleProblemSolvingAgent:
     def run_astar(self):
         return astar_search(self.problem)
 
+    def run_uniform_cost(self):
+        return uniform_cost_search(self.problem)
+
+    def run_weighted_astar(self, weight=1.5):
+        return weighted_astar_search(self.problem, weight)
+
     def run_hill_climbing(self):
         return hill_climbing(self.problem)
 
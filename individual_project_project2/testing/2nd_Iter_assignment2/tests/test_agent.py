@@ -8,6 +8,8 @@ def agent():
 @pytest.mark.parametrize("method,expected_cost", [
     ("run_greedy", 450),
     ("run_astar", 418),
+    ("run_uniform_cost", 418),
+    ("run_weighted_astar", 450),
     ("run_hill_climbing", 450),
 ])
 def test_search_cost(agent, method, expected_cost):
@@ -21,3 +23,14 @@ def test_solution_path(agent):
         assert isinstance(path, list)
         assert path[0] == "Arad"
         assert path[-1] == "Bucharest"
+
+def test_weighted_astar_bound():
+    agent = SimpleProblemSolvingAgent("Timisoara", "Neamt")
+    optimal = agent.run_uniform_cost().path_cost
+    for weight in (1.0, 2.0, 5.0):
+        assert agent.run_weighted_astar(weight).path_cost <= weight * optimal
+
+def test_graph_cost_lookup(agent):
+    assert agent.graph.cost("Arad", "Sibiu") == 140
+    with pytest.raises(KeyError):
+        agent.graph.cost("Arad", "Bucharest")
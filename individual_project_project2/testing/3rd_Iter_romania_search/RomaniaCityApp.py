@@ -1,11 +1,167 @@
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+
+from batch_queries import check_algorithms, unknown_cities
 from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
 
+# Algorithms run by the batch mode when none are given
+BATCH_ALGORITHMS = ("greedy_best_first_search", "astar_search", "hill_climbing", "simulated_annealing")
+
+
+def read_pairs(lines, fmt: str = "auto", errors=None):
+    """
+    Lazily parse origin/destination pairs from an iterable of text lines.
+
+    Each line is either CSV ("Arad,Bucharest"; a "start,goal" header is skipped)
+    or JSONL ({"start": "Arad", "goal": "Bucharest"}); with fmt="auto" the format
+    is decided per line.  Blank lines are ignored.
+
+    Args:
+        lines: iterable of str (e.g. an open file or sys.stdin).
+        fmt: "csv", "jsonl" or "auto".
+        errors: optional callback(line_number, message) for malformed lines,
+            which are skipped.
+
+    Yields:
+        (line_number, start, goal)
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if fmt == "jsonl" or (fmt == "auto" and line.startswith("{")):
+                record = json.loads(line)
+                start, goal = record["start"], record["goal"]
+            else:
+                row = next(csv.reader([line]))
+                if len(row) != 2:
+                    raise ValueError(f"expected 2 columns, got {len(row)}")
+                start, goal = (field.strip() for field in row)
+                if (start.lower(), goal.lower()) == ("start", "goal"):
+                    continue  # header
+        except (ValueError, KeyError, TypeError) as exc:
+            if errors is not None:
+                errors(number, f"malformed line: {exc}")
+            continue
+        yield number, start, goal
+
+
+def run_batch(agent, lines, out, algorithms=BATCH_ALGORITHMS, fmt="auto", workers=1, batch_size=1024):
+    """
+    Solve a stream of OD pairs and write one JSON line per (pair, algorithm) as results arrive.
+
+    Result lines hold start, goal, algorithm, path, cost (null if unreachable) and ms,
+    the search time; malformed lines and unknown cities produce {"line", "error"} records,
+    and pairs the search reports an error for produce {"start", "goal", "algorithm", "error"}.
+    Input is consumed lazily and at most a few batches are in flight, so memory stays
+    bounded however long the stream is.
+
+    Returns:
+        dict with the number of results and errors and the wall time.
+    """
+    counts = {"results": 0, "errors": 0}
+
+    def write(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()  # downstream pipeline stages see every result immediately
+
+    def error(number, message):
+        counts["errors"] += 1
+        write({"line": number, "error": message})
+
+    def valid_pairs():
+        index = agent.compiled.index
+        for number, start, goal in read_pairs(lines, fmt, error):
+            message = unknown_cities(index, start, goal)
+            if message:
+                error(number, message)
+            else:
+                yield start, goal
+
+    began = time.perf_counter()
+    for result in agent.solve_many(valid_pairs(), algorithms, workers=workers, batch_size=batch_size):
+        if result.error is not None:
+            counts["errors"] += 1
+            write({"start": result.start, "goal": result.goal, "algorithm": result.algorithm, "error": result.error})
+            continue
+        record = {
+            "start": result.start,
+            "goal": result.goal,
+            "algorithm": result.algorithm,
+            "path": list(result.path),
+            "cost": None if result.cost == math.inf else result.cost,
+            "ms": round(result.elapsed * 1000.0, 4),
+        }
+        write(record)
+        counts["results"] += 1
+    counts["seconds"] = time.perf_counter() - began
+    return counts
+
 
-def main():
+def batch_main(argv):
+    """
+    Entry point of the non-interactive mode (see --help).
+
+    Returns:
+        exit status: 0, or 1 if any input line was rejected.
+    """
+    parser = argparse.ArgumentParser(
+        prog="RomaniaCityApp.py",
+        description="Solve origin/destination pairs from CSV or JSONL and stream JSONL results.",
+    )
+    parser.add_argument("--batch", action="store_true", help="run in batch mode instead of interactively")
+    parser.add_argument("-i", "--input", default="-", help="input file, '-' for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--format", choices=("auto", "csv", "jsonl"), default="auto", help="input format")
+    parser.add_argument(
+        "-a", "--algorithms", nargs="+", default=list(BATCH_ALGORITHMS),
+        help="agent search methods to run, or 'dijkstra' for shared shortest-path trees",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--batch-size", type=int, default=1024, help="pairs grouped by origin at a time")
+    parser.add_argument("--snapshot", help="search a CompiledGraph snapshot directory instead of Romania")
+    args = parser.parse_args(argv)
+    if not args.batch:
+        parser.error("command-line arguments are only accepted with --batch")
+    try:
+        check_algorithms(args.algorithms)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    agent = (
+        SimpleProblemSolvingAgent.from_snapshot(args.snapshot) if args.snapshot else SimpleProblemSolvingAgent()
+    )
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        counts = run_batch(agent, source, sink, args.algorithms, args.format, args.workers, args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(
+        f"{counts['results']} results, {counts['errors']} errors in {counts['seconds']:.3f}s",
+        file=sys.stderr,
+    )
+    return 1 if counts["errors"] else 0
+
+
+def main(argv=None):
     """
     Interactive CLI for finding paths between Romanian cities using
     multiple search algorithms.
+
+    With --batch the non-interactive batch mode runs instead, see batch_main();
+    any other command-line arguments are rejected.
     """
+    if argv:
+        return batch_main(argv)
     agent = SimpleProblemSolvingAgent()
     cities = sorted(agent.graph.keys())
     print("Here are all the possible Romania cities that can be traveled:")
@@ -57,4 +213,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main(sys.argv[1:]))
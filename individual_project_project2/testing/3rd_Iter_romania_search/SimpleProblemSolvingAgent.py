@@ -3,13 +3,30 @@ SimpleProblemSolvingAgent module implementing multiple search algorithms
 for finding shortest or heuristic paths on the Romania road map.
 """
 
+import collections
+import functools
+import logging
 import math
 import random
 
-# For the Greedy Best-First Search and A* Search, the PriorityQueue module gave a very efficient "box"
-# to store by priority (auto-sorting), not by index. This module also offer a safe thread producer-consumer
-# model to parallelize an extend this application.
-from queue import PriorityQueue  #
+import numpy as np
+
+import annealing
+import anytime
+import batch_queries
+import k_shortest
+from compiled_graph import CompiledGraph, CoordinateView, RoadMapView
+from contraction import ContractionHierarchy
+from distance_matrix import cached_matrix, distance_table, euclidean_matrix, road_distance_matrix
+from heuristics import LandmarkTable, euclidean_table, straight_line_scale
+from incremental import LPAStar
+from instrumentation import SearchTracer, TracedEngine, traced_query
+from local_search import PathState
+from route_cache import RouteCache, cached_search
+
+# Greedy Best-First Search and A* run on a parent-pointer engine: a lock-free heapq frontier,
+# g-costs and parents in flat arrays, and a single path rebuild at the goal.
+from search_engine import SearchEngine, shortest_path_tree, tree_path
 
 # -----------------------------------------------------------------------------
 # DATA DEFINITIONS
@@ -72,6 +89,17 @@ CITY_COORDINATES = {
     "Zerind": (108, 531),
 }
 
+# Number of (start, goal) LPA* planners an agent keeps for incremental_search
+MAX_PLANNERS = 16
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _default_compiled_graph() -> CompiledGraph:
+    """The Romania map compiled once per process and shared by every default agent."""
+    return CompiledGraph.from_road_map(ROMANIA_ROAD_MAP, CITY_COORDINATES)
+
 
 class SimpleProblemSolvingAgent:
     """
@@ -80,14 +108,52 @@ class SimpleProblemSolvingAgent:
       2. A* Search
       3. Hill Climbing
       4. Simulated Annealing
+
+    The searches run on a CompiledGraph (integer node ids, CSR adjacency arrays);
+    the public methods accept and return city names and translate at the boundary.
     """
 
-    def __init__(self):
+    def __init__(self, road_map: dict = None, coordinates: dict = None, compiled: CompiledGraph = None):
         """
         Initialize the graph structure and heuristic locations.
+
+        Args:
+            road_map: nested {city: {neighbor: distance}} map (default: Romania).
+            coordinates: {city: (x, y)} used by the heuristic (default: Romania).
+            compiled: an already compiled graph (e.g. from graph_io); when given,
+                road_map and coordinates are ignored and read-only views of the
+                compiled graph stand in for them.
+        """
+        if compiled is not None:
+            self.compiled = compiled
+            self.graph = RoadMapView(compiled)
+            self.locations = CoordinateView(compiled)
+        else:
+            self.graph = ROMANIA_ROAD_MAP if road_map is None else road_map  # road network
+            self.locations = CITY_COORDINATES if coordinates is None else coordinates  # for heuristic computation
+            # Integer-indexed copy of the map that all search methods run against
+            if road_map is None and coordinates is None:
+                self.compiled = _default_compiled_graph()
+            else:
+                self.compiled = CompiledGraph.from_road_map(self.graph, self.locations)
+        self.engine = SearchEngine(self.compiled)  # reusable g-cost / parent arrays
+        self.landmarks = None  # optional ALT LandmarkTable used by astar_search
+        self._heuristic_scale = None  # straight_line_scale of the map, computed on first use
+        self.hierarchy = None  # ContractionHierarchy used by ch_search
+        self.cache = None  # optional RouteCache in front of the search methods
+        self.planners = collections.OrderedDict()  # (start, goal) ids -> LPAStar, most recent last
+        self._owns_compiled = False  # True once update_edge has made a private copy of the graph
+        self.tracer = None  # optional SearchTracer recording every search call
+
+    @classmethod
+    def from_snapshot(cls, directory, mmap: bool = True):
         """
-        self.graph = ROMANIA_ROAD_MAP  # road network
-        self.locations = CITY_COORDINATES  # for heuristic computation
+        Build an agent on a graph snapshot written by CompiledGraph.save().
+
+        With mmap=True the arrays are memory-mapped read-only, so start-up does not
+        read the edge data and processes on one host share the same pages.
+        """
+        return cls(compiled=CompiledGraph.load(directory, mmap=mmap))
 
     # The SimpleProblemSolvingAgent class's heuristic method calculates the straight-line
     # distance between two cities or points. The heuristic method is employed by the Greedy Best-First and A* searches.
@@ -104,14 +170,146 @@ class SimpleProblemSolvingAgent:
         Returns:
             Euclidean distance used as heuristic estimate.
         """
-        x1, y1 = self.locations[node]  # Setting the coordinates for the current city
-        x2, y2 = self.locations[goal]  # Setting the coordinates for the target city
-        return math.hypot(x2 - x1, y2 - y1)  # Euclidean formula
+        index = self.compiled.index
+        return self._heuristic_id(index[node], index[goal])
+
+    def _heuristic_id(self, u: int, goal: int) -> float:
+        """Straight-line distance between two node ids."""
+        xs, ys = self.compiled.xs, self.compiled.ys
+        return math.hypot(xs[goal] - xs[u], ys[goal] - ys[u])  # Euclidean formula
+
+    def _ids(self, start: str, goal: str):
+        """Translate a (start, goal) pair of city names to node ids."""
+        index = self.compiled.index
+        return index[start], index[goal]
+
+    # Road lengths change (closures, traffic). update_edge changes the compiled graph in place,
+    # after copying it if it is shared (the default Romania graph, a memory-mapped snapshot),
+    # and drops everything derived from the old lengths. The LPA* planners kept by
+    # incremental_search are told which edge changed and only repair the affected part.
+    def update_edge(self, a: str, b: str, cost):
+        """
+        Change the length of the road between two cities, in both directions.
 
-    # Greedy Best-First Search begins at a node, and we use a PriorityQueue, keyed by heuristic
+        The map stays undirected: the bidirectional and CH searches, the ALT bounds and
+        the cache entries shared by A -> B and B -> A queries all rely on it.
+
+        Args:
+            a, b: city names joined by a road.
+            cost: new length; math.inf closes the road.
+
+        Raises:
+            KeyError: if there is no road between the cities.
+            ValueError: for a negative length.
+        """
+        u, v = self._ids(a, b)
+        edges = [(u, v), (v, u)]
+        for x, y in edges:
+            if (x, y) not in self.compiled.edge_index:
+                raise KeyError(f"No edge {self.compiled.names[x]} → {self.compiled.names[y]}")
+        if not cost >= 0:
+            raise ValueError(f"Edge length must be non-negative, got {cost}")
+        if not self._owns_compiled:
+            self._use_private_graph()
+        decreased = False
+        for x, y in edges:
+            old = self.compiled.set_edge_weight(x, y, cost)
+            decreased = decreased or cost < old
+            for planner in self.planners.values():
+                planner.edge_changed(x, y)
+        # Shortcut lengths are stale; landmark bounds only stay admissible if roads got longer
+        self.hierarchy = None
+        if decreased:
+            self.landmarks = None
+            straight = self._heuristic_id(u, v)
+            if self._heuristic_scale is not None and cost < self._heuristic_scale * straight:
+                # A road shorter than the straight line: scale the Euclidean heuristic down
+                # so that it stays admissible, and restart the planners built on the old one
+                self._heuristic_scale = cost / straight
+                self.planners.clear()
+
+    def _use_private_graph(self):
+        """Switch to a copy of the compiled graph with writable weights of our own."""
+        self.compiled = self.compiled.copy()
+        self.compiled.version += 1
+        self.graph = RoadMapView(self.compiled)  # the dict map no longer has the current lengths
+        self.engine = TracedEngine(self.compiled, self.tracer) if self.tracer is not None else SearchEngine(self.compiled)
+        for planner in self.planners.values():
+            planner.graph = self.compiled
+        self._owns_compiled = True
+
+    # Lifelong Planning A*: the search state of recent (start, goal) pairs is kept in the agent,
+    # so asking again after update_edge only re-expands the nodes whose costs changed.
+    @cached_search(symmetric=True)
+    def incremental_search(self, start: str, goal: str):
+        """
+        Shortest path with LPA*, reusing this pair's previous search after edge updates.
+
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        planner = self.planners.get((s, g))
+        if planner is None:
+            planner = LPAStar(self.compiled, s, g, self._euclidean_table(g).tolist().__getitem__)
+            self.planners[(s, g)] = planner
+            while len(self.planners) > MAX_PLANNERS:
+                self.planners.popitem(last=False)
+        else:
+            self.planners.move_to_end((s, g))
+        path, cost = planner.compute_shortest_path(self.engine)
+        self.engine.stats = planner.stats
+        return self.compiled.path_names(path), cost
+
+    # Popular city pairs are asked for again and again; a bounded LRU cache in front of the
+    # search methods answers repeats without searching. Entries are dropped automatically
+    # when the compiled graph's version stamp changes.
+    def enable_cache(self, maxsize: int = 1024, ttl: float = None):
+        """
+        Put a RouteCache in front of every search method.
+
+        Args:
+            maxsize: maximum number of cached results.
+            ttl: optional lifetime of an entry in seconds.
+
+        Returns:
+            the RouteCache (see its stats() for hit/miss/eviction counters).
+        """
+        self.cache = RouteCache(maxsize, ttl)
+        return self.cache
+
+    def disable_cache(self):
+        """Remove the route cache; searches run uncached again."""
+        self.cache = None
+
+    # Tracing records counters (expansions, pushes/pops, heuristic evaluations, re-openings)
+    # and per-phase wall time for every query. While it is off the plain engine runs, so
+    # untraced searches pay nothing for it.
+    def enable_tracing(self, tracer: SearchTracer = None, **options):
+        """
+        Record a QueryTrace for every search call.
+
+        Args:
+            tracer: SearchTracer to record into (default: a new one built from 'options').
+            options: SearchTracer arguments (record_events, on_expand, on_push, on_pop, ...).
+
+        Returns:
+            the SearchTracer (export with save_json() or save_chrome_trace()).
+        """
+        self.tracer = tracer if tracer is not None else SearchTracer(**options)
+        self.engine = TracedEngine(self.compiled, self.tracer)
+        return self.tracer
+
+    def disable_tracing(self):
+        """Stop tracing and go back to the uninstrumented search engine."""
+        self.tracer = None
+        self.engine = SearchEngine(self.compiled)
+
+    # Greedy Best-First Search begins at a node, and we use a heapq frontier, keyed by heuristic
     # distance to the goal, as the priority queue, and tracks visited nodes. It repeatedly extends
     # the node with the smallest heuristic, enqueues unvisited neighbors with their heuristic values,
     # and stops when the goal is found or the queue becomes empty. Fast but ignores path cost.
+    @cached_search(symmetric=False)
     def greedy_best_first_search(self, start: str, goal: str):
         """
         Perform Greedy Best-First Search: expand the node with
@@ -120,34 +318,20 @@ class SimpleProblemSolvingAgent:
         Returns:
             (path_list, total_cost)
         """
-        frontier = PriorityQueue()  # Small heap order by priority
-        # Priority = heuristic estimate; store (priority, path_so_far)
-        frontier.put((self.heuristic(start, goal), [start]))  # Setting start
-        explored = set()  # Visited set
-
-        while not frontier.empty():  # Until no nodes are left
-            _, path = frontier.get()  # get path with best heuristics value
-            node = path[-1]  # current city
-            # Testing the Goal
-            if node == goal:
-                return path, self.calculate_path_cost(path)
-            if node in explored:  # skip if already visited
-                continue
-            explored.add(node)  # mark it visited or explored
-
-            # Add all unvisited neighbors to frontier
-            for neighbor in self.graph[node]:
-                if neighbor not in explored:
-                    new_path = path + [neighbor]
-                    h_val = self.heuristic(neighbor, goal)
-                    frontier.put((h_val, new_path))
-
-        return [], float("inf")  # No path found
+        s, g = self._ids(start, goal)
+        path, cost = self._greedy_ids(s, g)
+        return self.compiled.path_names(path), cost
+
+    def _greedy_ids(self, s: int, g: int):
+        """Greedy Best-First Search over node ids; returns (list of ids, cost) or ([], inf)."""
+        h = euclidean_table(self.compiled, g).tolist()
+        return self.engine.greedy(s, g, h.__getitem__)
 
     # The A* Search algorithm sets up a priority queue with the start node scored by
     # f = g + h (with g = 0, h = heuristic). It tracks the best g-scores, repeatedly
     # extends the lowest f-score node, skips revisited nodes at a higher cost,
     # and enqueues neighbors with updated f-scores. It stops when it finds the goal.
+    @cached_search(symmetric=True)
     def astar_search(self, start: str, goal: str):
         """
         Perform A* Search: combine path cost so far and heuristic.
@@ -156,36 +340,236 @@ class SimpleProblemSolvingAgent:
             (path_list, total_cost)
             A* Search: f(n)=g(n)+h(n). Returns shortest-cost path.
         """
-        # priority queue for f [total cheapest solution cost, estimated]= g [cost so far] + h [heuristic estimate]
-        frontier = PriorityQueue()
-        # Priority = g + h; queue items: (priority, g_cost, path)
-        frontier.put((self.heuristic(start, goal), 0, [start]))
-        explored_costs = {}  # place holder for best g-costs seen so far
+        s, g = self._ids(start, goal)
+        path, cost = self._astar_ids(s, g)
+        return self.compiled.path_names(path), cost
+
+    def _astar_ids(self, s: int, g: int):
+        """A* over node ids; returns (list of ids, cost) or ([], inf)."""
+        return self.engine.astar(s, g, self._astar_heuristic_table(g).__getitem__)
+
+    # Weighted A* inflates the heuristic (f = g + w*h): it expands far fewer nodes and the
+    # answer costs at most w times the optimum. ARA* runs weighted A* with a falling w and
+    # repairs the previous search each time, so it has a usable answer early and improves
+    # it until the optimum is proven or the time/expansion budget is spent.
+    @cached_search(symmetric=False)
+    def weighted_astar_search(self, start: str, goal: str, weight: float = 1.5):
+        """
+        Weighted A* Search: f(n)=g(n)+weight*h(n).
+
+        Returns:
+            (path_list, total_cost), with total_cost <= weight * optimal cost.
+        """
+        if weight < 1:
+            raise ValueError("weight must be >= 1")
+        s, g = self._ids(start, goal)
+        path, cost = self.engine.best_first(s, g, self._astar_heuristic_table(g).__getitem__, weight)
+        return self.compiled.path_names(path), cost
+
+    def anytime_astar(
+        self,
+        start: str,
+        goal: str,
+        weights=anytime.DEFAULT_WEIGHTS,
+        time_budget: float = None,
+        expansion_budget: int = None,
+    ):
+        """
+        Anytime Repairing A* (ARA*): an improving sequence of solutions.
+
+        Args:
+            weights: decreasing heuristic inflation factors, ending in 1 for an optimal result.
+            time_budget: optional limit in seconds.
+            expansion_budget: optional limit on node expansions.
+
+        Yields:
+            AnytimeSolution(path, cost, bound, weight, expanded, elapsed) with a city-name path;
+            'bound' is the proven suboptimality factor (1.0 = optimal).
+        """
+        s, g = self._ids(start, goal)
+        h = self.engine.watch_heuristic(self._astar_heuristic_table(g).__getitem__)
+        solutions = anytime.anytime_astar(
+            self.compiled, s, g, h, weights, time_budget, expansion_budget, hooks=self.engine
+        )
+        for solution in solutions:
+            yield solution._replace(path=self.compiled.path_names(solution.path))
+
+    @traced_query
+    def anytime_astar_search(
+        self,
+        start: str,
+        goal: str,
+        weights=anytime.DEFAULT_WEIGHTS,
+        time_budget: float = None,
+        expansion_budget: int = None,
+    ):
+        """
+        Best answer ARA* finds within the budget (see anytime_astar).
+
+        Returns:
+            (path_list, total_cost), or ([], inf) if no path was found in time.
+        """
+        path, cost = [], math.inf
+        for solution in self.anytime_astar(start, goal, weights, time_budget, expansion_budget):
+            path, cost = solution.path, solution.cost
+        return path, cost
+
+    # Alternative routes: Yen's algorithm derives every further path from the previous ones
+    # by re-routing around one of their edges; all those spur searches reuse a single
+    # shortest-path tree grown from the goal, both as exact heuristic and as ready-made path.
+    @traced_query
+    def k_shortest_paths(self, start: str, goal: str, k: int = 3):
+        """
+        The k cheapest loopless routes between two cities.
+
+        Args:
+            k: number of alternatives wanted.
+
+        Returns:
+            list of (path_list, total_cost), cheapest first (fewer than k if the
+            map has fewer loopless routes).
+        """
+        s, g = self._ids(start, goal)
+        names = self.compiled.path_names
+        routes = k_shortest.k_shortest_paths(self.compiled, s, g, k, hooks=self.engine)
+        return [(names(path), cost) for path, cost in routes]
+
+    # Uniform-cost search is A* without a heuristic: it runs on the same best-first loop
+    # and is the reference for maps where the straight-line distance is not a valid bound.
+    @cached_search(symmetric=True)
+    def uniform_cost_search(self, start: str, goal: str):
+        """
+        Uniform-cost search: expand the cheapest path so far, f(n)=g(n).
+
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        path, cost = self.engine.uniform_cost(s, g)
+        return self.compiled.path_names(path), cost
+
+    def _euclidean_table(self, g: int) -> np.ndarray:
+        """
+        Straight-line distances to 'g', scaled down when some road is shorter than
+        the line between its ends, so that A* and LPA* can rely on them.
+        """
+        if self._heuristic_scale is None:
+            self._heuristic_scale = straight_line_scale(self.compiled)
+        h = euclidean_table(self.compiled, g)
+        return h if self._heuristic_scale >= 1 else h * self._heuristic_scale
+
+    def _astar_heuristic_table(self, g: int) -> list:
+        """
+        Per-goal heuristic vector for A*, computed once when the query starts:
+        the straight-line distance, tightened by the ALT bound when landmarks are loaded.
+        """
+        h = self._euclidean_table(g)
+        if self.landmarks is not None:
+            h = np.maximum(h, self.landmarks.lower_bounds(g))
+        return h.tolist()
+
+    # Bidirectional searches grow one tree from the start and one from the goal and stop
+    # once the two frontiers prove that no path through an unexplored node can beat the best
+    # meeting point found so far. On road maps this roughly halves the number of expansions.
+    @cached_search(symmetric=True)
+    def bidirectional_dijkstra(self, start: str, goal: str):
+        """
+        Bidirectional Dijkstra: optimal path without a heuristic.
+
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        path, cost = self.engine.bidirectional(s, g)
+        return self.compiled.path_names(path), cost
 
-        while not frontier.empty():
-            f, cost_so_far, path = frontier.get()
-            node = path[-1]  # current node
-            # Testing the Goal
-            if node == goal:  # Goal found
-                return path, cost_so_far
+    @cached_search(symmetric=True)
+    def bidirectional_astar(self, start: str, goal: str):
+        """
+        Bidirectional A* with the average potential (h_goal(v) - h_start(v)) / 2,
+        using the same heuristic tables as astar_search (straight line, plus ALT when loaded).
 
-            # Skip if we have seen a cheaper path already
-            if node in explored_costs and explored_costs[node] <= cost_so_far:
-                continue
-            explored_costs[node] = cost_so_far
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        to_goal = self._astar_heuristic_table(g)
+        to_start = self._astar_heuristic_table(s)
+        potential = [(a - b) / 2 for a, b in zip(to_goal, to_start)]
+        path, cost = self.engine.bidirectional(s, g, potential.__getitem__)
+        return self.compiled.path_names(path), cost
+
+    # Contraction Hierarchies trade a one-time preprocessing pass (node ordering and shortcut
+    # insertion) for queries that only search "upwards" in the hierarchy from both ends, which
+    # settles a handful of nodes even on very large maps.
+    @cached_search(symmetric=True)
+    def ch_search(self, start: str, goal: str):
+        """
+        Shortest path using the Contraction Hierarchy (built on first use if none is loaded).
+
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        if self.hierarchy is None:
+            self.build_hierarchy()
+        path, cost = self.hierarchy.query(s, g)
+        self.engine.stats = self.hierarchy.stats
+        return self.compiled.path_names(path), cost
+
+    def build_hierarchy(self, path=None):
+        """
+        Contract the road map and use the result in ch_search.
 
-            # Extend with path-cost + heuristic
-            for neighbor, step_cost in self.graph[node].items():
-                new_cost = cost_so_far + step_cost
-                priority = new_cost + self.heuristic(neighbor, goal)
-                frontier.put((priority, new_cost, path + [neighbor]))
+        Args:
+            path: optional .npz file to serialize the hierarchy to.
+
+        Returns:
+            the ContractionHierarchy now used by the agent.
+        """
+        self.hierarchy = ContractionHierarchy.build(self.compiled)
+        if path is not None:
+            self.hierarchy.save(path)
+        return self.hierarchy
+
+    def load_hierarchy(self, path):
+        """Load a hierarchy written by build_hierarchy(path=...)."""
+        self.hierarchy = ContractionHierarchy.load(path, self.compiled)
+        return self.hierarchy
+
+    # ALT landmarks: exact distances from a few far-apart cities give a much tighter
+    # lower bound than the straight line (triangle inequality), so A* expands fewer nodes.
+    def build_landmarks(self, k: int = 4, path=None):
+        """
+        Build ALT landmark tables with Dijkstra and use them in astar_search.
+
+        Args:
+            k: number of landmarks.
+            path: optional .npz file to store the table in.
+
+        Returns:
+            the LandmarkTable now used by the agent.
+        """
+        self.landmarks = LandmarkTable.build(self.compiled, k)
+        if path is not None:
+            self.landmarks.save(path)
+        return self.landmarks
 
-        return [], float("inf")  # No path found
+    def load_landmarks(self, path):
+        """Load an ALT landmark table written by build_landmarks(path=...)."""
+        self.landmarks = LandmarkTable.load(path, self.compiled)
+        return self.landmarks
+
+    @property
+    def last_search_stats(self):
+        """SearchStats (nodes expanded, frontier pushes, peak frontier) of the last greedy/A*/bidirectional/CH query."""
+        return self.engine.stats
 
     # Hill Climbing starts at the initial node and repeatedly moves to the unvisited neighbor that has the
     # lowest heuristic distance to the goal. The process continues until no neighbor shows any improvement,
     # at which point it returns the path found. Although this method is straightforward, deterministic, and greedy,
     # it is susceptible to getting stuck in local optima, as it ignores the overall path cost.
+    @cached_search(symmetric=False)
     def hill_climbing(self, start: str, goal: str):
         """
         Hill Climbing: always move to the neighbor with the
@@ -194,30 +578,39 @@ class SimpleProblemSolvingAgent:
         Returns:
             (path_list, total_cost)
         """
-        path = [start]  # initialize path
+        s, g = self._ids(start, goal)
+        cg = self.compiled
+        offsets, targets, weights = cg.offsets_list, cg.targets_list, cg.weights_list
+        h = self.engine.watch_heuristic(functools.partial(self._heuristic_id, goal=g))
+        on_expand = self.engine.on_expand
+
+        state = PathState(s)  # path, visited set and running cost
         while True:
-            node = path[-1]  # current end of path
-            #  list of (neighbor, h-value) excluding visited
+            node = state.head  # current end of path
+            #  list of (edge, h-value) to neighbors not visited yet
             candidates = [
-                (nbr, self.heuristic(nbr, goal))
-                for nbr in self.graph[node]
-                if nbr not in path
+                (e, h(targets[e]))
+                for e in range(offsets[node], offsets[node + 1])
+                if targets[e] not in state.visited
             ]
+            if on_expand is not None:
+                on_expand(node, state.cost, len(candidates))
             if not candidates:  # no moves available
                 break
             # Pick neighbor with smallest heuristic
-            best_nbr, best_h = min(candidates, key=lambda x: x[1])
+            best_edge, best_h = min(candidates, key=lambda x: x[1])
             # Stop if no improvement
-            if best_h >= self.heuristic(node, goal):
+            if best_h >= h(node):
                 break
-            path.append(best_nbr)  # move to best neighbor
+            state.extend(targets[best_edge], weights[best_edge])  # move to best neighbor
 
-        return path, self.calculate_path_cost(path)
+        return cg.path_names(state.path), state.cost
 
     # In Simulated Annealing, whenever a proposed move increases the cost by a delta, it is not accepted.
     # Instead, it takes it with a probability that mirrors how, in a heated metal, higher‐energy states
     # are occupied with exactly this likelihood in statistical physics. This probability is known as
     # the Boltzmann probability.
+    @cached_search(symmetric=False)
     def simulated_annealing(
         self,
         start: str,
@@ -225,42 +618,226 @@ class SimpleProblemSolvingAgent:
         schedule=lambda t: 1.0 / (1 + t),
         max_steps: int = 1000,
         seed: int = 42,
+        fallback: bool = True,
     ):
         """
         Simulated Annealing: probabilistically accept worse moves early
         to escape local optima, cooling over time via 'schedule'.
+
+        Args:
+            fallback: when the chain does not reach the goal, log a warning and
+                return the Greedy Best-First result instead; with False the
+                failure is returned as ([], inf).
+
+        Returns:
+            (path_list, total_cost)
+        """
+        s, g = self._ids(start, goal)
+        # A private generator: the global random state is left untouched
+        path, cost = self._anneal_ids(s, g, schedule, max_steps, random.Random(seed))
+
+        if not path:
+            if not fallback:
+                return [], math.inf
+            logger.warning(
+                "simulated_annealing did not reach %s from %s in %d steps; "
+                "returning the greedy best-first path instead",
+                goal, start, max_steps,
+            )
+            return self.greedy_best_first_search(start, goal)
+
+        return self.compiled.path_names(path), cost
+
+    def _anneal_ids(self, s: int, g: int, schedule, max_steps: int, rng):
         """
-        random.seed(seed)
-        path = [start]
-        cost = self.calculate_path_cost(path)
+        One annealing chain over node ids driven by the random.Random 'rng'.
 
+        Returns:
+            (list of ids, cost), or ([], inf) if the chain did not reach the goal.
+        """
+        cg = self.compiled
+        offsets, targets, weights = cg.offsets_list, cg.targets_list, cg.weights_list
+        on_expand = self.engine.on_expand
+
+        state = PathState(s)
         for t in range(max_steps):
             T = schedule(t)
             if T <= 0:
                 break
 
-            node = path[-1]
-            neighbors = [nbr for nbr in self.graph[node] if nbr not in path]
-            if not neighbors:
+            node = state.head
+            moves = [
+                e
+                for e in range(offsets[node], offsets[node + 1])
+                if targets[e] not in state.visited
+            ]
+            if on_expand is not None:
+                on_expand(node, state.cost, len(moves))
+            if not moves:
                 break
 
-            next_node = random.choice(neighbors)
-            next_path = path + [next_node]
-            next_cost = self.calculate_path_cost(next_path)
-            delta = next_cost - cost
+            e = rng.choice(moves)
+            # Extending the path by one road changes its cost by exactly that road's length
+            delta = weights[e]
 
             # Accept better moves, or worse ones with Boltzmann probability
-            if delta < 0 or random.random() < math.exp(-delta / T):
-                path, cost = next_path, next_cost
+            if delta < 0 or rng.random() < math.exp(-delta / T):
+                state.extend(targets[e], delta)
 
-            if path[-1] == goal:
+            if state.head == g:
                 break
 
-        # Fallback if we never reached the goal
-        if path[-1] != goal:
-            return self.greedy_best_first_search(start, goal)
+        if state.head != g:
+            return [], float("inf")
+        return state.path, state.cost
 
-        return path, cost
+    # Multi-restart annealing runs several independent chains, each with its own random
+    # generator (seeded from one SeedSequence), optionally on a pool of worker processes,
+    # and keeps the cheapest path. A chain stops restarting once it meets target_cost.
+    @cached_search(symmetric=False)
+    def parallel_simulated_annealing(
+        self,
+        start: str,
+        goal: str,
+        chains: int = 8,
+        restarts: int = 10,
+        workers: int = 1,
+        target_cost: float = None,
+        schedule=annealing.exp_schedule(),
+        max_steps: int = 1000,
+        seed: int = 42,
+    ):
+        """
+        Simulated Annealing with many independent chains; keeps the best result.
+
+        Args:
+            chains: number of independent chains.
+            restarts: maximum annealing runs per chain.
+            workers: processes the chains are spread over (1 = in this process).
+            target_cost: quality threshold; a chain stops as soon as it finds a path
+                this cheap, and the whole search stops when any chain does.
+            schedule: temperature schedule; the default cools from road-segment scale (km),
+                so the chains actually explore instead of rejecting every move.
+            max_steps: as in simulated_annealing.
+            seed: root seed; every chain gets an independent child seed.
+
+        Returns:
+            (path_list, total_cost), or ([], inf) if no chain reached the goal
+            (there is no silent fallback to another algorithm).
+        """
+        s, g = self._ids(start, goal)
+        path, cost = annealing.run_chains(
+            self, s, g, chains, restarts, workers, target_cost, schedule, max_steps, seed
+        )
+        return self.compiled.path_names(path), cost
+
+    # Batch queries: many origin/destination pairs are grouped by origin (so one Dijkstra tree
+    # can serve every destination of an origin) and optionally solved by a pool of worker
+    # processes that inherit this agent instead of receiving a pickled copy per task.
+    def solve_many(self, pairs, algorithms=("astar_search",), workers: int = 1, batch_size: int = 1024):
+        """
+        Solve many (start, goal) pairs and stream the results as they finish.
+
+        Args:
+            pairs: iterable of (start, goal) city-name pairs; may be a long stream.
+            algorithms: names from batch_queries.SEARCH_ALGORITHMS: search methods of this
+                agent, or "dijkstra" to answer every pair of an origin from one shared
+                shortest-path tree.
+            workers: number of worker processes (1 = run in this process).
+            batch_size: pairs grouped by origin at a time (bounds memory).
+
+        Returns:
+            generator of RouteResult(start, goal, algorithm, path, cost, elapsed, error);
+            a pair with a city not on the map has the message in 'error'.
+
+        Raises:
+            ValueError: for an unknown algorithm name, as soon as solve_many is called.
+        """
+        return batch_queries.solve_many(self, pairs, algorithms, workers, batch_size)
+
+    # All-pairs distances: one dense matrix answers every origin/destination lookup in O(1)
+    # instead of repeating single-pair searches. With a path the matrix is cached on disk
+    # and later agents just memory-map it.
+    def distance_matrix(self, kind: str = "road", path=None, workers: int = 1):
+        """
+        Dense all-pairs distance matrix indexed by node id (see self.compiled.names).
+
+        Args:
+            kind: "road" for shortest driving distances, "euclidean" for straight-line ones.
+            path: optional .npy cache file; loaded with mmap when it already exists
+                and was built from this very graph, rebuilt otherwise.
+            workers: processes used to run the per-source Dijkstra searches.
+
+        Returns:
+            (n, n) float64 array or read-only np.memmap.
+        """
+        if kind == "road":
+            def builder(out_path=None):
+                return road_distance_matrix(self.compiled, workers=workers, path=out_path)
+        elif kind == "euclidean":
+            def builder(out_path=None):
+                return euclidean_matrix(self.compiled.coords)
+        else:
+            raise ValueError(f"Unknown distance matrix kind: {kind}")
+        if path is None:
+            return builder()
+        n = self.compiled.num_nodes
+        key = f"{kind} {n} {self.compiled.fingerprint()}"
+        return cached_matrix(path, builder, key=key, shape=(n, n))
+
+    # One-to-many and many-to-many queries: a single Dijkstra tree answers every destination
+    # of one origin, and a sources x targets table needs one early-stopping search per source
+    # (or, with a contraction hierarchy, one upward search per city and bucket scans).
+    def shortest_path_tree(self, source: str, targets=None):
+        """
+        Shortest-path tree from 'source' (one Dijkstra run).
+
+        Args:
+            source: root city.
+            targets: optional cities; the search stops once all of them are settled.
+
+        Returns:
+            (dist, pred) NumPy arrays indexed by node id (see self.compiled.names):
+            float64 distances (inf if unreached) and int64 predecessors (-1 at the
+            root and at unreached nodes). path_from_tree() turns them into routes.
+        """
+        index = self.compiled.index
+        target_ids = None if targets is None else [index[city] for city in targets]
+        dist, pred = shortest_path_tree(self.compiled, index[source], target_ids)
+        return np.asarray(dist, dtype=np.float64), np.asarray(pred, dtype=np.int64)
+
+    def path_from_tree(self, dist, pred, goal: str):
+        """
+        Route from the root of a shortest-path tree to 'goal'.
+
+        Returns:
+            (path_list, total_cost), or ([], inf) if the tree does not reach 'goal'.
+        """
+        g = self.compiled.index[goal]
+        if dist[g] == math.inf:
+            return [], math.inf
+        return self.compiled.path_names(tree_path(np.asarray(pred).tolist(), g)), dist[g].item()
+
+    def distance_table(self, sources, targets, predecessors: bool = False):
+        """
+        Shortest driving distances between every source and every target city.
+
+        Uses the contraction hierarchy's bucket many-to-many when one is loaded
+        (build_hierarchy/load_hierarchy) and no predecessors are requested, otherwise
+        one early-stopping Dijkstra per source.
+
+        Returns:
+            (len(sources), len(targets)) float64 array; with predecessors=True a tuple
+            (table, pred), pred[i] being the predecessor array of sources[i].
+        """
+        index = self.compiled.index
+        return distance_table(
+            self.compiled,
+            [index[city] for city in sources],
+            [index[city] for city in targets],
+            hierarchy=self.hierarchy,
+            predecessors=predecessors,
+        )
 
     # This method computes a path’s total distance by summing the edge weights or values of each pair.
     # It loops through indices 0…len(path)-2, looks up graph[path[i]][path[i+1]] for each consecutive city pair,
@@ -275,4 +852,10 @@ class SimpleProblemSolvingAgent:
         Returns:
             Sum of edge distances along the path.
         """
-        return sum(self.graph[path[i]][path[i + 1]] for i in range(len(path) - 1))
+        index = self.compiled.index
+        return self._path_cost_ids([index[city] for city in path])
+
+    def _path_cost_ids(self, path: list):
+        """Sum of edge weights along a list of node ids."""
+        edge_weight = self.compiled.edge_weight
+        return sum(edge_weight(path[i], path[i + 1]) for i in range(len(path) - 1))
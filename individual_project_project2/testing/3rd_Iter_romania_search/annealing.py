@@ -0,0 +1,103 @@
+"""
+Multi-restart / multi-chain simulated annealing for SimpleProblemSolvingAgent.
+
+Every chain owns a random.Random seeded from its own child of one
+numpy.random.SeedSequence, so chains are independent and reproducible and the
+global random state is never touched.  A chain repeats annealing runs (restarts)
+until it has used its budget or found a path at least as cheap as the quality
+threshold.  Chains can run on a process pool: the agent and the schedule are
+handed to the workers once through the pool initializer (inherited under
+"fork"), so a task only carries ids and a seed.
+"""
+
+import functools
+import math
+import multiprocessing
+import random
+
+import numpy as np
+
+INF = float("inf")
+
+
+def _exp_cooling(k, lam, limit, t):
+    return k * math.exp(-lam * t) if t < limit else 0
+
+
+def exp_schedule(k: float = 100, lam: float = 0.005, limit: int = 1000):
+    """
+    Exponential cooling T(t) = k * exp(-lam * t), 0 after 'limit' steps.
+
+    The default k is on the scale of a road segment (km), so early moves along
+    long roads are still accepted with a useful probability.  The schedule is a
+    functools.partial of a module-level function, so it pickles and can be sent
+    to pool workers under any start method.
+    """
+    return functools.partial(_exp_cooling, k, lam, limit)
+
+
+# (agent, schedule, max_steps) installed in every worker by _init_worker
+_worker_state = None
+
+
+def _init_worker(agent, schedule, max_steps):
+    global _worker_state
+    _worker_state = (agent, schedule, max_steps)
+
+
+def _run_chain_task(task):
+    agent, schedule, max_steps = _worker_state
+    return run_chain(agent, *task, schedule=schedule, max_steps=max_steps)
+
+
+def run_chain(agent, s: int, g: int, seed: int, restarts: int, target_cost, schedule, max_steps: int):
+    """
+    One chain: up to 'restarts' annealing runs sharing one random generator.
+
+    Returns:
+        (path_ids, cost) of the best run ([], inf if no run reached the goal).
+    """
+    rng = random.Random(seed)
+    best_path, best_cost = [], INF
+    for _ in range(restarts):
+        path, cost = agent._anneal_ids(s, g, schedule, max_steps, rng)
+        if path and cost < best_cost:
+            best_path, best_cost = path, cost
+        if target_cost is not None and best_cost <= target_cost:
+            break
+    return best_path, best_cost
+
+
+def chain_seeds(seed: int, chains: int) -> list:
+    """Independent integer seeds for 'chains' chains, derived from one root seed."""
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(chains)]
+
+
+def run_chains(agent, s, g, chains, restarts, workers, target_cost, schedule, max_steps, seed):
+    """
+    Run independent chains (optionally in parallel) and keep the cheapest path.
+
+    Returns:
+        (path_ids, cost), or ([], inf) if no chain reached the goal.
+    """
+    tasks = [(s, g, chain_seed, restarts, target_cost) for chain_seed in chain_seeds(seed, chains)]
+    best_path, best_cost = [], INF
+
+    if workers <= 1:
+        results = (run_chain(agent, *task, schedule=schedule, max_steps=max_steps) for task in tasks)
+        for path, cost in results:
+            if cost < best_cost:
+                best_path, best_cost = path, cost
+            if target_cost is not None and best_cost <= target_cost:
+                break
+        return best_path, best_cost
+
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(agent, schedule, max_steps)) as pool:
+        for path, cost in pool.imap_unordered(_run_chain_task, tasks):
+            if cost < best_cost:
+                best_path, best_cost = path, cost
+            if target_cost is not None and best_cost <= target_cost:
+                break  # leaving the block terminates the remaining chains
+    return best_path, best_cost
@@ -0,0 +1,151 @@
+"""
+Anytime Repairing A* (ARA*) over a CompiledGraph.
+
+ARA* runs a series of weighted A* searches, f = g + w * h, with a decreasing
+inflation factor w.  Instead of starting every search from scratch it reuses
+the g-values and parent pointers of the previous one: nodes whose cost
+improved after they had been expanded are kept aside (INCONS) and put back on
+the frontier when w is lowered, so each repair only re-expands the part of the
+tree that can still improve.
+
+Every improved solution is yielded together with its suboptimality bound
+
+    bound = min(w, cost / min over open and inconsistent nodes of (g + h))
+
+which is at most w and reaches 1.0 once the solution is provably optimal.
+The search stops when w = 1 has been completed or a caller-given time or
+expansion budget runs out; the last solution yielded is the best one found.
+"""
+
+import time
+from collections import namedtuple
+from heapq import heapify, heappop, heappush
+
+from search_engine import hook_callbacks
+
+INF = float("inf")
+
+# Inflation factors used when the caller gives none
+DEFAULT_WEIGHTS = (3.0, 2.0, 1.5, 1.25, 1.0)
+
+AnytimeSolution = namedtuple("AnytimeSolution", "path cost bound weight expanded elapsed")
+
+
+def anytime_astar(
+    graph,
+    start: int,
+    goal: int,
+    h,
+    weights=DEFAULT_WEIGHTS,
+    time_budget: float = None,
+    expansion_budget: int = None,
+    clock=time.perf_counter,
+    hooks=None,
+):
+    """
+    ARA* from 'start' to 'goal' with the admissible heuristic h(node_id).
+
+    Args:
+        graph: CompiledGraph.
+        weights: decreasing inflation factors (each >= 1); the last one should be 1
+            for the search to end with a provably optimal path.
+        time_budget: seconds after which the search stops (None = no limit).
+        expansion_budget: total node expansions after which it stops (None = no limit).
+        clock: seconds clock used for the time budget.
+        hooks: optional object with on_pop/on_expand/on_push callbacks (a SearchEngine).
+
+    Yields:
+        AnytimeSolution(path_ids, cost, bound, weight, expanded, elapsed) for every
+        improved solution, in order of decreasing cost or bound.
+    """
+    weights = list(weights)
+    if not weights or any(w < 1 for w in weights):
+        raise ValueError("Inflation factors must be >= 1")
+    began = clock()
+    deadline = None if time_budget is None else began + time_budget
+    offsets, targets, costs = graph.offsets_list, graph.targets_list, graph.weights_list
+    on_pop, on_expand, on_push = hook_callbacks(hooks)
+
+    g = {start: 0}
+    parent = {start: -1}
+    h_cache = {}
+
+    def hv(v):
+        value = h_cache.get(v)
+        if value is None:
+            value = h_cache[v] = h(v)
+        return value
+
+    open_nodes = {start}  # nodes currently on the frontier
+    incons = set()  # improved after being expanded in the current iteration
+    expanded = 0
+    best_cost, best_bound = INF, INF
+
+    for w in weights:
+        # (Re)build the frontier with the keys of the new weight
+        open_nodes |= incons
+        incons = set()
+        frontier = [(g[v] + w * hv(v), v) for v in open_nodes]
+        heapify(frontier)
+        if on_push is not None:
+            for key, v in frontier:
+                on_push(v, key, g[v])
+        closed = set()
+        out_of_budget = False
+
+        # ImprovePath: expand while some node's key beats the goal's
+        while frontier and frontier[0][0] < g.get(goal, INF):
+            key, u = heappop(frontier)
+            stale = u not in open_nodes or key != g[u] + w * hv(u)
+            if on_pop is not None:
+                on_pop(u, key, g[u], stale)
+            if stale:
+                continue
+            if (expansion_budget is not None and expanded >= expansion_budget) or (
+                deadline is not None and clock() >= deadline
+            ):
+                heappush(frontier, (key, u))
+                out_of_budget = True
+                break
+            open_nodes.discard(u)
+            closed.add(u)
+            expanded += 1
+            gu = g[u]
+            if on_expand is not None:
+                on_expand(u, gu, len(frontier))
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_cost = gu + costs[e]
+                if new_cost < g.get(v, INF):
+                    g[v] = new_cost
+                    parent[v] = u
+                    if v in closed:
+                        incons.add(v)
+                    else:
+                        open_nodes.add(v)
+                        key = new_cost + w * hv(v)
+                        heappush(frontier, (key, v))
+                        if on_push is not None:
+                            on_push(v, key, new_cost)
+
+        cost = g.get(goal, INF)
+        if cost < INF:
+            lower = min((g[v] + hv(v) for v in open_nodes | incons), default=INF)
+            bound = 1.0 if lower >= cost else min(w, cost / lower) if lower > 0 else w
+            if cost < best_cost or bound < best_bound:
+                best_cost, best_bound = cost, bound
+                yield AnytimeSolution(_path(parent, goal), cost, bound, w, expanded, clock() - began)
+            if bound <= 1.0:
+                return
+        if out_of_budget:
+            return
+
+
+def _path(parent: dict, goal: int) -> list:
+    path = [goal]
+    u = parent[goal]
+    while u != -1:
+        path.append(u)
+        u = parent[u]
+    path.reverse()
+    return path
@@ -0,0 +1,194 @@
+"""
+Batch route queries for SimpleProblemSolvingAgent.solve_many.
+
+Origin/destination pairs are read from any iterable (it may be a stream of
+millions of pairs), grouped by origin in windows of 'batch_size' pairs, and
+each group is solved as one task:
+
+  * the "dijkstra" algorithm runs a single shortest-path tree from the origin
+    and reads every destination of the group off that tree;
+  * every other name in SEARCH_ALGORITHMS is a search method of the agent,
+    called per pair.
+
+A pair naming a city that is not on the map gives a RouteResult with an
+'error' message instead of aborting the whole stream.
+
+With workers > 1 the groups are spread over a process pool.  The pool is
+created with the "fork" start method where available, so the workers inherit
+the agent (and its compiled graph) from the parent instead of having it pickled;
+tasks only carry city names.  At most a few tasks per worker are in flight at
+any time, and results are yielded in completion order, so memory stays bounded
+however long the input stream is.
+"""
+
+import multiprocessing
+import queue
+import time
+from collections import namedtuple
+from itertools import islice
+
+from search_engine import INF, shortest_path_tree, tree_path
+
+# elapsed: seconds spent on the result; a shared "dijkstra" tree is split evenly over its goals.
+# error: why the pair could not be searched (path [] and cost inf), None otherwise.
+RouteResult = namedtuple("RouteResult", "start goal algorithm path cost elapsed error", defaults=(None, None))
+
+# Names solve_many accepts: agent methods search(start, goal) -> (path, cost), and "dijkstra"
+SEARCH_ALGORITHMS = (
+    "dijkstra",
+    "greedy_best_first_search",
+    "astar_search",
+    "weighted_astar_search",
+    "uniform_cost_search",
+    "anytime_astar_search",
+    "bidirectional_dijkstra",
+    "bidirectional_astar",
+    "ch_search",
+    "incremental_search",
+    "hill_climbing",
+    "simulated_annealing",
+    "parallel_simulated_annealing",
+)
+
+# Agent installed in every worker process by _init_worker
+_worker_agent = None
+
+
+def _init_worker(agent):
+    global _worker_agent
+    _worker_agent = agent
+
+
+def _solve_group(task):
+    """Worker entry point: solve one (origin, destinations, algorithms) group."""
+    return solve_group(_worker_agent, *task)
+
+
+def solve_group(agent, start: str, goals: list, algorithms) -> list:
+    """
+    Solve every (start, goal) pair of one origin group with every algorithm.
+
+    Returns:
+        list of RouteResult.
+    """
+    graph = agent.compiled
+    index = graph.index
+    errors = {goal: unknown_cities(index, start, goal) for goal in goals}
+    known = [goal for goal in goals if errors[goal] is None]
+    results = []
+    for algorithm in algorithms:
+        results.extend(
+            RouteResult(start, goal, algorithm, [], INF, 0.0, errors[goal]) for goal in goals if errors[goal]
+        )
+        if not known:
+            continue
+        if algorithm == "dijkstra":
+            # One tree serves every destination of this origin
+            began = time.perf_counter()
+            goal_ids = [index[goal] for goal in known]
+            dist, parent = shortest_path_tree(graph, index[start], goal_ids)
+            elapsed = (time.perf_counter() - began) / len(known)
+            for goal, g in zip(known, goal_ids):
+                if dist[g] == INF:
+                    results.append(RouteResult(start, goal, algorithm, [], INF, elapsed))
+                else:
+                    path = graph.path_names(tree_path(parent, g))
+                    results.append(RouteResult(start, goal, algorithm, path, dist[g], elapsed))
+        else:
+            search = getattr(agent, algorithm)
+            for goal in known:
+                began = time.perf_counter()
+                path, cost = search(start, goal)
+                results.append(RouteResult(start, goal, algorithm, path, cost, time.perf_counter() - began))
+    return results
+
+
+def unknown_cities(index, start: str, goal: str):
+    """The per-pair error message for cities missing from 'index', or None."""
+    unknown = [city for city in (start, goal) if city not in index]
+    return f"unknown city: {', '.join(unknown)}" if unknown else None
+
+
+def check_algorithms(algorithms) -> tuple:
+    """
+    Validate algorithm names against SEARCH_ALGORITHMS.
+
+    Raises:
+        ValueError: naming the first unknown algorithm.
+    """
+    algorithms = tuple(algorithms)
+    for algorithm in algorithms:
+        if algorithm not in SEARCH_ALGORITHMS:
+            raise ValueError(f"Unknown search algorithm: {algorithm}")
+    return algorithms
+
+
+def group_by_source(pairs, batch_size: int):
+    """
+    Yield (start, [goals]) groups from windows of at most 'batch_size' pairs.
+
+    Only one window is held in memory, so a long stream is grouped incrementally.
+    """
+    pairs = iter(pairs)
+    while True:
+        window = list(islice(pairs, batch_size))
+        if not window:
+            return
+        groups = {}
+        for start, goal in window:
+            groups.setdefault(start, []).append(goal)
+        yield from groups.items()
+
+
+def solve_many(agent, pairs, algorithms=("astar_search",), workers: int = 1, batch_size: int = 1024):
+    """
+    Stream RouteResults for many (start, goal) pairs.
+
+    Args:
+        agent: SimpleProblemSolvingAgent to search with.
+        pairs: iterable of (start, goal) city-name pairs.
+        algorithms: names from SEARCH_ALGORITHMS.
+        workers: number of processes (1 = solve in this process).
+        batch_size: number of pairs grouped by origin at a time.
+
+    Returns:
+        generator of RouteResult(start, goal, algorithm, path, cost, elapsed, error),
+        in completion order.
+
+    Raises:
+        ValueError: for an algorithm not in SEARCH_ALGORITHMS, before any pair is read.
+    """
+    algorithms = check_algorithms(algorithms)
+    return _stream(agent, pairs, algorithms, workers, batch_size)
+
+
+def _stream(agent, pairs, algorithms, workers, batch_size):
+    tasks = ((start, goals, algorithms) for start, goals in group_by_source(pairs, batch_size))
+
+    if workers <= 1:
+        for task in tasks:
+            yield from solve_group(agent, *task)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+    done = queue.Queue()
+    max_in_flight = workers * 4
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(agent,)) as pool:
+        in_flight = 0
+        for task in tasks:
+            pool.apply_async(_solve_group, (task,), callback=done.put, error_callback=done.put)
+            in_flight += 1
+            while in_flight >= max_in_flight:
+                in_flight -= 1
+                yield from _unwrap(done.get())
+        while in_flight:
+            in_flight -= 1
+            yield from _unwrap(done.get())
+
+
+def _unwrap(outcome):
+    """Re-raise a worker exception, or return the worker's list of results."""
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
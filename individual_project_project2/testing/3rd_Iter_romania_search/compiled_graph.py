@@ -0,0 +1,319 @@
+"""
+Compiled, integer-indexed representation of a road map.
+
+The search algorithms in SimpleProblemSolvingAgent used to walk the nested
+``{city: {neighbor: distance}}`` dictionaries directly, which means every
+expansion hashes strings.  CompiledGraph interns every city name to an integer
+id once and stores the roads in CSR (compressed sparse row) form:
+
+    offsets[u] .. offsets[u + 1]   -> slice of the edge arrays owned by node u
+    targets[e], weights[e]         -> head node and length of edge e
+    coords[u]                      -> (x, y) used by the straight-line heuristic
+
+The NumPy arrays are the canonical storage (they can be saved, memory-mapped and
+used for vectorized work).  Plain-list mirrors of the same arrays are built on
+first use for the pure-Python search loops, where indexing a list is much
+cheaper than indexing a NumPy array element by element.
+
+save() writes a snapshot directory (one .npy file per array plus names.txt);
+load() opens the arrays with np.load(mmap_mode="r"), so a new agent or worker
+process starts without reading the edge data and every process on the host
+shares the same page cache.
+"""
+
+import hashlib
+import math
+import os
+from collections.abc import Mapping
+from functools import cached_property
+
+import numpy as np
+
+SNAPSHOT_ARRAYS = ("offsets", "targets", "weights", "coords")
+
+
+class CompiledGraph:
+    """
+    CSR adjacency arrays plus a name <-> id interning table and a coordinate array.
+    """
+
+    def __init__(self, names, offsets, targets, weights, coords):
+        """
+        Build a compiled graph from already-laid-out CSR arrays.
+
+        Args:
+            names: sequence of node names; position is the node id.
+            offsets: array of length n + 1 with the edge range of every node.
+            targets: array of edge heads (node ids).
+            weights: array of edge lengths, aligned with targets.
+            coords: (n, 2) array of node coordinates.
+        """
+        self.names = list(names)  # id -> name
+        self.index = {name: i for i, name in enumerate(self.names)}  # name -> id
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights)
+        # Keep integer road lengths as integers so path costs print like before
+        if self.weights.dtype.kind not in "iu":
+            self.weights = self.weights.astype(np.float64, copy=False)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        # Bumped whenever edge data changes, so caches built on the graph can tell they are stale
+        self.version = 0
+
+        n = len(self.names)
+        if len(self.index) != n:
+            raise ValueError("Duplicate node names in compiled graph")
+        if len(self.offsets) != n + 1 or len(self.coords) != n:
+            raise ValueError("Offsets and coordinates must match the number of nodes")
+        if len(self.targets) != len(self.weights) or self.offsets[-1] != len(self.targets):
+            raise ValueError("Edge arrays do not match the offsets table")
+
+    # Plain-list mirrors for the pure-Python search loops, built on first use so that
+    # loading a memory-mapped snapshot does not touch the edge data.
+    @cached_property
+    def offsets_list(self) -> list:
+        return self.offsets.tolist()
+
+    @cached_property
+    def targets_list(self) -> list:
+        return self.targets.tolist()
+
+    @cached_property
+    def weights_list(self) -> list:
+        return self.weights.tolist()
+
+    @cached_property
+    def xs(self) -> list:
+        return self.coords[:, 0].tolist()
+
+    @cached_property
+    def ys(self) -> list:
+        return self.coords[:, 1].tolist()
+
+    @cached_property
+    def in_edges(self):
+        """
+        Reverse CSR over edge ids: in_edge_ids[in_offsets[v]:in_offsets[v + 1]] are the
+        edges ending in v.  Weights are read through the ids, so the index stays valid
+        when edge weights change.
+
+        Returns:
+            (in_offsets, in_edge_ids, sources) plain lists; sources[e] is the tail of edge e.
+        """
+        n = self.num_nodes
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.offsets))
+        order = np.argsort(self.targets, kind="stable")
+        in_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.targets, minlength=n), out=in_offsets[1:])
+        return in_offsets.tolist(), order.tolist(), sources.tolist()
+
+    def copy(self):
+        """
+        A graph sharing names, structure and coordinates with this one but owning a
+        private, writable copy of the weights.
+        """
+        clone = CompiledGraph.__new__(CompiledGraph)
+        clone.__dict__.update(self.__dict__)
+        clone.weights = np.array(self.weights)
+        clone.__dict__.pop("weights_list", None)
+        return clone
+
+    def set_edge_weight(self, u: int, v: int, weight) -> object:
+        """
+        Change the length of the edge u -> v in place and bump the version stamp.
+
+        Read-only (memory-mapped) weights are copied first; an integer weight array
+        becomes float64 when a non-integer length (e.g. inf for a closed road) comes in.
+
+        Returns:
+            the previous length.
+
+        Raises:
+            KeyError: if there is no such edge.
+            ValueError: for a negative or NaN length.
+        """
+        if not weight >= 0:
+            raise ValueError(f"Edge length must be non-negative, got {weight}")
+        e = self.edge_index.get((u, v))
+        if e is None:
+            raise KeyError(f"No edge {self.names[u]} → {self.names[v]}")
+        if self.weights.dtype.kind in "iu" and (math.isinf(weight) or weight != int(weight)):
+            self.weights = self.weights.astype(np.float64)
+            self.__dict__.pop("weights_list", None)
+        if not self.weights.flags.writeable:
+            self.weights = np.array(self.weights)
+        old = self.weights_list[e]
+        self.weights[e] = weight
+        self.weights_list[e] = self.weights[e].item()
+        self.version += 1
+        return old
+
+    def save(self, directory):
+        """
+        Write a snapshot of the graph: <array>.npy for every CSR/coordinate array and
+        names.txt with one node name per line.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in SNAPSHOT_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "names.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.names))
+
+    @classmethod
+    def load(cls, directory, mmap: bool = True):
+        """
+        Open a snapshot written by save().
+
+        Args:
+            directory: snapshot directory.
+            mmap: memory-map the arrays read-only (default) instead of reading them.
+
+        Returns:
+            CompiledGraph
+        """
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in SNAPSHOT_ARRAYS]
+        with open(os.path.join(directory, "names.txt"), encoding="utf-8") as f:
+            text = f.read()
+        names = text.split("\n") if text else []
+        return cls(names, *arrays)
+
+    @classmethod
+    def from_road_map(cls, road_map: dict, coordinates: dict):
+        """
+        Compile a ``{city: {neighbor: distance}}`` map and a ``{city: (x, y)}`` table.
+
+        Node ids follow the iteration order of ``road_map`` and each node keeps the
+        neighbor order of its inner dictionary, so searches expand neighbors in the
+        same order as the dictionary-based implementation did.
+
+        Args:
+            road_map: nested adjacency dictionary.
+            coordinates: coordinates for every city in road_map.
+
+        Returns:
+            CompiledGraph
+        """
+        names = list(road_map)
+        index = {name: i for i, name in enumerate(names)}
+        offsets = [0]
+        targets = []
+        weights = []
+        for name in names:
+            for neighbor, distance in road_map[name].items():
+                if neighbor not in index:
+                    raise KeyError(f"Road from {name} to unknown city {neighbor}")
+                targets.append(index[neighbor])
+                weights.append(distance)
+            offsets.append(len(targets))
+        coords = [coordinates[name] for name in names]
+        return cls(names, offsets, targets, weights, coords)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets_list)
+
+    def fingerprint(self) -> str:
+        """
+        Hex digest of the names and the CSR/coordinate arrays; equal graphs give
+        equal fingerprints in any process, so it can tag data cached on disk.
+        """
+        digest = hashlib.sha1("\n".join(self.names).encode("utf-8"))
+        for name in SNAPSHOT_ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name))
+            digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode("ascii"))
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def node_id(self, name: str) -> int:
+        """Return the integer id of a city name (KeyError if unknown)."""
+        return self.index[name]
+
+    def node_name(self, node: int) -> str:
+        """Return the city name of an integer id."""
+        return self.names[node]
+
+    def neighbors(self, node: int):
+        """Yield (neighbor_id, weight) pairs of a node in CSR order."""
+        targets, weights = self.targets_list, self.weights_list
+        for e in range(self.offsets_list[node], self.offsets_list[node + 1]):
+            yield targets[e], weights[e]
+
+    @cached_property
+    def edge_index(self) -> dict:
+        """(u, v) -> edge position; the first of parallel edges wins, as in a CSR scan."""
+        index = {}
+        targets = self.targets_list
+        offsets = self.offsets_list
+        for u in range(self.num_nodes):
+            for e in range(offsets[u], offsets[u + 1]):
+                index.setdefault((u, targets[e]), e)
+        return index
+
+    def edge_weight(self, u: int, v: int):
+        """
+        Length of the edge u -> v (O(1) through edge_index).
+
+        Raises:
+            KeyError: if there is no such edge.
+        """
+        e = self.edge_index.get((u, v))
+        if e is None:
+            raise KeyError(f"No edge {self.names[u]} → {self.names[v]}")
+        return self.weights_list[e]
+
+    def path_names(self, path_ids) -> list:
+        """Translate a list of node ids back to city names."""
+        names = self.names
+        return [names[u] for u in path_ids]
+
+
+class RoadMapView(Mapping):
+    """
+    Read-only ``{city: {neighbor: distance}}`` view of a CompiledGraph.
+
+    Lets code written against the nested-dict road map (input validation,
+    visualization) work on graphs that were loaded straight into CSR form; the
+    inner dictionaries are built on demand, one city at a time.
+    """
+
+    def __init__(self, graph: CompiledGraph):
+        self._graph = graph
+
+    def __getitem__(self, city):
+        graph = self._graph
+        return {graph.names[v]: w for v, w in graph.neighbors(graph.index[city])}
+
+    def __contains__(self, city):
+        return city in self._graph.index
+
+    def __iter__(self):
+        return iter(self._graph.names)
+
+    def __len__(self):
+        return self._graph.num_nodes
+
+
+class CoordinateView(Mapping):
+    """Read-only ``{city: (x, y)}`` view of a CompiledGraph's coordinate array."""
+
+    def __init__(self, graph: CompiledGraph):
+        self._graph = graph
+
+    def __getitem__(self, city):
+        graph = self._graph
+        node = graph.index[city]
+        return graph.xs[node], graph.ys[node]
+
+    def __contains__(self, city):
+        return city in self._graph.index
+
+    def __iter__(self):
+        return iter(self._graph.names)
+
+    def __len__(self):
+        return self._graph.num_nodes
@@ -0,0 +1,348 @@
+"""
+Contraction Hierarchies (CH) for repeated shortest-path queries on a static map.
+
+Preprocessing (ContractionHierarchy.build) removes the nodes one at a time in
+order of "importance".  When node u is contracted, every pair of its remaining
+neighbors (a, b) whose shortest connection runs through u gets a shortcut edge
+a - b of length w(a, u) + w(u, b); a bounded local Dijkstra (witness search)
+skips shortcuts that are not needed.  Node importance is the edge difference
+(shortcuts added - edges removed) plus the number of already contracted
+neighbors, kept up to date with lazy re-evaluation.
+
+A query is a bidirectional Dijkstra in which both searches only relax edges
+towards higher-ranked nodes; it touches a tiny part of the graph.  Shortcuts
+remember the node they bypass, so the final path is unpacked recursively back
+to original road segments.
+
+The hierarchy is serialized to a .npz file (rank array plus an "upward" CSR
+graph of edges to higher-ranked nodes) so it is built once, offline.
+"""
+
+from heapq import heappop, heappush
+
+import numpy as np
+
+from search_engine import INF, SearchStats
+
+
+class ContractionHierarchy:
+    """
+    Upward CSR graph of a contracted, undirected road map.
+
+    Attributes:
+        rank: int array, rank[u] = position of u in the contraction order.
+        up_offsets, up_targets, up_weights, up_middle: CSR arrays of the edges
+            u -> v with rank[v] > rank[u]; up_middle[e] is the contracted node a
+            shortcut bypasses, or -1 for an original road.
+    """
+
+    def __init__(self, rank, up_offsets, up_targets, up_weights, up_middle):
+        self.rank = np.asarray(rank, dtype=np.int64)
+        self.up_offsets = np.asarray(up_offsets, dtype=np.int64)
+        self.up_targets = np.asarray(up_targets, dtype=np.int32)
+        self.up_weights = np.asarray(up_weights)
+        self.up_middle = np.asarray(up_middle, dtype=np.int32)
+
+        # Plain-list mirrors for the query loop
+        self._offsets = self.up_offsets.tolist()
+        self._targets = self.up_targets.tolist()
+        self._weights = self.up_weights.tolist()
+        self._middle = self.up_middle.tolist()
+        # (lower id, higher id) -> bypassed node, for unpacking shortcuts
+        self._shortcuts = {}
+        for u in range(len(self._offsets) - 1):
+            for e in range(self._offsets[u], self._offsets[u + 1]):
+                if self._middle[e] != -1:
+                    v = self._targets[e]
+                    self._shortcuts[(u, v) if u < v else (v, u)] = self._middle[e]
+        self.stats = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.rank)
+
+    @property
+    def num_shortcuts(self) -> int:
+        return len(self._shortcuts)
+
+    # -------------------------------------------------------------------------
+    # Preprocessing
+    # -------------------------------------------------------------------------
+    @classmethod
+    def build(cls, graph, witness_settle_limit: int = 64):
+        """
+        Contract every node of an undirected CompiledGraph.
+
+        Args:
+            graph: CompiledGraph with symmetric edges.
+            witness_settle_limit: maximum nodes settled by one witness search; when
+                it is hit the shortcut is added anyway (always correct, maybe redundant).
+
+        Returns:
+            ContractionHierarchy
+        """
+        n = graph.num_nodes
+        # Working graph: adj[u][v] = (weight, middle); shortest parallel edge wins
+        adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, w in graph.neighbors(u):
+                if v != u and (v not in adj[u] or w < adj[u][v][0]):
+                    adj[u][v] = (w, -1)
+                    adj[v][u] = (w, -1)
+
+        contracted = [False] * n
+        deleted_neighbors = [0] * n
+        upward = [dict() for _ in range(n)]  # edges kept for the final hierarchy
+
+        def shortcuts_for(u):
+            """Shortcuts (a, b, weight) needed if u were contracted now."""
+            nbrs = list(adj[u].items())
+            needed = []
+            for i, (a, (wa, _)) in enumerate(nbrs):
+                rest = nbrs[i + 1:]
+                if not rest:
+                    break
+                limit = wa + max(wb for _, (wb, _) in rest)
+                dist = _witness_search(adj, a, u, limit, witness_settle_limit)
+                for b, (wb, _) in rest:
+                    via_u = wa + wb
+                    if dist.get(b, INF) > via_u:
+                        needed.append((a, b, via_u))
+            return needed
+
+        def priority(u):
+            return len(shortcuts_for(u)) - len(adj[u]) + deleted_neighbors[u]
+
+        queue = [(priority(u), u) for u in range(n)]
+        queue.sort()
+        rank = [0] * n
+        order = 0
+        while queue:
+            _, u = heappop(queue)
+            if contracted[u]:
+                continue
+            # Lazy update: re-evaluate and put back if no longer the minimum
+            current = priority(u)
+            if queue and current > queue[0][0]:
+                heappush(queue, (current, u))
+                continue
+
+            for a, b, w in shortcuts_for(u):
+                if b not in adj[a] or w < adj[a][b][0]:
+                    adj[a][b] = (w, u)
+                    adj[b][a] = (w, u)
+            rank[u] = order
+            order += 1
+            contracted[u] = True
+            # Every remaining edge of u points to a higher-ranked node
+            for v, edge in adj[u].items():
+                upward[u][v] = edge
+                del adj[v][u]
+                deleted_neighbors[v] += 1
+            adj[u] = {}
+
+        offsets, targets, weights, middle = [0], [], [], []
+        for u in range(n):
+            for v, (w, m) in upward[u].items():
+                targets.append(v)
+                weights.append(w)
+                middle.append(m)
+            offsets.append(len(targets))
+        if not weights:
+            weights = np.zeros(0, dtype=graph.weights.dtype)
+        return cls(rank, offsets, targets, weights, middle)
+
+    # -------------------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------------------
+    def save(self, path):
+        """Write the hierarchy to a .npz file."""
+        np.savez(
+            path,
+            rank=self.rank,
+            up_offsets=self.up_offsets,
+            up_targets=self.up_targets,
+            up_weights=self.up_weights,
+            up_middle=self.up_middle,
+        )
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Load a hierarchy written by save().
+
+        Raises:
+            ValueError: if 'graph' is given and has a different number of nodes.
+        """
+        with np.load(path) as data:
+            ch = cls(
+                data["rank"],
+                data["up_offsets"],
+                data["up_targets"],
+                data["up_weights"],
+                data["up_middle"],
+            )
+        if graph is not None and ch.num_nodes != graph.num_nodes:
+            raise ValueError(
+                f"Hierarchy has {ch.num_nodes} nodes, graph has {graph.num_nodes}"
+            )
+        return ch
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+    def upward_search(self, source: int):
+        """
+        Dijkstra from 'source' restricted to upward edges (the whole upward cone).
+
+        Returns:
+            (dist, parent) dicts of every node reached.
+        """
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        dist, parent = {source: 0}, {source: -1}
+        frontier = [(0, source)]
+        while frontier:
+            d, u = heappop(frontier)
+            if d > dist[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = d + weights[e]
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    parent[v] = u
+                    heappush(frontier, (nd, v))
+        return dist, parent
+
+    def query(self, start: int, goal: int):
+        """
+        Shortest path between two node ids.
+
+        Returns:
+            (path_ids, cost) with shortcuts unpacked, or ([], inf) if unreachable.
+        """
+        if start == goal:
+            self.stats = SearchStats(0, 1, 1)
+            return [start], 0
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        dist = ({start: 0}, {goal: 0})
+        parent = ({start: -1}, {goal: -1})
+        queues = ([(0, start)], [(0, goal)])
+        mu, meet = INF, -1
+        pushes, expanded, peak = 2, 0, 2
+
+        while queues[0] or queues[1]:
+            # Pick the side with the smaller top key; a side whose top key is
+            # already >= mu cannot improve the answer and is dropped.
+            side = 0 if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]) else 1
+            d, u = heappop(queues[side])
+            if d >= mu:
+                queues[side].clear()
+                continue
+            if d > dist[side][u]:
+                continue
+            expanded += 1
+            other = dist[1 - side]
+            if u in other and d + other[u] < mu:
+                mu, meet = d + other[u], u
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = d + weights[e]
+                if nd < dist[side].get(v, INF):
+                    dist[side][v] = nd
+                    parent[side][v] = u
+                    heappush(queues[side], (nd, v))
+                    pushes += 1
+            size = len(queues[0]) + len(queues[1])
+            if size > peak:
+                peak = size
+
+        self.stats = SearchStats(expanded, pushes, peak)
+        if meet == -1:
+            return [], INF
+
+        up_path = []
+        u = meet
+        while u != -1:
+            up_path.append(u)
+            u = parent[0][u]
+        up_path.reverse()
+        u = parent[1][meet]
+        while u != -1:
+            up_path.append(u)
+            u = parent[1][u]
+        return self.unpack(up_path), mu
+
+    def many_to_many(self, sources, targets) -> np.ndarray:
+        """
+        Distance table between every source and every target with buckets.
+
+        One upward search per target leaves (target, distance) entries in a bucket
+        at every node of its upward cone; one upward search per source then scans
+        the buckets of the nodes it reaches.  The shortest path between s and t
+        peaks at a node both cones contain, so the minimum over shared nodes is
+        exact.  Cost: |sources| + |targets| upward searches instead of
+        |sources| full Dijkstra runs.
+
+        Returns:
+            (len(sources), len(targets)) float64 array, inf where unreachable.
+        """
+        buckets = {}
+        for j, t in enumerate(targets):
+            dist, _ = self.upward_search(t)
+            for v, d in dist.items():
+                buckets.setdefault(v, []).append((j, d))
+        table = np.full((len(sources), len(targets)), np.inf)
+        for i, s in enumerate(sources):
+            dist, _ = self.upward_search(s)
+            row = [INF] * len(targets)
+            for v, d in dist.items():
+                for j, d_t in buckets.get(v, ()):
+                    if d + d_t < row[j]:
+                        row[j] = d + d_t
+            table[i] = row
+        return table
+
+    def unpack(self, path: list) -> list:
+        """Replace every shortcut in a hierarchy path by the original roads it bypasses."""
+        shortcuts = self._shortcuts
+        result = [path[0]]
+        for a, b in zip(path, path[1:]):
+            stack = [(a, b)]
+            while stack:
+                x, y = stack.pop()
+                m = shortcuts.get((x, y) if x < y else (y, x))
+                if m is None:
+                    result.append(y)
+                else:
+                    # Unpack (x, m) first, so push it last
+                    stack.append((m, y))
+                    stack.append((x, m))
+        return result
+
+
+def _witness_search(adj, source: int, excluded: int, limit, settle_limit: int) -> dict:
+    """
+    Bounded Dijkstra from 'source' in the working graph that avoids 'excluded'.
+
+    Returns:
+        dict of tentative distances (only distances <= limit are meaningful).
+    """
+    dist = {source: 0}
+    frontier = [(0, source)]
+    settled = 0
+    while frontier and settled < settle_limit:
+        d, u = heappop(frontier)
+        if d > dist[u]:
+            continue
+        if d > limit:
+            break
+        settled += 1
+        for v, (w, _) in adj[u].items():
+            if v == excluded:
+                continue
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heappush(frontier, (nd, v))
+    return dist
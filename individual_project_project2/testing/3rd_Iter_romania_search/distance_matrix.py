@@ -0,0 +1,245 @@
+"""
+All-pairs distance matrices with on-disk caching.
+
+Two kinds of dense (n, n) float64 matrices are produced for a CompiledGraph:
+
+  * euclidean_matrix: straight-line distances as one NumPy broadcast.
+  * road_distance_matrix: shortest road distances, either by vectorized
+    Floyd-Warshall (small maps) or by one Dijkstra per source spread over a
+    process pool (large maps).  Workers write their rows straight into the
+    output .npy memory map, so no rows are pickled back to the parent.
+
+distance_table() computes the rectangular sources x targets block only, with
+early-terminating Dijkstra runs or Contraction-Hierarchy buckets.
+
+cached_matrix() stores a matrix as a .npy file the first time and afterwards
+opens it with np.load(mmap_mode="r"), which is O(1): pages are only read when a
+row is actually used.  The matrix is built under a temporary name and renamed
+into place, and a <path>.key file next to it records what it was built from.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from search_engine import shortest_distances, shortest_path_tree
+
+# Above this many nodes Floyd-Warshall's O(n^3) loses to n Dijkstra runs
+FLOYD_WARSHALL_MAX_NODES = 512
+
+
+def euclidean_matrix(coords) -> np.ndarray:
+    """
+    Straight-line distance between every pair of points.
+
+    Args:
+        coords: (n, 2) array of coordinates.
+
+    Returns:
+        (n, n) float64 array.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    diff = coords[:, None, :] - coords[None, :, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+def floyd_warshall(graph) -> np.ndarray:
+    """
+    All-pairs road distances with Floyd-Warshall; every relaxation round is one
+    vectorized np.minimum over the whole matrix.
+
+    Returns:
+        (n, n) float64 array, inf where no road connects two nodes.
+    """
+    n = graph.num_nodes
+    dist = np.full((n, n), np.inf)
+    np.fill_diagonal(dist, 0.0)
+    sources = np.repeat(np.arange(n), np.diff(graph.offsets))
+    # np.minimum.at keeps the shortest of parallel edges
+    np.minimum.at(dist, (sources, graph.targets), graph.weights.astype(np.float64))
+    for k in range(n):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return dist
+
+
+# Worker state, installed once per process by _init_worker (inherited for free under fork)
+_worker_graph = None
+_worker_out = None
+
+
+def _init_worker(graph, out_path):
+    global _worker_graph, _worker_out
+    _worker_graph = graph
+    _worker_out = np.load(out_path, mmap_mode="r+") if out_path is not None else None
+
+
+def _dijkstra_rows(sources):
+    """Compute the rows of 'sources'; write them to the shared memmap if there is one."""
+    rows = np.array([shortest_distances(_worker_graph, s) for s in sources], dtype=np.float64)
+    if _worker_out is None:
+        return sources, rows
+    _worker_out[sources] = rows
+    _worker_out.flush()
+    return sources, None
+
+
+def road_distance_matrix(graph, workers: int = 1, path=None, method: str = "auto"):
+    """
+    All-pairs shortest road distances.
+
+    Args:
+        graph: CompiledGraph.
+        workers: processes used by the repeated-Dijkstra method (1 = in-process).
+        path: optional .npy file; when given, the matrix is written there and
+            returned as a read-only memory map.
+        method: "floyd_warshall", "dijkstra" or "auto" (Floyd-Warshall for small maps).
+
+    Returns:
+        (n, n) float64 array (np.memmap when 'path' is given).
+    """
+    n = graph.num_nodes
+    if method == "auto":
+        method = "floyd_warshall" if n <= FLOYD_WARSHALL_MAX_NODES else "dijkstra"
+    if method not in ("floyd_warshall", "dijkstra"):
+        raise ValueError(f"Unknown all-pairs method: {method}")
+
+    if method == "floyd_warshall":
+        dist = floyd_warshall(graph)
+        if path is None:
+            return dist
+        np.save(path, dist)
+        return np.load(path, mmap_mode="r")
+
+    if path is not None:
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(n, n))
+    else:
+        out = np.empty((n, n), dtype=np.float64)
+
+    if workers <= 1:
+        for s in range(n):
+            out[s] = shortest_distances(graph, s)
+    else:
+        if path is not None:
+            out.flush()
+            out = None  # workers write the rows themselves
+        chunk = max(1, n // (workers * 8))
+        chunks = [list(range(i, min(i + chunk, n))) for i in range(0, n, chunk)]
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(graph, path)) as pool:
+            for sources, rows in pool.imap_unordered(_dijkstra_rows, chunks):
+                if rows is not None:
+                    out[sources] = rows
+
+    if path is None:
+        return out
+    if out is not None:
+        out.flush()
+    return np.load(path, mmap_mode="r")
+
+
+def distance_table(graph, sources, targets, hierarchy=None, predecessors: bool = False):
+    """
+    Shortest road distances from every source to every target.
+
+    Without a hierarchy (or when predecessors are wanted) every source runs one
+    Dijkstra that stops as soon as all targets are settled; with a
+    ContractionHierarchy the table comes from its bucket-based many_to_many().
+
+    Args:
+        graph: CompiledGraph.
+        sources, targets: sequences of node ids.
+        hierarchy: optional ContractionHierarchy of 'graph'.
+        predecessors: also return the shortest-path tree of every source.
+
+    Returns:
+        (len(sources), len(targets)) float64 array, inf where unreachable; with
+        predecessors=True a tuple (table, pred) where pred[i] is the int64
+        predecessor array of sources[i]'s tree (-1 at the root and unreached nodes).
+    """
+    sources, targets = list(sources), list(targets)
+    if hierarchy is not None and not predecessors:
+        return hierarchy.many_to_many(sources, targets)
+    table = np.empty((len(sources), len(targets)), dtype=np.float64)
+    pred = np.empty((len(sources), graph.num_nodes), dtype=np.int64) if predecessors else None
+    for i, s in enumerate(sources):
+        dist, parent = shortest_path_tree(graph, s, targets)
+        table[i] = [dist[t] for t in targets]
+        if predecessors:
+            pred[i] = parent
+    return (table, pred) if predecessors else table
+
+
+def _load_cached(path, key, shape):
+    """The memory-mapped matrix at 'path' if it matches 'key' and 'shape', else None."""
+    try:
+        if key is not None:
+            with open(f"{path}.key", encoding="utf-8") as f:
+                if f.read() != key:
+                    return None
+        matrix = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):  # missing, truncated or not a .npy file
+        return None
+    if shape is not None and matrix.shape != tuple(shape):
+        return None
+    return matrix
+
+
+def _replace_atomically(path, write):
+    """Call write(tmp) on a temporary file in the directory of 'path', then rename it to 'path'."""
+    directory, name = os.path.split(os.path.abspath(path))
+    # Keep the extension: np.save appends ".npy" to names that lack it
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=f".tmp{os.path.splitext(name)[1]}", dir=directory)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)  # atomic on one file system
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def cached_matrix(path, builder, key: str = None, shape=None):
+    """
+    Return the matrix stored at 'path', building and saving it first if needed.
+
+    The cache is rebuilt when the file is missing or unreadable, when its shape
+    is not 'shape', or when 'key' differs from the one it was saved with.  A new
+    matrix is written under a temporary name and renamed over 'path', so a crash
+    never leaves a half-written cache behind.
+
+    Args:
+        path: .npy file.
+        builder: callable builder(out_path) returning the matrix when the cache is
+            cold; it may write the matrix to the .npy file 'out_path' itself and
+            return it as a memory map, or just return an array.
+        key: optional string describing the data (e.g. a graph fingerprint),
+            stored in <path>.key.
+        shape: optional expected shape.
+
+    Returns:
+        read-only np.memmap of the cached matrix.
+    """
+    matrix = _load_cached(path, key, shape)
+    if matrix is not None:
+        return matrix
+
+    def write_matrix(tmp):
+        matrix = builder(tmp)
+        if isinstance(matrix, np.memmap) and os.path.abspath(matrix.filename) == os.path.abspath(tmp):
+            matrix.flush()
+        else:
+            with open(tmp, "wb") as f:
+                np.save(f, np.asarray(matrix))
+
+    def write_key(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(key)
+
+    _replace_atomically(path, write_matrix)
+    if key is not None:
+        _replace_atomically(f"{path}.key", write_key)
+    return np.load(path, mmap_mode="r")
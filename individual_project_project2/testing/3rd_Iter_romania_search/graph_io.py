@@ -0,0 +1,362 @@
+"""
+Streaming loaders that build a CompiledGraph straight from files.
+
+Supported inputs:
+
+  * CSV: a coordinates file (``city,x,y``) and an edge file (``source,target,distance``).
+  * DIMACS shortest-path challenge files: ``.co`` (``v id x y``) and ``.gr`` (``a u v w``).
+  * A compact binary edge list written by save_binary() (see BINARY_MAGIC below).
+
+Every loader reads its input line by line (or chunk by chunk), interns node
+names once, and appends edges to flat typed arrays; there is never a
+``{city: {neighbor: distance}}`` dictionary in between.  The edges are then
+laid out as CSR with one stable NumPy sort.  Input is validated as it is read
+(unknown or duplicate nodes, missing or non-finite coordinates, negative or
+non-finite distances) and, once all edges are in, the graph is checked for
+symmetry: every road u -> v must have a matching v -> u of the same length.
+"""
+
+import csv
+import math
+from array import array
+
+import numpy as np
+
+from compiled_graph import CompiledGraph
+
+# Spelling variants of Romania city names used by the earlier iterations of the
+# assignment, mapped to the names used by SimpleProblemSolvingAgent.
+ROMANIA_ALIASES = {
+    "Dobreta": "Drobeta",
+    "Rimnicu Vilcea": "Rimnicu",
+}
+
+# Binary edge-list layout (all little-endian):
+#   magic (8 bytes) | n (uint64) | m (uint64) | names_size (uint64)
+#   names: names_size bytes of UTF-8, one name per line
+#   coords: n * (float64 x, float64 y)
+#   edges: m * (int32 source, int32 target, float64 distance)
+BINARY_MAGIC = b"RGRAPH1\0"
+_HEADER = np.dtype([("n", "<u8"), ("m", "<u8"), ("names_size", "<u8")])
+_EDGE = np.dtype([("source", "<i4"), ("target", "<i4"), ("distance", "<f8")])
+
+
+class GraphFormatError(ValueError):
+    """Raised when an input file is malformed or describes an invalid road graph."""
+
+
+class GraphBuilder:
+    """
+    Accumulates nodes and edges in typed arrays, then lays them out as CSR.
+
+    Args:
+        aliases: optional {alternative spelling: canonical name} applied to every name.
+        mirror: if True each edge is an undirected road and is stored in both
+            directions; if False the input lists both directions itself.
+        check_symmetry: verify that u -> v and v -> u exist with equal length.
+    """
+
+    def __init__(self, aliases: dict = None, mirror: bool = False, check_symmetry: bool = True):
+        self.aliases = aliases or {}
+        self.mirror = mirror
+        self.check_symmetry = check_symmetry
+        self.names = []
+        self.index = {}
+        self.xs = array("d")
+        self.ys = array("d")
+        self.sources = array("i")
+        self.targets = array("i")
+        self.distances = array("d")
+
+    def add_node(self, name: str, x: float, y: float, where: str = "") -> int:
+        """Intern a node with its coordinates; returns its id."""
+        name = self.aliases.get(name, name)
+        if name in self.index:
+            raise GraphFormatError(f"{where}duplicate node {name!r}")
+        if not (math.isfinite(x) and math.isfinite(y)):
+            raise GraphFormatError(f"{where}non-finite coordinates for {name!r}")
+        node = len(self.names)
+        self.index[name] = node
+        self.names.append(name)
+        self.xs.append(x)
+        self.ys.append(y)
+        return node
+
+    def node(self, name: str, where: str = "") -> int:
+        """Id of an already added node."""
+        node = self.index.get(self.aliases.get(name, name))
+        if node is None:
+            raise GraphFormatError(f"{where}no coordinates for node {name!r}")
+        return node
+
+    def add_edge(self, u: int, v: int, distance: float, where: str = ""):
+        """Append the road u -> v (and v -> u when mirroring)."""
+        if not (distance >= 0 and math.isfinite(distance)):
+            raise GraphFormatError(f"{where}invalid distance {distance!r}")
+        self.sources.append(u)
+        self.targets.append(v)
+        self.distances.append(distance)
+        if self.mirror:
+            self.sources.append(v)
+            self.targets.append(u)
+            self.distances.append(distance)
+
+    def build(self) -> CompiledGraph:
+        """Lay the collected edges out as a CompiledGraph."""
+        return compile_edges(
+            self.names,
+            np.frombuffer(self.sources, dtype=np.int32) if self.sources else np.zeros(0, np.int32),
+            np.frombuffer(self.targets, dtype=np.int32) if self.targets else np.zeros(0, np.int32),
+            np.frombuffer(self.distances, dtype=np.float64) if self.distances else np.zeros(0),
+            np.column_stack([np.frombuffer(self.xs), np.frombuffer(self.ys)]) if self.xs else np.zeros((0, 2)),
+            self.check_symmetry,
+        )
+
+
+def compile_edges(names, sources, targets, distances, coords, check_symmetry: bool = True) -> CompiledGraph:
+    """
+    Turn flat edge arrays into a CompiledGraph (CSR, edges grouped by source).
+
+    Distances that are all whole numbers are stored as integers.
+
+    Raises:
+        GraphFormatError: on out-of-range node ids or an asymmetric edge set.
+    """
+    n = len(names)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    distances = np.asarray(distances, dtype=np.float64)
+    if len(sources) and (sources.min() < 0 or targets.min() < 0 or max(sources.max(), targets.max()) >= n):
+        raise GraphFormatError("edge refers to a node id outside the node table")
+    if check_symmetry:
+        _check_symmetry(n, sources, targets, distances)
+
+    order = np.argsort(sources, kind="stable")  # keeps the input order of each node's roads
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    weights = distances[order]
+    if len(weights) and np.all(weights == np.round(weights)) and weights.max() < 2**53:
+        weights = weights.astype(np.int64)
+    return CompiledGraph(names, offsets, targets[order], weights, coords)
+
+
+def _check_symmetry(n: int, sources, targets, distances):
+    """Every u -> v edge must be matched by a v -> u edge of the same length."""
+    forward = sources * n + targets
+    backward = targets * n + sources
+    f = np.lexsort((distances, forward))
+    b = np.lexsort((distances, backward))
+    mismatch = (forward[f] != backward[b]) | (distances[f] != distances[b])
+    if mismatch.any():
+        e = f[np.argmax(mismatch)]
+        raise GraphFormatError(
+            f"asymmetric road: edge {int(sources[e])} -> {int(targets[e])} "
+            f"({distances[e]}) has no matching reverse edge"
+        )
+
+
+# -----------------------------------------------------------------------------
+# CSV
+# -----------------------------------------------------------------------------
+def load_csv(edges_path, coords_path, aliases: dict = None, mirror: bool = True, check_symmetry: bool = True):
+    """
+    Stream a road graph from CSV files.
+
+    Args:
+        edges_path: CSV with a header and columns source, target, distance.
+        coords_path: CSV with a header and columns city, x, y.
+        aliases: optional name spelling map (e.g. ROMANIA_ALIASES).
+        mirror: True if every road is listed once (undirected); False if both
+            directions are listed.
+        check_symmetry: verify the final edge set is symmetric.
+
+    Returns:
+        CompiledGraph
+    """
+    builder = GraphBuilder(aliases, mirror, check_symmetry)
+    with open(coords_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if not row:
+                continue
+            where = f"{coords_path}:{reader.line_num}: "
+            if len(row) != 3:
+                raise GraphFormatError(f"{where}expected city,x,y")
+            builder.add_node(row[0].strip(), _number(row[1], where), _number(row[2], where), where)
+    with open(edges_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if not row:
+                continue
+            where = f"{edges_path}:{reader.line_num}: "
+            if len(row) != 3:
+                raise GraphFormatError(f"{where}expected source,target,distance")
+            u = builder.node(row[0].strip(), where)
+            v = builder.node(row[1].strip(), where)
+            builder.add_edge(u, v, _number(row[2], where), where)
+    return builder.build()
+
+
+def _number(text: str, where: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        raise GraphFormatError(f"{where}not a number: {text!r}") from None
+
+
+def _integer(text: str, where: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        raise GraphFormatError(f"{where}not an integer: {text!r}") from None
+
+
+def _fields(parts: list, count: int, where: str) -> list:
+    """The first 'count' fields of a DIMACS line, which must have at least that many."""
+    if len(parts) < count:
+        raise GraphFormatError(f"{where}expected {count} fields, got {len(parts)}")
+    return parts[:count]
+
+
+# -----------------------------------------------------------------------------
+# DIMACS
+# -----------------------------------------------------------------------------
+def load_dimacs(gr_path, co_path, check_symmetry: bool = True):
+    """
+    Stream a DIMACS shortest-path graph (.gr arcs, .co coordinates).
+
+    Node names are the DIMACS ids as strings ("1" .. "n").  The "p" lines give
+    the sizes up front, so arcs are written straight into preallocated arrays.
+
+    Returns:
+        CompiledGraph
+    """
+    xs = ys = None
+    seen = None
+    with open(co_path, encoding="ascii") as f:
+        for line_no, line in enumerate(f, 1):
+            where = f"{co_path}:{line_no}: "
+            parts = line.split()
+            if not parts or parts[0] == "c":
+                continue
+            if parts[0] == "p":
+                _fields(parts, 2, where)
+                n = _integer(parts[-1], where)
+                xs, ys = np.full(n, np.nan), np.full(n, np.nan)
+                seen = np.zeros(n, dtype=bool)
+            elif parts[0] == "v":
+                if xs is None:
+                    raise GraphFormatError(f"{where}coordinate before the 'p' line")
+                _, node, x, y = _fields(parts, 4, where)
+                node = _integer(node, where) - 1
+                if not 0 <= node < len(xs):
+                    raise GraphFormatError(f"{where}node id {parts[1]} out of range")
+                if seen[node]:
+                    raise GraphFormatError(f"{where}duplicate coordinates for node {parts[1]}")
+                seen[node] = True
+                xs[node], ys[node] = _number(x, where), _number(y, where)
+            else:
+                raise GraphFormatError(f"{where}unexpected line type {parts[0]!r}")
+    if xs is None or not seen.all():
+        raise GraphFormatError(f"{co_path}: coordinates missing for some nodes")
+    if not (np.isfinite(xs).all() and np.isfinite(ys).all()):
+        raise GraphFormatError(f"{co_path}: non-finite coordinates")
+
+    n = len(xs)
+    sources = targets = distances = None
+    count = 0
+    with open(gr_path, encoding="ascii") as f:
+        for line_no, line in enumerate(f, 1):
+            where = f"{gr_path}:{line_no}: "
+            parts = line.split()
+            if not parts or parts[0] == "c":
+                continue
+            if parts[0] == "p":
+                _, _, nodes, arcs = _fields(parts, 4, where)
+                if _integer(nodes, where) != n:
+                    raise GraphFormatError(f"{where}{nodes} nodes, but {n} coordinates")
+                m = _integer(arcs, where)
+                sources = np.empty(m, dtype=np.int32)
+                targets = np.empty(m, dtype=np.int32)
+                distances = np.empty(m, dtype=np.float64)
+            elif parts[0] == "a":
+                if sources is None:
+                    raise GraphFormatError(f"{where}arc before the 'p' line")
+                if count == len(sources):
+                    raise GraphFormatError(f"{where}more arcs than announced")
+                _, u, v, w = _fields(parts, 4, where)
+                u, v, w = _integer(u, where) - 1, _integer(v, where) - 1, _number(w, where)
+                if not (0 <= u < n and 0 <= v < n):
+                    raise GraphFormatError(f"{where}arc endpoint out of range")
+                if not (w >= 0 and math.isfinite(w)):
+                    raise GraphFormatError(f"{where}invalid arc length {parts[3]}")
+                sources[count], targets[count], distances[count] = u, v, w
+                count += 1
+            else:
+                raise GraphFormatError(f"{where}unexpected line type {parts[0]!r}")
+    if sources is None:
+        raise GraphFormatError(f"{gr_path}: missing 'p' line")
+    if count != len(sources):
+        raise GraphFormatError(f"{gr_path}: {count} arcs, but {len(sources)} announced")
+
+    names = [str(i + 1) for i in range(n)]
+    return compile_edges(names, sources, targets, distances, np.column_stack([xs, ys]), check_symmetry)
+
+
+# -----------------------------------------------------------------------------
+# Compact binary edge list
+# -----------------------------------------------------------------------------
+def save_binary(graph: CompiledGraph, path):
+    """Write 'graph' as a compact binary edge list (see BINARY_MAGIC)."""
+    names = "\n".join(graph.names).encode("utf-8")
+    header = np.array([(graph.num_nodes, graph.num_edges, len(names))], dtype=_HEADER)
+    edges = np.empty(graph.num_edges, dtype=_EDGE)
+    edges["source"] = np.repeat(np.arange(graph.num_nodes), np.diff(graph.offsets))
+    edges["target"] = graph.targets
+    edges["distance"] = graph.weights
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(header.tobytes())
+        f.write(names)
+        f.write(np.ascontiguousarray(graph.coords, dtype="<f8").tobytes())
+        f.write(edges.tobytes())
+
+
+def load_binary(path, check_symmetry: bool = True, chunk_edges: int = 1 << 20):
+    """
+    Read a binary edge list written by save_binary(), 'chunk_edges' records at a time.
+
+    Returns:
+        CompiledGraph
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise GraphFormatError(f"{path}: not a binary road graph")
+        header = np.frombuffer(f.read(_HEADER.itemsize), dtype=_HEADER)[0]
+        n, m, names_size = int(header["n"]), int(header["m"]), int(header["names_size"])
+        names = f.read(names_size).decode("utf-8").split("\n") if n else []
+        if len(names) != n:
+            raise GraphFormatError(f"{path}: name table has {len(names)} entries, expected {n}")
+        coords = np.frombuffer(f.read(16 * n), dtype="<f8").reshape(n, 2)
+        if not np.isfinite(coords).all():
+            raise GraphFormatError(f"{path}: non-finite coordinates")
+
+        sources = np.empty(m, dtype=np.int32)
+        targets = np.empty(m, dtype=np.int32)
+        distances = np.empty(m, dtype=np.float64)
+        done = 0
+        while done < m:
+            want = min(chunk_edges, m - done)
+            chunk = np.frombuffer(f.read(want * _EDGE.itemsize), dtype=_EDGE)
+            if len(chunk) != want:
+                raise GraphFormatError(f"{path}: truncated edge list")
+            w = chunk["distance"]
+            if not (np.isfinite(w).all() and (w >= 0).all()):
+                raise GraphFormatError(f"{path}: invalid distance in edge list")
+            sources[done:done + want] = chunk["source"]
+            targets[done:done + want] = chunk["target"]
+            distances[done:done + want] = w
+            done += want
+    return compile_edges(names, sources, targets, distances, coords, check_symmetry)
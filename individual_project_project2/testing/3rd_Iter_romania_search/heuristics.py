@@ -0,0 +1,133 @@
+"""
+Heuristic tables for the informed searches of SimpleProblemSolvingAgent.
+
+Two kinds of admissible lower bounds are provided:
+
+  * euclidean_table(graph, goal): the straight-line distance from every node to
+    'goal', computed as one vectorized NumPy pass when a query starts, so the
+    search loop only does a list lookup per heuristic evaluation.
+
+  * LandmarkTable (ALT = A*, Landmarks, Triangle inequality): exact road distances
+    from k landmark nodes, computed offline with Dijkstra and stored on disk.
+    For an undirected graph the triangle inequality gives
+        d(v, t) >= |d(L, t) - d(L, v)|
+    for every landmark L, which is usually far tighter than the straight line.
+"""
+
+import numpy as np
+
+from search_engine import shortest_distances
+
+
+def euclidean_table(graph, goal: int) -> np.ndarray:
+    """
+    Straight-line distance from every node of 'graph' to node 'goal'.
+
+    Returns:
+        float64 array of length graph.num_nodes.
+    """
+    coords = graph.coords
+    return np.hypot(coords[:, 0] - coords[goal, 0], coords[:, 1] - coords[goal, 1])
+
+
+def straight_line_scale(graph) -> float:
+    """
+    Largest factor c <= 1 with length >= c * straight-line distance on every edge.
+
+    c times the straight-line distance is a consistent heuristic (triangle
+    inequality), so A* and LPA* stay optimal on maps where some roads are
+    shorter than the line between their ends.
+    """
+    coords = graph.coords
+    sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.offsets))
+    straight = np.hypot(*(coords[sources] - coords[graph.targets]).T)
+    weights = np.asarray(graph.weights, dtype=np.float64)
+    mask = straight > 0
+    if not mask.any():
+        return 1.0
+    return float(min(1.0, (weights[mask] / straight[mask]).min()))
+
+
+class LandmarkTable:
+    """
+    Distances from k landmarks to every node, used as an ALT lower bound.
+
+    Attributes:
+        landmarks: int array of landmark node ids.
+        distances: (k, n) float64 array; distances[i, v] = d(landmarks[i], v).
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        if self.distances.shape[0] != len(self.landmarks):
+            raise ValueError("Need one distance row per landmark")
+
+    @classmethod
+    def build(cls, graph, k: int = 4, first: int = 0):
+        """
+        Choose k landmarks by farthest-point selection and run Dijkstra from each.
+
+        The first landmark is 'first'; every next landmark is the node whose
+        distance to the closest landmark chosen so far is largest, which spreads
+        landmarks towards the borders of the map where they give the best bounds.
+
+        Args:
+            graph: CompiledGraph (undirected).
+            k: number of landmarks (capped at the number of nodes).
+            first: node id of the first landmark.
+
+        Returns:
+            LandmarkTable
+        """
+        k = min(k, graph.num_nodes)
+        landmarks = [first]
+        rows = [shortest_distances(graph, first)]
+        closest = np.array(rows[0], dtype=np.float64)
+        while len(landmarks) < k:
+            # Unreachable nodes have no useful bound from the chosen landmarks; prefer them first
+            candidate = np.where(np.isinf(closest), np.finfo(np.float64).max, closest)
+            candidate[landmarks] = -1.0
+            nxt = int(np.argmax(candidate))
+            landmarks.append(nxt)
+            rows.append(shortest_distances(graph, nxt))
+            closest = np.minimum(closest, np.array(rows[-1], dtype=np.float64))
+        return cls(landmarks, rows)
+
+    def save(self, path):
+        """Store the table as a .npz file."""
+        np.savez(path, landmarks=self.landmarks, distances=self.distances)
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Load a table written by save().
+
+        Args:
+            path: .npz file path.
+            graph: optional CompiledGraph the table must match.
+
+        Raises:
+            ValueError: if the table was built for a graph with a different node count.
+        """
+        with np.load(path) as data:
+            table = cls(data["landmarks"], data["distances"])
+        if graph is not None and table.distances.shape[1] != graph.num_nodes:
+            raise ValueError(
+                f"Landmark table has {table.distances.shape[1]} nodes, graph has {graph.num_nodes}"
+            )
+        return table
+
+    def lower_bounds(self, goal: int) -> np.ndarray:
+        """
+        ALT lower bound on d(v, goal) for every node v, as one vectorized pass.
+
+        Returns:
+            float64 array of length n (0 where no landmark gives a finite bound).
+        """
+        d = self.distances
+        to_goal = d[:, goal][:, None]
+        with np.errstate(invalid="ignore"):
+            diff = np.abs(to_goal - d)
+        diff[~(np.isfinite(d) & np.isfinite(to_goal))] = 0.0
+        return diff.max(axis=0)
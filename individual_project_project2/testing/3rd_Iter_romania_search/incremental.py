@@ -0,0 +1,168 @@
+"""
+Lifelong Planning A* (LPA*) for repeated queries on a map whose road lengths change.
+
+LPA* keeps, for every node it has touched, two cost estimates:
+
+    g(v)    cost of the best path to v found by the previous search
+    rhs(v)  one-step lookahead: min over incoming edges (u, v) of g(u) + c(u, v)
+
+A node is consistent when g(v) == rhs(v).  The search expands only inconsistent
+nodes, in order of the A* key [min(g, rhs) + h(v), min(g, rhs)], and stops
+once the goal is consistent and no queued key is smaller than the goal's.  The
+first search is an ordinary A*; after an edge changes, only its head becomes
+inconsistent and the repair expands just the part of the tree whose costs are
+actually affected, instead of searching from scratch.
+
+The heuristic must be consistent for the graph's current lengths; the
+straight-line distance is, as long as no road is shorter than the straight line
+between its ends.
+"""
+
+from heapq import heappop, heappush
+
+from search_engine import INF, SearchStats, hook_callbacks
+
+
+class LPAStar:
+    """
+    Incremental shortest-path planner between a fixed start and goal.
+
+    Attributes:
+        graph: CompiledGraph searched (its weights may change between calls).
+        start, goal: node ids.
+        stats: SearchStats of the last compute_shortest_path() call.
+    """
+
+    def __init__(self, graph, start: int, goal: int, h):
+        """
+        Args:
+            graph: CompiledGraph.
+            start, goal: node ids.
+            h: consistent heuristic h(node_id) -> estimated cost to 'goal'.
+        """
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.h = h
+        self.g = {}
+        self.rhs = {start: 0}
+        self._queued = {}  # node -> key of its live heap entry
+        self._heap = []
+        self._pushes = 0
+        self._on_pop = self._on_push = None  # callbacks of the running compute_shortest_path
+        self.stats = SearchStats()
+        self._push(start)
+
+    def _key(self, v):
+        m = min(self.g.get(v, INF), self.rhs.get(v, INF))
+        return (m + self.h(v), m)
+
+    def _push(self, v):
+        key = self._key(v)
+        self._queued[v] = key
+        heappush(self._heap, (key, v))
+        self._pushes += 1
+        if self._on_push is not None:
+            self._on_push(v, key[0], key[1])
+
+    def _update_vertex(self, v):
+        """Recompute rhs(v) from its in-edges and (re)queue v if it is inconsistent."""
+        if v != self.start:
+            in_offsets, in_edges, sources = self.graph.in_edges
+            weights = self.graph.weights_list
+            g = self.g
+            best = INF
+            for i in range(in_offsets[v], in_offsets[v + 1]):
+                e = in_edges[i]
+                cost = g.get(sources[e], INF) + weights[e]
+                if cost < best:
+                    best = cost
+            self.rhs[v] = best
+        self._queued.pop(v, None)  # its heap entry, if any, is now stale
+        if self.g.get(v, INF) != self.rhs.get(v, INF):
+            self._push(v)
+
+    def _top_key(self):
+        heap, queued = self._heap, self._queued
+        while heap:
+            key, v = heap[0]
+            if queued.get(v) == key:
+                return key
+            heappop(heap)  # stale
+            if self._on_pop is not None:
+                self._on_pop(v, key[0], key[1], True)
+        return (INF, INF)
+
+    def edge_changed(self, u: int, v: int):
+        """Tell the planner that the length of the edge u -> v has changed."""
+        self._update_vertex(v)
+
+    def compute_shortest_path(self, hooks=None):
+        """
+        Expand inconsistent nodes until the goal's cost is settled.
+
+        Args:
+            hooks: optional object with on_pop/on_expand/on_push callbacks (a SearchEngine).
+
+        Returns:
+            (path_ids, cost) or ([], inf) when the goal is unreachable.
+        """
+        offsets, targets = self.graph.offsets_list, self.graph.targets_list
+        g, rhs, goal = self.g, self.rhs, self.goal
+        self._on_pop, on_expand, self._on_push = hook_callbacks(hooks)
+        expanded = 0
+        self._pushes = 0
+        peak = len(self._queued)
+        while True:
+            top = self._top_key()
+            goal_key = self._key(goal)
+            if not (top < goal_key or rhs.get(goal, INF) != g.get(goal, INF)):
+                break
+            if top == (INF, INF):
+                break
+            key, u = heappop(self._heap)
+            del self._queued[u]
+            expanded += 1
+            if self._on_pop is not None:
+                self._on_pop(u, key[0], key[1], False)
+            if on_expand is not None:
+                on_expand(u, key[1], len(self._queued))
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]  # over-consistent: settle it
+                for e in range(offsets[u], offsets[u + 1]):
+                    self._update_vertex(targets[e])
+            else:
+                g[u] = INF  # under-consistent: a road on its path got longer
+                self._update_vertex(u)
+                for e in range(offsets[u], offsets[u + 1]):
+                    self._update_vertex(targets[e])
+            if len(self._queued) > peak:
+                peak = len(self._queued)
+        self.stats = SearchStats(expanded, self._pushes, peak)
+        self._on_pop = self._on_push = None
+        return self.path()
+
+    def path(self):
+        """Current best path, walking back from the goal over the cheapest in-edges."""
+        cost = self.g.get(self.goal, INF)
+        if cost == INF:
+            return [], INF
+        in_offsets, in_edges, sources = self.graph.in_edges
+        weights = self.graph.weights_list
+        g = self.g
+        path = [self.goal]
+        v = self.goal
+        while v != self.start:
+            if len(path) > self.graph.num_nodes:
+                raise RuntimeError("Parent walk did not reach the start (zero-length cycle)")
+            best, best_u = INF, -1
+            for i in range(in_offsets[v], in_offsets[v + 1]):
+                e = in_edges[i]
+                u = sources[e]
+                c = g.get(u, INF) + weights[e]
+                if c < best:
+                    best, best_u = c, u
+            v = best_u
+            path.append(v)
+        path.reverse()
+        return path, cost
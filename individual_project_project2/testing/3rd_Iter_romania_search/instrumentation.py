@@ -0,0 +1,389 @@
+"""
+Optional per-query instrumentation for SimpleProblemSolvingAgent.
+
+A SearchTracer collects one QueryTrace per search call: the algorithm, the
+city pair, whether the route cache answered it, counters (expansions,
+frontier pushes and pops, stale pops, heuristic evaluations, re-openings,
+peak frontier) and the wall time of every phase of the query:
+
+    cache     route-cache lookup
+    setup     everything before the search loop (heuristic tables, hierarchy build, ...)
+    search    the best-first search loop itself
+    path      rebuilding the path from the parent pointers
+
+Tracing costs almost nothing while it is off: the agent then runs the plain
+SearchEngine, whose callbacks are None.  enable_tracing() swaps in a
+TracedEngine, a SearchEngine subclass whose callbacks feed the tracer and call
+the optional on_expand/on_push/on_pop callbacks of the tracer.
+
+Traces export to plain JSON (to_dict/save_json) and to the Chrome trace event
+format (chrome_trace/save_chrome_trace), which chrome://tracing and Perfetto
+open directly: every query and phase becomes a duration slice and, when
+record_events=True, every expansion an instant event plus a frontier-size
+counter track.
+"""
+
+import functools
+import json
+import time
+from collections import deque
+
+from search_engine import INF, SearchEngine
+
+COUNTERS = ("expanded", "pushes", "pops", "stale_pops", "heuristic_evals", "reopened", "peak_frontier")
+
+
+class QueryTrace:
+    """
+    Everything recorded about one search call.
+
+    Attributes:
+        algorithm, start, goal: the query.
+        cache: "hit", "miss" or None when no route cache is enabled.
+        cost, path_length: the answer (filled in when the query ends).
+        counters: dict of COUNTERS.
+        phases: list of (name, start_ns, duration_ns) relative to the tracer's epoch.
+        events: list of (kind, time_ns, node_name, g, frontier_size) when events are recorded.
+        depth: nesting level (a query issued from inside another one has depth 1, ...).
+    """
+
+    __slots__ = (
+        "algorithm", "start", "goal", "cache", "cost", "path_length",
+        "counters", "phases", "events", "depth", "began_ns", "ended_ns",
+    )
+
+    def __init__(self, algorithm: str, start, goal, began_ns: int, depth: int = 0):
+        self.algorithm = algorithm
+        self.start = start
+        self.goal = goal
+        self.cache = None
+        self.cost = None
+        self.path_length = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.phases = []
+        self.events = []
+        self.depth = depth
+        self.began_ns = began_ns
+        self.ended_ns = None
+
+    @property
+    def wall_ms(self) -> float:
+        end = self.ended_ns if self.ended_ns is not None else self.began_ns
+        return (end - self.began_ns) / 1e6
+
+    def phase_ms(self) -> dict:
+        """Total wall time per phase name, in milliseconds."""
+        totals = {}
+        for name, _, duration in self.phases:
+            totals[name] = totals.get(name, 0.0) + duration / 1e6
+        return totals
+
+    def as_dict(self) -> dict:
+        result = {
+            "algorithm": self.algorithm,
+            "start": self.start,
+            "goal": self.goal,
+            "cache": self.cache,
+            "cost": None if self.cost is None or self.cost == INF else self.cost,
+            "path_length": self.path_length,
+            "wall_ms": self.wall_ms,
+            "phases_ms": self.phase_ms(),
+            "counters": dict(self.counters),
+            "depth": self.depth,
+        }
+        if self.events:
+            result["events"] = [
+                {"kind": kind, "t_us": t / 1e3, "node": node, "g": g, "frontier": size}
+                for kind, t, node, g, size in self.events
+            ]
+        return result
+
+
+class SearchTracer:
+    """
+    Collects QueryTraces and forwards search events to optional callbacks.
+
+    Args:
+        record_events: keep a per-expansion event list in every trace (needed for the
+            Chrome-trace instant events and frontier counter track).
+        max_events: events kept per query when record_events is on.
+        max_queries: traces kept; the oldest are dropped first (None = unbounded).
+        on_expand: callback(node_name, g) for every expanded node.
+        on_push: callback(node_name, key, g) for every frontier insertion.
+        on_pop: callback(node_name, key, g) for every frontier removal (stale ones included).
+        clock: nanosecond clock, time.perf_counter_ns by default.
+    """
+
+    def __init__(
+        self,
+        record_events: bool = False,
+        max_events: int = 100_000,
+        max_queries: int = 10_000,
+        on_expand=None,
+        on_push=None,
+        on_pop=None,
+        clock=time.perf_counter_ns,
+    ):
+        self.record_events = record_events
+        self.max_events = max_events
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_pop = on_pop
+        self._clock = clock
+        self.epoch = clock()
+        self.queries = deque(maxlen=max_queries)
+        self._stack = []  # queries in progress, innermost last
+
+    def now(self) -> int:
+        return self._clock() - self.epoch
+
+    @property
+    def current(self):
+        """The innermost query in progress, or None."""
+        return self._stack[-1] if self._stack else None
+
+    def begin_query(self, algorithm: str, start, goal) -> QueryTrace:
+        trace = QueryTrace(algorithm, start, goal, self.now(), depth=len(self._stack))
+        self._stack.append(trace)
+        return trace
+
+    def end_query(self, path, cost):
+        trace = self._stack.pop()
+        trace.ended_ns = self.now()
+        trace.cost = cost
+        trace.path_length = len(path)
+        self.queries.append(trace)
+        return trace
+
+    def abort_query(self, exc: BaseException):
+        """Close the innermost query after its search raised."""
+        trace = self._stack.pop()
+        trace.ended_ns = self.now()
+        trace.cache = trace.cache or f"error: {type(exc).__name__}"
+        self.queries.append(trace)
+
+    def add_phase(self, name: str, began_ns: int, ended_ns: int = None):
+        """Record a phase of the current query (no-op outside a query)."""
+        trace = self.current
+        if trace is None:
+            return
+        if ended_ns is None:
+            ended_ns = self.now()
+        trace.phases.append((name, began_ns, ended_ns - began_ns))
+
+    def add_counters(self, **counts):
+        trace = self.current
+        if trace is None:
+            return
+        counters = trace.counters
+        for name, value in counts.items():
+            if name == "peak_frontier":
+                counters[name] = max(counters[name], value)
+            else:
+                counters[name] += value
+
+    def clear(self):
+        self.queries.clear()
+
+    def slowest(self, n: int = 10) -> list:
+        """The n finished queries with the largest wall time."""
+        return sorted(self.queries, key=lambda q: q.wall_ms, reverse=True)[:n]
+
+    # -- export -----------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {"queries": [q.as_dict() for q in self.queries]}
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def chrome_trace(self, pid: int = 0, tid: int = 0) -> dict:
+        """
+        The traces as a Chrome trace-event document ({"traceEvents": [...]}).
+
+        Times are microseconds since the tracer was created.
+        """
+        events = []
+        for q in self.queries:
+            name = f"{q.algorithm} {q.start} → {q.goal}"
+            args = {
+                "cache": q.cache,
+                "cost": None if q.cost is None or q.cost == INF else q.cost,
+                "path_length": q.path_length,
+                **q.counters,
+            }
+            events.append(_complete(name, "query", q.began_ns, q.ended_ns - q.began_ns, pid, tid, args))
+            for phase, began, duration in q.phases:
+                events.append(_complete(phase, "phase", began, duration, pid, tid, {}))
+            for kind, t, node, g, size in q.events:
+                events.append(
+                    {"name": kind, "cat": "event", "ph": "i", "s": "t", "ts": t / 1e3,
+                     "pid": pid, "tid": tid, "args": {"node": node, "g": g}}
+                )
+                events.append(
+                    {"name": "frontier", "ph": "C", "ts": t / 1e3, "pid": pid, "tid": tid,
+                     "args": {"size": size}}
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _complete(name, category, began_ns, duration_ns, pid, tid, args) -> dict:
+    return {
+        "name": name, "cat": category, "ph": "X", "ts": began_ns / 1e3,
+        "dur": duration_ns / 1e3, "pid": pid, "tid": tid, "args": args,
+    }
+
+
+class TracedEngine(SearchEngine):
+    """
+    SearchEngine that reports to a SearchTracer through the engine callbacks.
+
+    The search loops are the SearchEngine ones; this engine installs its own
+    on_pop/on_expand/on_push callbacks, which count into the current QueryTrace,
+    record events and forward to the tracer's callbacks with city names.  The
+    agent hands the engine as 'hooks' to its other searches (hill climbing,
+    annealing, ARA*, Yen, LPA*), so they are counted the same way.  Annealing
+    chains run in worker processes are not counted.
+    """
+
+    def __init__(self, graph, tracer: SearchTracer):
+        super().__init__(graph, on_pop=self._pop, on_expand=self._expand, on_push=self._push)
+        self.tracer = tracer
+        self._closed, self._closed_trace = set(), None  # nodes expanded in that trace
+        self._search_began = None  # start of the running engine search, until its path phase
+
+    # Every query ends by assigning self.stats (ch_search assigns the hierarchy's),
+    # which is where the query's peak frontier reaches the tracer.
+    @property
+    def stats(self):
+        return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+        tracer = getattr(self, "tracer", None)
+        if tracer is not None and value.expanded:
+            trace = tracer.current
+            if trace is not None and not trace.counters["expanded"]:
+                # Searches without callbacks (ch_search) only report totals
+                tracer.add_counters(expanded=value.expanded, pushes=value.pushes)
+            tracer.add_counters(peak_frontier=value.peak_frontier)
+
+    def _pop(self, u, key, g, stale):
+        tracer = self.tracer
+        trace = tracer.current
+        if trace is not None:
+            trace.counters["pops"] += 1
+            if stale:
+                trace.counters["stale_pops"] += 1
+        if tracer.on_pop is not None:
+            tracer.on_pop(self.graph.names[u], key, g)
+
+    def _expand(self, u, g, frontier_size):
+        tracer = self.tracer
+        trace = tracer.current
+        if trace is not None:
+            counters = trace.counters
+            counters["expanded"] += 1
+            if trace is not self._closed_trace:
+                self._closed, self._closed_trace = set(), trace
+            if u in self._closed:
+                counters["reopened"] += 1
+            else:
+                self._closed.add(u)
+            if frontier_size > counters["peak_frontier"]:
+                counters["peak_frontier"] = frontier_size
+            if tracer.record_events and len(trace.events) < tracer.max_events:
+                trace.events.append(("expand", tracer.now(), self.graph.names[u], g, frontier_size))
+        if tracer.on_expand is not None:
+            tracer.on_expand(self.graph.names[u], g)
+
+    def _push(self, v, key, g):
+        tracer = self.tracer
+        trace = tracer.current
+        if trace is not None:
+            trace.counters["pushes"] += 1
+        if tracer.on_push is not None:
+            tracer.on_push(self.graph.names[v], key, g)
+
+    def watch_heuristic(self, h):
+        """h, counting its evaluations in the current query."""
+        trace = self.tracer.current
+        if trace is None:
+            return h
+        counters = trace.counters
+
+        def counted(v):
+            counters["heuristic_evals"] += 1
+            return h(v)
+
+        return counted
+
+    def _phased(self, search, *args):
+        """Run an engine search, recording its setup and search phases."""
+        tracer = self.tracer
+        began = tracer.now()
+        if tracer.current is not None:
+            tracer.add_phase("setup", tracer.current.began_ns, began)
+        self._search_began = began
+        try:
+            return search(*args)
+        finally:
+            if self._search_began is not None:  # no path was rebuilt
+                tracer.add_phase("search", began)
+                self._search_began = None
+
+    def path_to(self, goal: int) -> list:
+        began = self._search_began
+        if began is None:
+            return super().path_to(goal)
+        tracer = self.tracer
+        t = tracer.now()
+        tracer.add_phase("search", began, t)
+        self._search_began = None
+        path = super().path_to(goal)
+        tracer.add_phase("path", t)
+        return path
+
+    def best_first(self, start: int, goal: int, h, weight: float = 1):
+        return self._phased(super().best_first, start, goal, h, weight)
+
+    def greedy(self, start: int, goal: int, h):
+        return self._phased(super().greedy, start, goal, h)
+
+    def bidirectional(self, start: int, goal: int, potential=None):
+        return self._phased(super().bidirectional, start, goal, potential)
+
+
+def traced_query(method):
+    """
+    Decorator for agent search methods ``method(self, start, goal, ...)`` that are not
+    behind cached_search (which traces the others): while ``self.tracer`` is set, every
+    call is recorded as a QueryTrace.  The method returns (path, cost) or a list of
+    them, cheapest first, which the trace summarizes by the first one.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, start, goal, *args, **kwargs):
+        tracer = self.tracer
+        if tracer is None:
+            return method(self, start, goal, *args, **kwargs)
+        tracer.begin_query(method.__name__, start, goal)
+        try:
+            result = method(self, start, goal, *args, **kwargs)
+        except BaseException as exc:
+            tracer.abort_query(exc)
+            raise
+        if isinstance(result, list):
+            path, cost = result[0] if result else ([], INF)
+        else:
+            path, cost = result
+        tracer.end_query(path, cost)
+        return result
+
+    return wrapper
@@ -0,0 +1,133 @@
+"""
+K shortest loopless paths (Yen's algorithm) over a CompiledGraph.
+
+Yen's algorithm builds the k-th path from the (k-1)-th: for every node of the
+previous path (the spur node) it keeps the prefix up to that node, forbids the
+edges already used by earlier paths with the same prefix and the prefix nodes
+themselves, and searches a spur path from the spur node to the goal.  The
+cheapest candidate not yet taken becomes the next path.
+
+All spur searches share one Dijkstra tree grown backwards from the goal
+(road maps are undirected, so it is an ordinary tree rooted at the goal):
+
+  * its distances are the exact cost-to-goal without restrictions, hence an
+    admissible - and usually very tight - A* heuristic for every spur search;
+  * when the tree path from the spur node avoids everything forbidden, it is
+    already the shortest spur path and no search is needed at all.
+"""
+
+from heapq import heappop, heappush
+
+from search_engine import INF, hook_callbacks, shortest_path_tree
+
+
+def k_shortest_paths(graph, start: int, goal: int, k: int, hooks=None) -> list:
+    """
+    The k cheapest loopless paths from 'start' to 'goal'.
+
+    Args:
+        graph: CompiledGraph of an undirected road map.
+        k: number of paths wanted.
+        hooks: optional object with on_pop/on_expand/on_push callbacks (a SearchEngine).
+
+    Returns:
+        list of (path_ids, cost), cheapest first; shorter than k when fewer
+        loopless paths exist.
+    """
+    if k <= 0:
+        return []
+    to_goal, next_hop = shortest_path_tree(graph, goal, hooks=hooks)
+    if to_goal[start] == INF:
+        return []
+    if start == goal:
+        return [([start], 0)]
+
+    first = _tree_path(next_hop, start)
+    found = [(first, to_goal[start])]
+    candidates = []  # heap of (cost, path tuple)
+    seen = {tuple(first)}
+
+    while len(found) < k:
+        last, _ = found[-1]
+        root_cost = 0
+        for i in range(len(last) - 1):
+            spur = last[i]
+            root = last[: i + 1]
+            banned_edges = {p[i + 1] for p, _ in found if len(p) > i + 1 and p[: i + 1] == root}
+            banned_nodes = set(root[:-1])
+            spur_path, spur_cost = _spur_search(
+                graph, spur, goal, to_goal, next_hop, banned_nodes, banned_edges, hooks
+            )
+            if spur_path:
+                path = root[:-1] + spur_path
+                key = tuple(path)
+                if key not in seen:
+                    seen.add(key)
+                    heappush(candidates, (root_cost + spur_cost, key))
+            root_cost += graph.edge_weight(spur, last[i + 1])
+        if not candidates:
+            break
+        cost, path = heappop(candidates)
+        found.append((list(path), cost))
+    return found
+
+
+def _tree_path(next_hop, u: int) -> list:
+    """Follow the goal-rooted tree from u to the goal."""
+    path = [u]
+    while next_hop[u] != -1:
+        u = next_hop[u]
+        path.append(u)
+    return path
+
+
+def _spur_search(graph, spur: int, goal: int, to_goal, next_hop, banned_nodes, banned_edges, hooks=None):
+    """
+    Cheapest spur -> goal path avoiding 'banned_nodes' and the first edges spur -> v
+    for v in 'banned_edges', with the goal-tree distances as heuristic.
+
+    Returns:
+        (path_ids, cost) or ([], inf).
+    """
+    # The tree path is optimal whenever it is allowed
+    hop = next_hop[spur]
+    if hop != -1 and hop not in banned_edges:
+        path = _tree_path(next_hop, spur)
+        if banned_nodes.isdisjoint(path):
+            return path, to_goal[spur]
+
+    offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+    on_pop, on_expand, on_push = hook_callbacks(hooks)
+    g = {spur: 0}
+    parent = {spur: -1}
+    frontier = [(to_goal[spur], 0, spur)]
+    if on_push is not None:
+        on_push(spur, to_goal[spur], 0)
+    while frontier:
+        key, cost, u = heappop(frontier)
+        stale = cost > g[u]
+        if on_pop is not None:
+            on_pop(u, key, cost, stale)
+        if stale:
+            continue
+        if u == goal:
+            path = [goal]
+            while parent[u] != -1:
+                u = parent[u]
+                path.append(u)
+            path.reverse()
+            return path, cost
+        if on_expand is not None:
+            on_expand(u, cost, len(frontier))
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if v in banned_nodes or (u == spur and v in banned_edges):
+                continue
+            new_cost = cost + weights[e]
+            if new_cost < g.get(v, INF):
+                g[v] = new_cost
+                parent[v] = u
+                heappush(frontier, (new_cost + to_goal[v], new_cost, v))
+                if on_push is not None:
+                    on_push(v, new_cost + to_goal[v], new_cost)
+    return [], INF
@@ -0,0 +1,40 @@
+"""
+Incremental state for the local-search methods (hill climbing, annealing).
+
+Re-summing a whole path after every move, and checking "node not in path" with
+a linear scan of a list, make every local-search step O(path length).
+PathState keeps the running cost, an O(1) membership set and an append-only
+path buffer, so extending the path by one road is O(1) regardless of length.
+"""
+
+
+class PathState:
+    """
+    A partial path grown one edge at a time.
+
+    Attributes:
+        path: node ids in visiting order (append-only).
+        visited: set of the same ids, for O(1) "already on the path" checks.
+        cost: running sum of the edge weights along path.
+    """
+
+    __slots__ = ("path", "visited", "cost")
+
+    def __init__(self, start: int):
+        self.path = [start]
+        self.visited = {start}
+        self.cost = 0
+
+    @property
+    def head(self) -> int:
+        """The node the path currently ends at."""
+        return self.path[-1]
+
+    def extend(self, node: int, weight):
+        """Append 'node', reached over an edge of length 'weight'."""
+        self.path.append(node)
+        self.visited.add(node)
+        self.cost += weight
+
+    def __len__(self):
+        return len(self.path)
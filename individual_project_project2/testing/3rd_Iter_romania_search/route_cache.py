@@ -0,0 +1,153 @@
+"""
+Bounded LRU/TTL cache for route search results.
+
+Entries are keyed by (algorithm, start, goal, parameters) and tagged with the
+version stamp of the graph they were computed on; as soon as a lookup comes
+in with a different version the whole cache is dropped, so results never
+outlive an edge-weight change.
+
+Exact shortest-path algorithms give the same cost in both directions on an
+undirected road map, so their entries are stored under the unordered city
+pair and an A -> B answer also serves B -> A (with the path reversed).
+Direction-dependent methods (greedy, hill climbing, annealing) are cached per
+direction.
+"""
+
+import functools
+import time
+from collections import OrderedDict
+
+
+class RouteCache:
+    """
+    Least-recently-used cache with an optional time-to-live per entry.
+
+    Attributes:
+        maxsize: maximum number of entries kept.
+        ttl: seconds an entry stays valid (None = forever).
+        hits, misses, evictions, expirations, invalidations: counters.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self.version = None  # graph version the entries belong to
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Return the cached value for 'key' or None (a miss)."""
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, version):
+        """Store 'value', evicting the least recently used entry when full."""
+        self._check_version(version)
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def cached_search(symmetric: bool = False):
+    """
+    Decorator for agent search methods ``method(self, start, goal, *args, **kwargs)``.
+
+    Uses ``self.cache`` (a RouteCache, or None to bypass caching) and the version
+    stamp of ``self.compiled``; when ``self.tracer`` is a SearchTracer every call
+    is also recorded as a query trace.
+
+    Args:
+        symmetric: True if the method is an exact shortest-path search, so a
+            B -> A query can be answered by reversing a cached A -> B result.
+    """
+
+    def decorate(method):
+        name = method.__name__
+
+        def lookup(self, start, goal, args, kwargs, tracer):
+            cache = self.cache
+            if cache is None:
+                return method(self, start, goal, *args, **kwargs)
+            params = (args, tuple(sorted(kwargs.items())))
+            reverse = symmetric and goal < start
+            key = (name, goal, start, params) if reverse else (name, start, goal, params)
+            version = self.compiled.version
+            if tracer is None:
+                hit = cache.get(key, version)
+            else:
+                began = tracer.now()
+                hit = cache.get(key, version)
+                tracer.add_phase("cache", began)
+                tracer.current.cache = "miss" if hit is None else "hit"
+            if hit is not None:
+                path, cost = hit
+                return (list(reversed(path)) if reverse else list(path)), cost
+            path, cost = method(self, start, goal, *args, **kwargs)
+            stored = tuple(reversed(path)) if reverse else tuple(path)
+            cache.put(key, (stored, cost), version)
+            return list(path), cost
+
+        @functools.wraps(method)
+        def wrapper(self, start, goal, *args, **kwargs):
+            tracer = self.tracer
+            if tracer is None:
+                return lookup(self, start, goal, args, kwargs, None)
+            # Instrumented call: one QueryTrace per search (see instrumentation.py)
+            tracer.begin_query(name, start, goal)
+            try:
+                path, cost = lookup(self, start, goal, args, kwargs, tracer)
+            except BaseException as exc:
+                tracer.abort_query(exc)
+                raise
+            tracer.end_query(path, cost)
+            return path, cost
+
+        return wrapper
+
+    return decorate
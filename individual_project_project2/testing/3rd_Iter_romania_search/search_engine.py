@@ -0,0 +1,434 @@
+"""
+Parent-pointer best-first search engine over a CompiledGraph.
+
+Instead of pushing ``path + [neighbor]`` onto a queue.PriorityQueue (which copies
+the whole path on every edge relaxation and takes a lock on every put/get), the
+engine keeps one parent pointer and one g-cost per node in flat arrays, uses a
+plain heapq list as the frontier and handles decrease-key by lazy deletion:
+an improved node is simply pushed again and stale heap entries are skipped when
+popped.  The path is rebuilt once, by walking the parent pointers from the goal.
+
+Uniform-cost search, A* and weighted A* are one loop, best_first(), ordered by
+g + weight * h; greedy search keeps its own loop because it closes a node on
+its first pop instead of re-opening it on a cheaper path.
+
+The per-node arrays are allocated once per engine and only the touched slots are
+reset between queries, so a query on a huge graph does not pay O(n) set-up.
+
+An engine can be given on_pop/on_expand/on_push callbacks, which every loop
+calls with node ids (instrumentation.TracedEngine counts and traces through
+them).  The other searches of the agent (ARA*, Yen, LPA*) take an object with
+the same three attributes as their 'hooks' argument.  Without callbacks a loop
+only pays for testing them against None.
+"""
+
+from heapq import heappop, heappush
+
+INF = float("inf")
+
+
+class SearchStats:
+    """
+    Counters collected by the last query of a SearchEngine.
+
+    Attributes:
+        expanded: number of nodes taken off the frontier and expanded.
+        pushes: number of frontier insertions (including re-pushes).
+        peak_frontier: largest frontier size seen during the search.
+    """
+
+    __slots__ = ("expanded", "pushes", "peak_frontier")
+
+    def __init__(self, expanded: int = 0, pushes: int = 0, peak_frontier: int = 0):
+        self.expanded = expanded
+        self.pushes = pushes
+        self.peak_frontier = peak_frontier
+
+    def as_dict(self) -> dict:
+        return {
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "peak_frontier": self.peak_frontier,
+        }
+
+    def __repr__(self):
+        return (
+            f"SearchStats(expanded={self.expanded}, pushes={self.pushes}, "
+            f"peak_frontier={self.peak_frontier})"
+        )
+
+
+class SearchEngine:
+    """
+    Reusable search state (g-costs, parent pointers) bound to one CompiledGraph.
+
+    Not thread-safe: give every thread or process its own engine.
+    """
+
+    def __init__(self, graph, on_pop=None, on_expand=None, on_push=None):
+        """
+        Args:
+            graph: CompiledGraph to search.
+            on_pop: optional callback(node, key, g, stale) for every frontier removal;
+                'stale' is True for an entry left behind by a decrease-key.
+            on_expand: optional callback(node, g, frontier_size) for every expanded node.
+            on_push: optional callback(node, key, g) for every frontier insertion.
+        """
+        self.graph = graph
+        self.on_pop = on_pop
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self._g = None  # best known cost from the start (allocated by the first query)
+        self._parent = None  # parent pointer on the best known path
+        self._touched = []  # node ids whose slots must be reset before the next query
+        self.stats = SearchStats()
+
+    @property
+    def g(self) -> list:
+        if self._g is None:
+            self._g = [INF] * self.graph.num_nodes
+        return self._g
+
+    @property
+    def parent(self) -> list:
+        if self._parent is None:
+            self._parent = [-1] * self.graph.num_nodes
+        return self._parent
+
+    def _reset(self):
+        """Clear the slots written by the previous query."""
+        g, parent = self.g, self.parent
+        for u in self._touched:
+            g[u] = INF
+            parent[u] = -1
+        self._touched = []
+        self.stats = SearchStats()
+
+    def watch_heuristic(self, h):
+        """The heuristic the loops evaluate; subclasses may wrap h to observe it."""
+        return h
+
+    def path_to(self, goal: int) -> list:
+        """Walk the parent pointers back from 'goal' and return the id path."""
+        parent = self.parent
+        path = [goal]
+        u = parent[goal]
+        while u != -1:
+            path.append(u)
+            u = parent[u]
+        path.reverse()
+        return path
+
+    def astar(self, start: int, goal: int, h):
+        """
+        A* from 'start' to 'goal' with heuristic h(node_id) -> float.
+
+        A node is re-expanded only when a strictly cheaper path to it is found,
+        so the result is optimal for any admissible heuristic.
+
+        Returns:
+            (path_ids, cost) or ([], inf) when the goal is unreachable.
+        """
+        return self.best_first(start, goal, h)
+
+    def uniform_cost(self, start: int, goal: int):
+        """Uniform-cost search (Dijkstra stopped at the goal): best_first with h = 0."""
+        return self.best_first(start, goal, _zero)
+
+    def best_first(self, start: int, goal: int, h, weight: float = 1):
+        """
+        Best-first search ordered by f = g + weight * h(node_id): the loop shared by
+        uniform-cost search (h = 0), A* (weight 1) and weighted A* (weight > 1, whose
+        result costs at most 'weight' times the optimum for an admissible h).
+
+        Returns:
+            (path_ids, cost) or ([], inf) when the goal is unreachable.
+        """
+        if weight != 1:
+            h = _weighted(h, weight)
+        h = self.watch_heuristic(h)
+        self._reset()
+        on_pop, on_expand, on_push = self.on_pop, self.on_expand, self.on_push
+        graph = self.graph
+        offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+        g, parent, touched = self.g, self.parent, self._touched
+
+        g[start] = 0
+        touched.append(start)
+        key = h(start)
+        frontier = [(key, 0, start)]
+        if on_push is not None:
+            on_push(start, key, 0)
+        pushes, expanded, peak = 1, 0, 1
+
+        while frontier:
+            key, cost, u = heappop(frontier)
+            stale = cost > g[u]  # entry left behind by a decrease-key
+            if on_pop is not None:
+                on_pop(u, key, cost, stale)
+            if stale:
+                continue
+            if u == goal:
+                self.stats = SearchStats(expanded, pushes, peak)
+                return self.path_to(goal), cost
+            expanded += 1
+            if on_expand is not None:
+                on_expand(u, cost, len(frontier))
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_cost = cost + weights[e]
+                if new_cost < g[v]:
+                    if g[v] == INF:
+                        touched.append(v)
+                    g[v] = new_cost
+                    parent[v] = u
+                    key = new_cost + h(v)
+                    heappush(frontier, (key, new_cost, v))
+                    pushes += 1
+                    if on_push is not None:
+                        on_push(v, key, new_cost)
+            if len(frontier) > peak:
+                peak = len(frontier)
+
+        self.stats = SearchStats(expanded, pushes, peak)
+        return [], INF
+
+    def greedy(self, start: int, goal: int, h):
+        """
+        Greedy Best-First Search from 'start' to 'goal' ordered by h(node_id) only.
+
+        Heap entries carry the parent they were pushed from; the first entry popped
+        for a node closes it and fixes its parent pointer and g-cost.
+
+        Returns:
+            (path_ids, cost) or ([], inf) when the goal is unreachable.
+        """
+        h = self.watch_heuristic(h)
+        self._reset()
+        on_pop, on_expand, on_push = self.on_pop, self.on_expand, self.on_push
+        graph = self.graph
+        offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+        g, parent, touched = self.g, self.parent, self._touched
+
+        key = h(start)
+        frontier = [(key, start, -1, 0)]
+        if on_push is not None:
+            on_push(start, key, 0)
+        pushes, expanded, peak = 1, 0, 1
+
+        while frontier:
+            key, u, via, cost = heappop(frontier)
+            stale = g[u] != INF  # already closed
+            if on_pop is not None:
+                on_pop(u, key, cost, stale)
+            if stale:
+                continue
+            g[u] = cost
+            parent[u] = via
+            touched.append(u)
+            if u == goal:
+                self.stats = SearchStats(expanded, pushes, peak)
+                return self.path_to(goal), cost
+            expanded += 1
+            if on_expand is not None:
+                on_expand(u, cost, len(frontier))
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if g[v] == INF:
+                    key = h(v)
+                    heappush(frontier, (key, v, u, cost + weights[e]))
+                    pushes += 1
+                    if on_push is not None:
+                        on_push(v, key, cost + weights[e])
+            if len(frontier) > peak:
+                peak = len(frontier)
+
+        self.stats = SearchStats(expanded, pushes, peak)
+        return [], INF
+
+    def bidirectional(self, start: int, goal: int, potential=None):
+        """
+        Bidirectional Dijkstra / A* between 'start' and 'goal' on an undirected graph.
+
+        Without a potential both searches are plain Dijkstra.  With a potential
+        p(v) (the forward search uses keys g + p(v), the backward one g - p(v)),
+        this is bidirectional A*; p must be the average potential
+        (h_goal(v) - h_start(v)) / 2 of two consistent heuristics so that the
+        reduced edge costs stay non-negative.
+
+        The searches alternate on the smaller top key and stop as soon as
+        top_forward + top_backward >= mu, where mu is the cost of the best path
+        found through a node labelled by both searches.  With the average
+        potential the constant terms cancel, so this is the same test as for
+        bidirectional Dijkstra and the result is optimal.
+
+        Returns:
+            (path_ids, cost) or ([], inf) when the goal is unreachable.
+        """
+        if start == goal:
+            self.stats = SearchStats(0, 1, 1)
+            return [start], 0
+        on_pop, on_expand, on_push = self.on_pop, self.on_expand, self.on_push
+        graph = self.graph
+        offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+        p = self.watch_heuristic(potential) if potential is not None else _zero
+
+        g_fwd, g_bwd = {start: 0}, {goal: 0}
+        par_fwd, par_bwd = {start: -1}, {goal: -1}
+        q_fwd, q_bwd = [(p(start), 0, start)], [(-p(goal), 0, goal)]
+        if on_push is not None:
+            on_push(start, q_fwd[0][0], 0)
+            on_push(goal, q_bwd[0][0], 0)
+        mu, meet = INF, -1
+        pushes, expanded, peak = 2, 0, 2
+
+        while q_fwd and q_bwd:
+            if q_fwd[0][0] + q_bwd[0][0] >= mu:
+                break
+            # Expand the side with the smaller top key (sign = +1 forward, -1 backward)
+            if q_fwd[0][0] <= q_bwd[0][0]:
+                frontier, g_this, g_other, parent, sign = q_fwd, g_fwd, g_bwd, par_fwd, 1
+            else:
+                frontier, g_this, g_other, parent, sign = q_bwd, g_bwd, g_fwd, par_bwd, -1
+            key, cost, u = heappop(frontier)
+            stale = cost > g_this[u]
+            if on_pop is not None:
+                on_pop(u, key, cost, stale)
+            if stale:
+                continue
+            expanded += 1
+            if on_expand is not None:
+                on_expand(u, cost, len(q_fwd) + len(q_bwd))
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_cost = cost + weights[e]
+                if new_cost < g_this.get(v, INF):
+                    g_this[v] = new_cost
+                    parent[v] = u
+                    key = new_cost + sign * p(v)
+                    heappush(frontier, (key, new_cost, v))
+                    pushes += 1
+                    if on_push is not None:
+                        on_push(v, key, new_cost)
+                    if v in g_other and new_cost + g_other[v] < mu:
+                        mu, meet = new_cost + g_other[v], v
+            size = len(q_fwd) + len(q_bwd)
+            if size > peak:
+                peak = size
+
+        self.stats = SearchStats(expanded, pushes, peak)
+        if meet == -1:
+            return [], INF
+        # start ... meet from the forward tree, meet ... goal from the backward tree
+        path = []
+        u = meet
+        while u != -1:
+            path.append(u)
+            u = par_fwd[u]
+        path.reverse()
+        u = par_bwd[meet]
+        while u != -1:
+            path.append(u)
+            u = par_bwd[u]
+        return path, mu
+
+
+def _zero(node: int) -> int:
+    return 0
+
+
+def hook_callbacks(hooks):
+    """(on_pop, on_expand, on_push) of a hooks object such as a SearchEngine; all None for None."""
+    if hooks is None:
+        return None, None, None
+    return hooks.on_pop, hooks.on_expand, hooks.on_push
+
+
+def _weighted(h, weight: float):
+    """The heuristic h scaled by 'weight'."""
+    return lambda v: weight * h(v)
+
+
+def shortest_distances(graph, source: int) -> list:
+    """
+    Plain Dijkstra from 'source' to every node of 'graph'.
+
+    Returns:
+        list of distances indexed by node id (inf for unreachable nodes).
+    """
+    offsets, targets, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+    dist = [INF] * graph.num_nodes
+    dist[source] = 0
+    frontier = [(0, source)]
+    while frontier:
+        d, u = heappop(frontier)
+        if d > dist[u]:
+            continue
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heappush(frontier, (nd, v))
+    return dist
+
+
+def shortest_path_tree(graph, source: int, targets=None, hooks=None):
+    """
+    Dijkstra from 'source' that also records parent pointers.
+
+    Args:
+        graph: CompiledGraph.
+        source: root node id.
+        targets: optional iterable of node ids; the search stops once all of them
+            are settled instead of exploring the whole graph.
+        hooks: optional object with on_pop/on_expand/on_push callbacks (a SearchEngine).
+
+    Returns:
+        (dist, parent) lists indexed by node id; parent[source] == -1 and
+        unreached nodes have dist inf and parent -1.
+    """
+    offsets, targets_, weights = graph.offsets_list, graph.targets_list, graph.weights_list
+    n = graph.num_nodes
+    dist = [INF] * n
+    parent = [-1] * n
+    dist[source] = 0
+    remaining = None if targets is None else set(targets)
+    on_pop, on_expand, on_push = hook_callbacks(hooks)
+    frontier = [(0, source)]
+    if on_push is not None:
+        on_push(source, 0, 0)
+    while frontier:
+        d, u = heappop(frontier)
+        stale = d > dist[u]
+        if on_pop is not None:
+            on_pop(u, d, d, stale)
+        if stale:
+            continue
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        if on_expand is not None:
+            on_expand(u, d, len(frontier))
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets_[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heappush(frontier, (nd, v))
+                if on_push is not None:
+                    on_push(v, nd, nd)
+    return dist, parent
+
+
+def tree_path(parent, goal: int) -> list:
+    """Id path from the root of a parent-pointer tree to 'goal'."""
+    path = [goal]
+    u = parent[goal]
+    while u != -1:
+        path.append(u)
+        u = parent[u]
+    path.reverse()
+    return path
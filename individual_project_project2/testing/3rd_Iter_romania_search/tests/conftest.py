@@ -0,0 +1,8 @@
+import pytest
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+@pytest.fixture
+# Provide a fresh SPSA agent instance for each test
+def agent():
+    return SimpleProblemSolvingAgent()
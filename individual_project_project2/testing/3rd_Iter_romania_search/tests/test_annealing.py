@@ -0,0 +1,67 @@
+import math
+import pickle
+import random
+
+import pytest
+from annealing import chain_seeds, exp_schedule
+
+
+def test_simulated_annealing_leaves_global_rng_alone(agent):
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    agent.simulated_annealing("Arad", "Bucharest")
+    assert random.random() == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_annealing_finds_valid_path(agent, workers):
+    path, cost = agent.parallel_simulated_annealing("Arad", "Bucharest", chains=4, workers=workers)
+    assert path[0] == "Arad" and path[-1] == "Bucharest"
+    assert cost == agent.calculate_path_cost(path)
+    assert cost >= agent.astar_search("Arad", "Bucharest")[1]
+
+
+def test_parallel_annealing_is_reproducible(agent):
+    _, first = agent.parallel_simulated_annealing("Timisoara", "Neamt", chains=4, workers=1, seed=3)
+    _, again = agent.parallel_simulated_annealing("Timisoara", "Neamt", chains=4, workers=2, seed=3)
+    assert again == first
+
+
+def test_target_cost_stops_early(agent, monkeypatch):
+    runs = []
+    anneal = agent._anneal_ids
+
+    def counted(*args):
+        runs.append(args)
+        return anneal(*args)
+
+    monkeypatch.setattr(agent, "_anneal_ids", counted)
+    path, cost = agent.parallel_simulated_annealing("Arad", "Bucharest", chains=4)
+    full = len(runs)
+    assert full == 4 * 10 and cost == 418
+    runs.clear()
+    path, cost = agent.parallel_simulated_annealing("Arad", "Bucharest", chains=4, target_cost=418)
+    assert cost == 418 and agent.calculate_path_cost(path) == 418
+    assert len(runs) < full
+
+
+def test_annealing_fallback_is_reported(agent, caplog):
+    # The default schedule is too cold to leave Arad on the way to Bucharest
+    assert agent.simulated_annealing("Arad", "Bucharest", fallback=False) == ([], float("inf"))
+    with caplog.at_level("WARNING", logger="SimpleProblemSolvingAgent"):
+        result = agent.simulated_annealing("Arad", "Bucharest")
+    assert result == agent.greedy_best_first_search("Arad", "Bucharest")
+    assert "greedy best-first" in caplog.text
+
+
+def test_chain_seeds_are_distinct():
+    seeds = chain_seeds(42, 16)
+    assert len(set(seeds)) == 16
+    assert chain_seeds(42, 16) == seeds
+
+
+def test_exp_schedule_pickles():
+    schedule = pickle.loads(pickle.dumps(exp_schedule(k=20, lam=0.01, limit=50)))
+    assert schedule(10) == pytest.approx(20 * math.exp(-0.1))
+    assert schedule(50) == 0
@@ -0,0 +1,37 @@
+import pytest
+from anytime import anytime_astar
+
+
+def test_weighted_astar_within_bound(agent):
+    for start in agent.graph:
+        for goal in agent.graph:
+            optimal = agent.astar_search(start, goal)[1]
+            for weight in (1.0, 1.5, 3.0):
+                path, cost = agent.weighted_astar_search(start, goal, weight)
+                assert optimal <= cost <= weight * optimal
+                assert cost == agent.calculate_path_cost(path)
+    with pytest.raises(ValueError):
+        agent.weighted_astar_search("Arad", "Bucharest", 0.5)
+
+
+def test_anytime_improves_to_optimal(agent):
+    for start in agent.graph:
+        for goal in agent.graph:
+            optimal = agent.astar_search(start, goal)[1]
+            solutions = list(agent.anytime_astar(start, goal))
+            costs = [s.cost for s in solutions]
+            assert costs == sorted(costs, reverse=True)
+            assert all(s.cost <= s.bound * optimal + 1e-9 and s.bound <= s.weight for s in solutions)
+            assert solutions[-1].cost == optimal and solutions[-1].bound == 1.0
+            assert agent.anytime_astar_search(start, goal) == (solutions[-1].path, optimal)
+
+
+def test_anytime_budgets(agent):
+    assert agent.anytime_astar_search("Timisoara", "Neamt", expansion_budget=1) == ([], float("inf"))
+    solutions = list(agent.anytime_astar("Timisoara", "Neamt", expansion_budget=15))
+    assert solutions and solutions[-1].expanded <= 15
+    # A clock that is always past the deadline stops before the first expansion
+    graph = agent.compiled
+    s, g = graph.node_id("Arad"), graph.node_id("Bucharest")
+    ticks = iter(range(100))
+    assert list(anytime_astar(graph, s, g, lambda v: 0, time_budget=0.5, clock=lambda: next(ticks))) == []
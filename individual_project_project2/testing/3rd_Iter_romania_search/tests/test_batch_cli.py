@@ -0,0 +1,90 @@
+import io
+import json
+import sys
+
+import pytest
+from batch_queries import RouteResult
+from RomaniaCityApp import main, read_pairs, run_batch
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+def test_read_pairs_formats():
+    errors = []
+    lines = ["start,goal", "Arad,Bucharest", "", '{"start": "Neamt", "goal": "Eforie"}', "oops", '{"start": 1}']
+    pairs = list(read_pairs(lines, errors=lambda n, msg: errors.append(n)))
+    assert pairs == [(2, "Arad", "Bucharest"), (4, "Neamt", "Eforie")]
+    assert errors == [5, 6]
+
+
+def test_run_batch_streams_jsonl(agent):
+    out = io.StringIO()
+    lines = iter(["Arad,Bucharest", "Arad,Boston", "Neamt,Eforie"])
+    counts = run_batch(agent, lines, out, algorithms=("astar_search", "dijkstra"))
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (counts["results"], counts["errors"]) == (4, 1)
+    assert {"line": 2, "error": "unknown city: Boston"} in records
+    results = [r for r in records if "error" not in r]
+    for r in results:
+        assert (r["path"], r["cost"]) == agent.astar_search(r["start"], r["goal"])
+        assert r["ms"] >= 0
+
+
+def test_run_batch_writes_error_results(agent, monkeypatch):
+    def solve_many(pairs, algorithms, **kwargs):
+        for start, goal in pairs:
+            yield RouteResult(start, goal, "astar_search", [], float("inf"), 0.0, "no route today")
+
+    monkeypatch.setattr(agent, "solve_many", solve_many)
+    out = io.StringIO()
+    counts = run_batch(agent, iter(["Arad,Bucharest"]), out, algorithms=("astar_search",))
+    assert (counts["results"], counts["errors"]) == (0, 1)
+    assert json.loads(out.getvalue()) == {
+        "start": "Arad", "goal": "Bucharest", "algorithm": "astar_search", "error": "no route today"
+    }
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_main_batch_mode_files(tmp_path, capsys, workers):
+    source = tmp_path / "pairs.csv"
+    source.write_text("start,goal\nArad,Bucharest\nTimisoara,Neamt\n", encoding="utf-8")
+    target = tmp_path / "routes.jsonl"
+    status = main(["--batch", "-i", str(source), "-o", str(target), "-a", "greedy_best_first_search", "-w", str(workers)])
+    assert status == 0
+    records = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    assert sorted((r["start"], r["cost"]) for r in records) == [("Arad", 450), ("Timisoara", 974)]
+    assert "2 results, 0 errors" in capsys.readouterr().err
+
+
+def test_main_batch_mode_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"start": "Arad", "goal": "Sibiu"}\n'))
+    assert main(["--batch", "-a", "astar_search"]) == 0
+    record = json.loads(capsys.readouterr().out)
+    assert record["path"] == ["Arad", "Sibiu"] and record["cost"] == 140
+
+
+@pytest.mark.parametrize("argv", [["-a", "astar_search"], ["--bacth"], ["extra"]])
+def test_main_rejects_arguments_without_batch(argv, monkeypatch, capsys):
+    monkeypatch.setattr("builtins.input", lambda: pytest.fail("interactive mode started"))
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    assert exit_info.value.code == 2
+    assert "usage:" in capsys.readouterr().err
+
+
+def test_main_rejects_unknown_algorithm_before_reading_input(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO("Arad,Bucharest\n"))
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--batch", "-a", "teleport"])
+    assert exit_info.value.code == 2
+    assert "Unknown search algorithm: teleport" in capsys.readouterr().err
+    assert sys.stdin.read() == "Arad,Bucharest\n"
+
+
+def test_main_does_not_hide_search_errors(monkeypatch):
+    def broken(self, start, goal):
+        raise ValueError("broken search")
+
+    monkeypatch.setattr(SimpleProblemSolvingAgent, "astar_search", broken)
+    monkeypatch.setattr("sys.stdin", io.StringIO("Arad,Bucharest\n"))
+    with pytest.raises(ValueError, match="broken search"):
+        main(["--batch", "-a", "astar_search"])
@@ -0,0 +1,54 @@
+import itertools
+
+import pytest
+
+
+@pytest.fixture
+def pairs(agent):
+    return list(itertools.permutations(sorted(agent.graph), 2))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_many_matches_single_queries(agent, pairs, workers):
+    results = list(
+        agent.solve_many(pairs, algorithms=("dijkstra", "astar_search"), workers=workers, batch_size=50)
+    )
+    assert len(results) == 2 * len(pairs)
+    for r in results:
+        assert r.cost == agent.astar_search(r.start, r.goal)[1]
+        assert r.path[0] == r.start and r.path[-1] == r.goal
+        assert r.cost == agent.calculate_path_cost(r.path)
+
+
+def test_solve_many_is_lazy(agent):
+    def endless():
+        while True:
+            yield "Arad", "Bucharest"
+
+    first = next(iter(agent.solve_many(endless(), batch_size=10)))
+    assert first.cost == 418
+
+
+@pytest.mark.parametrize("algorithm", ["teleport", "heuristic", "calculate_path_cost", "k_shortest_paths"])
+def test_solve_many_rejects_unknown_algorithm_up_front(agent, algorithm):
+    def pairs():
+        raise AssertionError("pairs read before the algorithms were checked")
+        yield
+
+    with pytest.raises(ValueError, match=algorithm):
+        agent.solve_many(pairs(), algorithms=(algorithm,))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unknown_city_gives_an_error_result_for_every_algorithm(agent, workers):
+    pairs = [("Arad", "Bucharest"), ("Arad", "Boston"), ("Gotham", "Sibiu")]
+    results = list(agent.solve_many(pairs, algorithms=("dijkstra", "astar_search"), workers=workers))
+    errors = {(r.start, r.goal, r.algorithm): r.error for r in results if r.error}
+    assert errors == {
+        (start, goal, algorithm): f"unknown city: {city}"
+        for start, goal, city in [("Arad", "Boston", "Boston"), ("Gotham", "Sibiu", "Gotham")]
+        for algorithm in ("dijkstra", "astar_search")
+    }
+    found = [r for r in results if not r.error]
+    assert sorted(r.algorithm for r in found) == ["astar_search", "dijkstra"]
+    assert all(r.cost == 418 for r in found)
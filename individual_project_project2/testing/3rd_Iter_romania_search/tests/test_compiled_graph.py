@@ -0,0 +1,35 @@
+import pytest
+from compiled_graph import CompiledGraph
+from SimpleProblemSolvingAgent import CITY_COORDINATES, ROMANIA_ROAD_MAP
+
+
+@pytest.fixture
+# Compile the Romania map once per test
+def graph():
+    return CompiledGraph.from_road_map(ROMANIA_ROAD_MAP, CITY_COORDINATES)
+
+
+def test_name_interning_round_trip(graph):
+    assert graph.num_nodes == len(ROMANIA_ROAD_MAP)
+    for name in ROMANIA_ROAD_MAP:
+        assert graph.node_name(graph.node_id(name)) == name
+
+
+def test_csr_matches_road_map(graph):
+    assert graph.num_edges == sum(len(n) for n in ROMANIA_ROAD_MAP.values())
+    for name, neighbors in ROMANIA_ROAD_MAP.items():
+        compiled = {graph.node_name(v): w for v, w in graph.neighbors(graph.node_id(name))}
+        assert compiled == neighbors
+
+
+def test_edge_weight_and_coordinates(graph):
+    arad, sibiu = graph.node_id("Arad"), graph.node_id("Sibiu")
+    assert graph.edge_weight(arad, sibiu) == 140
+    assert tuple(graph.coords[arad]) == CITY_COORDINATES["Arad"]
+    with pytest.raises(KeyError):
+        graph.edge_weight(arad, graph.node_id("Bucharest"))
+
+
+def test_unknown_neighbor_rejected():
+    with pytest.raises(KeyError):
+        CompiledGraph.from_road_map({"A": {"B": 1}}, {"A": (0, 0)})
@@ -0,0 +1,38 @@
+import pytest
+from contraction import ContractionHierarchy
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+def test_ch_search_matches_astar(agent):
+    agent.build_hierarchy()
+    for start in agent.graph:
+        for goal in agent.graph:
+            path, cost = agent.ch_search(start, goal)
+            assert cost == agent.astar_search(start, goal)[1]
+            assert path[0] == start and path[-1] == goal
+            # Unpacked paths only use original roads
+            assert cost == agent.calculate_path_cost(path)
+
+
+def test_upward_edges_point_to_higher_rank(agent):
+    ch = agent.build_hierarchy()
+    for u in range(ch.num_nodes):
+        for e in range(ch.up_offsets[u], ch.up_offsets[u + 1]):
+            assert ch.rank[ch.up_targets[e]] > ch.rank[u]
+
+
+def test_hierarchy_round_trip(agent, tmp_path):
+    path = tmp_path / "romania_ch.npz"
+    agent.build_hierarchy(path=path)
+    expected = agent.ch_search("Timisoara", "Eforie")
+    fresh = SimpleProblemSolvingAgent()
+    fresh.load_hierarchy(path)
+    assert fresh.ch_search("Timisoara", "Eforie") == expected
+
+
+def test_hierarchy_node_count_checked(agent, tmp_path):
+    path = tmp_path / "romania_ch.npz"
+    agent.build_hierarchy(path=path)
+    small = SimpleProblemSolvingAgent({"A": {"B": 1}, "B": {"A": 1}}, {"A": (0, 0), "B": (1, 0)})
+    with pytest.raises(ValueError):
+        ContractionHierarchy.load(path, small.compiled)
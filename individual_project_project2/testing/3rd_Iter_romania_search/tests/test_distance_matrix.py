@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from distance_matrix import cached_matrix, euclidean_matrix, road_distance_matrix
+
+
+def test_road_matrix_matches_astar(agent):
+    matrix = agent.distance_matrix("road")
+    names = agent.compiled.names
+    for s, start in enumerate(names):
+        for g, goal in enumerate(names):
+            assert matrix[s, g] == agent.astar_search(start, goal)[1]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_dijkstra_method_matches_floyd_warshall(agent, workers, tmp_path):
+    expected = road_distance_matrix(agent.compiled, method="floyd_warshall")
+    in_memory = road_distance_matrix(agent.compiled, workers=workers, method="dijkstra")
+    on_disk = road_distance_matrix(
+        agent.compiled, workers=workers, path=tmp_path / "road.npy", method="dijkstra"
+    )
+    assert np.array_equal(in_memory, expected)
+    assert isinstance(on_disk, np.memmap)
+    assert np.array_equal(on_disk, expected)
+
+
+def test_euclidean_matrix_matches_heuristic(agent):
+    matrix = euclidean_matrix(agent.compiled.coords)
+    s, g = agent.compiled.node_id("Arad"), agent.compiled.node_id("Bucharest")
+    assert matrix[s, g] == pytest.approx(agent.heuristic("Arad", "Bucharest"))
+
+
+def test_cached_matrix_builds_once(tmp_path):
+    calls = []
+
+    def builder(out_path):
+        calls.append(1)
+        return np.arange(9.0).reshape(3, 3)
+
+    path = str(tmp_path / "m.npy")
+    first = cached_matrix(path, builder)
+    second = cached_matrix(path, builder)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap)
+    assert np.array_equal(first, second)
+    assert cached_matrix(path, builder, shape=(3, 3)) is not None and len(calls) == 1
+    cached_matrix(path, builder, shape=(4, 4))  # wrong shape: rebuilt
+    assert len(calls) == 2
+
+
+def test_cached_matrix_rebuilds_for_another_graph_or_a_broken_file(agent, tmp_path):
+    path = str(tmp_path / "road.npy")
+    first = agent.distance_matrix("road", path=path)
+    assert first[agent.compiled.node_id("Arad"), agent.compiled.node_id("Bucharest")] == 418
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["road.npy", "road.npy.key"]
+    del first
+    agent.update_edge("Pitesti", "Bucharest", 300)
+    second = agent.distance_matrix("road", path=path)
+    assert second[agent.compiled.node_id("Arad"), agent.compiled.node_id("Bucharest")] == 450
+    del second
+    with open(path, "r+b") as f:  # a cache cut short, e.g. by a crash
+        f.truncate(100)
+    assert np.array_equal(agent.distance_matrix("road", path=path), agent.distance_matrix("road"))
+
+
+def test_cached_matrix_leaves_no_file_when_the_build_fails(tmp_path):
+    def builder(out_path):
+        np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float64, shape=(3, 3))
+        raise RuntimeError("crashed half way")
+
+    with pytest.raises(RuntimeError):
+        cached_matrix(str(tmp_path / "m.npy"), builder, key="k")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+
+def test_shortest_path_tree(agent):
+    dist, pred = agent.shortest_path_tree("Arad")
+    assert dist.dtype == np.float64 and pred.dtype == np.int64
+    assert len(dist) == len(pred) == agent.compiled.num_nodes
+    assert pred[agent.compiled.node_id("Arad")] == -1
+    for city in agent.graph:
+        path, cost = agent.path_from_tree(dist, pred, city)
+        assert cost == agent.astar_search("Arad", city)[1]
+        assert path[0] == "Arad" and path[-1] == city
+        assert agent.calculate_path_cost(path) == cost
+
+
+def test_tree_with_targets_stops_early(agent):
+    dist, _ = agent.shortest_path_tree("Arad", targets=["Zerind", "Timisoara"])
+    assert dist[agent.compiled.node_id("Timisoara")] == 118
+    assert np.isinf(dist[agent.compiled.node_id("Neamt")])
+    assert agent.path_from_tree(*agent.shortest_path_tree("Arad", ["Zerind"]), "Neamt") == ([], float("inf"))
+
+
+@pytest.mark.parametrize("with_hierarchy", [False, True])
+def test_distance_table_matches_astar(agent, with_hierarchy):
+    if with_hierarchy:
+        agent.build_hierarchy()
+    cities = list(agent.graph)
+    sources, targets = cities[::3], cities[1::2]
+    table = agent.distance_table(sources, targets)
+    expected = [[agent.astar_search(s, t)[1] for t in targets] for s in sources]
+    assert table.shape == (len(sources), len(targets))
+    np.testing.assert_array_equal(table, expected)
+
+
+def test_distance_table_predecessors(agent):
+    table, pred = agent.distance_table(["Arad", "Neamt"], ["Bucharest", "Eforie"], predecessors=True)
+    assert pred.shape == (2, agent.compiled.num_nodes)
+    dist, _ = agent.shortest_path_tree("Neamt")
+    path, cost = agent.path_from_tree(dist, pred[1], "Eforie")
+    assert cost == table[1, 1]
+    assert path == agent.astar_search("Neamt", "Eforie")[0]
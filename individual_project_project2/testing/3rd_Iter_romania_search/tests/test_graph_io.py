@@ -0,0 +1,100 @@
+import pytest
+from graph_io import (
+    ROMANIA_ALIASES,
+    GraphFormatError,
+    load_binary,
+    load_csv,
+    load_dimacs,
+    save_binary,
+)
+from SimpleProblemSolvingAgent import CITY_COORDINATES, ROMANIA_ROAD_MAP, SimpleProblemSolvingAgent
+
+# The 2nd iteration spells two cities differently
+SPELLING = {"Drobeta": "Dobreta", "Rimnicu": "Rimnicu Vilcea"}
+
+
+def write_romania_csv(tmp_path):
+    coords = tmp_path / "coords.csv"
+    edges = tmp_path / "edges.csv"
+    coords.write_text(
+        "city,x,y\n"
+        + "".join(f"{SPELLING.get(c, c)},{x},{y}\n" for c, (x, y) in CITY_COORDINATES.items())
+    )
+    seen = set()
+    rows = []
+    for a, nbrs in ROMANIA_ROAD_MAP.items():
+        for b, w in nbrs.items():
+            if (b, a) not in seen:
+                seen.add((a, b))
+                rows.append(f"{SPELLING.get(a, a)},{SPELLING.get(b, b)},{w}\n")
+    edges.write_text("source,target,distance\n" + "".join(rows))
+    return edges, coords
+
+
+def assert_same_roads(graph):
+    for city, nbrs in ROMANIA_ROAD_MAP.items():
+        loaded = {graph.node_name(v): w for v, w in graph.neighbors(graph.node_id(city))}
+        assert loaded == nbrs
+
+
+def test_csv_with_aliases(tmp_path):
+    edges, coords = write_romania_csv(tmp_path)
+    graph = load_csv(edges, coords, aliases=ROMANIA_ALIASES)
+    assert_same_roads(graph)
+    agent = SimpleProblemSolvingAgent(compiled=graph)
+    assert "Drobeta" in agent.graph and "Dobreta" not in agent.graph
+    assert agent.astar_search("Arad", "Bucharest")[1] == 418
+    assert agent.locations["Arad"] == CITY_COORDINATES["Arad"]
+
+
+def test_binary_round_trip(tmp_path):
+    agent = SimpleProblemSolvingAgent()
+    save_binary(agent.compiled, tmp_path / "romania.bin")
+    graph = load_binary(tmp_path / "romania.bin", chunk_edges=7)
+    assert graph.names == agent.compiled.names
+    assert_same_roads(graph)
+
+
+def test_dimacs(tmp_path):
+    (tmp_path / "g.co").write_text("c tiny\np aux sp co 3\nv 1 0 0\nv 2 3 0\nv 3 3 4\n")
+    (tmp_path / "g.gr").write_text(
+        "p sp 3 4\na 1 2 3\na 2 1 3\na 2 3 4\na 3 2 4\n"
+    )
+    agent = SimpleProblemSolvingAgent(compiled=load_dimacs(tmp_path / "g.gr", tmp_path / "g.co"))
+    assert agent.astar_search("1", "3") == (["1", "2", "3"], 7)
+
+
+@pytest.mark.parametrize(
+    "arc, message",
+    [
+        ("a 2 3 four", "g.gr:4: not a number: 'four'"),
+        ("a 2 x 4", "g.gr:4: not an integer: 'x'"),
+        ("a 2 3", "g.gr:4: expected 4 fields"),
+    ],
+)
+def test_dimacs_malformed_arc_rejected(tmp_path, arc, message):
+    (tmp_path / "g.co").write_text("p aux sp co 3\nv 1 0 0\nv 2 3 0\nv 3 3 4\n")
+    (tmp_path / "g.gr").write_text(f"p sp 3 2\na 1 2 3\nc comment\n{arc}\n")
+    with pytest.raises(GraphFormatError, match=message):
+        load_dimacs(tmp_path / "g.gr", tmp_path / "g.co")
+
+
+def test_dimacs_malformed_coordinate_rejected(tmp_path):
+    (tmp_path / "g.co").write_text("p aux sp co 2\nv 1 0 0\nv 2 3,5 0\n")
+    (tmp_path / "g.gr").write_text("p sp 2 0\n")
+    with pytest.raises(GraphFormatError, match="g.co:3: not a number: '3,5'"):
+        load_dimacs(tmp_path / "g.gr", tmp_path / "g.co")
+
+
+def test_asymmetric_edges_rejected(tmp_path):
+    (tmp_path / "g.co").write_text("p aux sp co 2\nv 1 0 0\nv 2 1 0\n")
+    (tmp_path / "g.gr").write_text("p sp 2 2\na 1 2 3\na 2 1 5\n")
+    with pytest.raises(GraphFormatError, match="asymmetric"):
+        load_dimacs(tmp_path / "g.gr", tmp_path / "g.co")
+
+
+def test_missing_coordinates_rejected(tmp_path):
+    edges, coords = write_romania_csv(tmp_path)
+    edges.write_text(edges.read_text() + "Arad,Boston,5000\n")
+    with pytest.raises(GraphFormatError, match="edges.csv:25: no coordinates"):
+        load_csv(edges, coords, aliases=ROMANIA_ALIASES)
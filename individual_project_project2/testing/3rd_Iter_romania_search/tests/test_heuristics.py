@@ -0,0 +1,38 @@
+import itertools
+
+import pytest
+from heuristics import LandmarkTable, euclidean_table
+from search_engine import shortest_distances
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+def test_euclidean_table_matches_heuristic(agent):
+    goal = agent.compiled.node_id("Bucharest")
+    table = euclidean_table(agent.compiled, goal)
+    for city in agent.graph:
+        assert table[agent.compiled.node_id(city)] == pytest.approx(agent.heuristic(city, "Bucharest"))
+
+
+def test_landmark_bounds_are_admissible(agent):
+    table = LandmarkTable.build(agent.compiled, k=3)
+    for goal in range(agent.compiled.num_nodes):
+        exact = shortest_distances(agent.compiled, goal)
+        assert all(b <= d + 1e-9 for b, d in zip(table.lower_bounds(goal), exact))
+
+
+def test_landmark_table_round_trip(agent, tmp_path):
+    path = tmp_path / "landmarks.npz"
+    built = agent.build_landmarks(k=3, path=path)
+    loaded = agent.load_landmarks(path)
+    assert loaded.landmarks.tolist() == built.landmarks.tolist()
+    assert (loaded.distances == built.distances).all()
+
+
+def test_alt_astar_stays_optimal_and_expands_less(agent):
+    alt_agent = SimpleProblemSolvingAgent()
+    alt_agent.build_landmarks(k=4)
+    for start, goal in itertools.permutations(agent.graph, 2):
+        plain_cost = agent.astar_search(start, goal)[1]
+        alt_cost = alt_agent.astar_search(start, goal)[1]
+        assert alt_cost == plain_cost, (start, goal)
+        assert alt_agent.last_search_stats.expanded <= agent.last_search_stats.expanded, (start, goal)
@@ -0,0 +1,96 @@
+import math
+import random
+
+import pytest
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent, _default_compiled_graph
+
+
+def test_update_edge_copies_shared_graph(agent):
+    shared = agent.compiled
+    version = shared.version
+    agent.update_edge("Pitesti", "Bucharest", 300)
+    assert agent.compiled is not shared and agent.compiled.version > version
+    assert agent.graph["Pitesti"]["Bucharest"] == agent.graph["Bucharest"]["Pitesti"] == 300
+    # Other default agents keep the original map
+    assert _default_compiled_graph() is shared
+    assert SimpleProblemSolvingAgent().astar_search("Arad", "Bucharest")[1] == 418
+    assert agent.astar_search("Arad", "Bucharest") == (["Arad", "Sibiu", "Fagaras", "Bucharest"], 450)
+
+
+def test_update_edge_invalidates_derived_data(agent):
+    agent.enable_cache()
+    agent.build_landmarks()
+    assert agent.ch_search("Arad", "Bucharest")[1] == 418
+    agent.update_edge("Rimnicu", "Pitesti", 200)  # longer: landmark bounds stay valid
+    assert agent.hierarchy is None and agent.landmarks is not None
+    agent.update_edge("Sibiu", "Fagaras", 50)  # shorter: they do not
+    assert agent.landmarks is None
+    assert agent.ch_search("Arad", "Bucharest") == (["Arad", "Sibiu", "Fagaras", "Bucharest"], 401)
+    assert agent.astar_search("Arad", "Bucharest")[1] == 401
+
+
+def test_update_edge_errors(agent):
+    with pytest.raises(KeyError):
+        agent.update_edge("Arad", "Bucharest", 10)
+    with pytest.raises(ValueError):
+        agent.update_edge("Arad", "Sibiu", -1)
+    with pytest.raises(TypeError):
+        agent.update_edge("Arad", "Sibiu", 1000, both_directions=False)
+
+
+def test_update_edge_keeps_the_map_undirected(agent):
+    agent.enable_cache()
+    agent.build_landmarks()
+    agent.update_edge("Arad", "Sibiu", 1000)
+    assert agent.graph["Sibiu"]["Arad"] == 1000
+    expected = agent.uniform_cost_search("Sibiu", "Arad")
+    assert expected[1] > 140
+    searches = (agent.astar_search, agent.bidirectional_dijkstra, agent.bidirectional_astar, agent.ch_search)
+    for search in searches:
+        assert search("Sibiu", "Arad")[1] == expected[1]
+        assert search("Arad", "Sibiu")[1] == expected[1]
+
+
+def test_incremental_search_repairs(agent):
+    assert agent.incremental_search("Arad", "Bucharest") == agent.astar_search("Arad", "Bucharest")
+    first = agent.last_search_stats.expanded
+    agent.update_edge("Fagaras", "Bucharest", 500)  # not on the current route
+    assert agent.incremental_search("Arad", "Bucharest")[1] == 418
+    assert agent.last_search_stats.expanded < first
+    agent.update_edge("Sibiu", "Rimnicu", math.inf)  # closes the route
+    path, cost = agent.incremental_search("Arad", "Bucharest")
+    assert cost == agent.uniform_cost_search("Arad", "Bucharest")[1] > 450
+    assert agent.calculate_path_cost(path) == cost
+
+
+def test_incremental_matches_full_search_under_random_updates(agent):
+    rng = random.Random(7)
+    cities = list(agent.graph)
+    roads = [(a, b) for a in cities for b in agent.graph[a] if a < b]
+    pairs = [tuple(rng.sample(cities, 2)) for _ in range(6)]
+    for _ in range(60):
+        a, b = rng.choice(roads)
+        straight = math.dist(agent.locations[a], agent.locations[b])
+        agent.update_edge(a, b, rng.choice([math.inf, math.ceil(straight) + rng.randint(0, 200)]))
+        for start, goal in pairs:
+            path, cost = agent.incremental_search(start, goal)
+            assert cost == agent.uniform_cost_search(start, goal)[1]
+            if path:
+                assert agent.calculate_path_cost(path) == cost
+
+
+def test_optimal_searches_survive_roads_shorter_than_the_straight_line(agent):
+    agent.enable_cache()
+    rng = random.Random(11)
+    cities = list(agent.graph)
+    roads = [(a, b) for a in cities for b in agent.graph[a] if a < b]
+    for _ in range(20):
+        a, b = rng.choice(roads)
+        agent.update_edge(a, b, rng.randint(1, 30))
+        for _ in range(5):
+            start, goal = rng.sample(cities, 2)
+            for s, g in ((start, goal), (goal, start)):
+                best = agent.uniform_cost_search(s, g)[1]
+                assert agent.astar_search(s, g)[1] == best
+                assert agent.incremental_search(s, g)[1] == best
+                assert agent.bidirectional_astar(s, g)[1] == best
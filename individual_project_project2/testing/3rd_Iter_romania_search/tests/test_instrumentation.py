@@ -0,0 +1,106 @@
+import json
+
+from instrumentation import SearchTracer, TracedEngine
+from search_engine import SearchEngine
+
+
+def test_tracing_off_by_default(agent):
+    assert agent.tracer is None
+    assert type(agent.engine) is SearchEngine
+
+
+def test_traced_results_match_untraced(agent):
+    methods = ["greedy_best_first_search", "astar_search", "bidirectional_astar", "ch_search"]
+    expected = {m: getattr(agent, m)("Arad", "Bucharest") for m in methods}
+    agent.enable_tracing()
+    assert isinstance(agent.engine, TracedEngine)
+    for m in methods:
+        assert getattr(agent, m)("Arad", "Bucharest") == expected[m]
+    agent.disable_tracing()
+    assert type(agent.engine) is SearchEngine
+
+
+def test_query_trace_counters_and_phases(agent):
+    tracer = agent.enable_tracing()
+    agent.astar_search("Arad", "Bucharest")
+    (trace,) = tracer.queries
+    assert (trace.algorithm, trace.start, trace.goal, trace.cost) == ("astar_search", "Arad", "Bucharest", 418)
+    assert trace.counters["expanded"] == agent.last_search_stats.expanded
+    assert trace.counters["pushes"] == agent.last_search_stats.pushes
+    assert trace.counters["pops"] == trace.counters["expanded"] + trace.counters["stale_pops"] + 1
+    assert trace.counters["heuristic_evals"] == trace.counters["pushes"]
+    assert {"setup", "search", "path"} <= set(trace.phase_ms())
+    assert trace.cache is None
+
+
+def test_callbacks_and_cache_flag(agent):
+    expanded = []
+    tracer = agent.enable_tracing(on_expand=lambda node, g: expanded.append(node))
+    agent.enable_cache()
+    agent.astar_search("Arad", "Bucharest")
+    agent.astar_search("Bucharest", "Arad")
+    assert expanded[0] == "Arad" and len(expanded) == tracer.queries[0].counters["expanded"]
+    assert [q.cache for q in tracer.queries] == ["miss", "hit"]
+
+
+def test_exports(agent, tmp_path):
+    tracer = agent.enable_tracing(record_events=True)
+    agent.greedy_best_first_search("Arad", "Bucharest")
+    tracer.save_json(tmp_path / "trace.json")
+    tracer.save_chrome_trace(tmp_path / "chrome.json")
+    data = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    assert data["queries"][0]["events"][0]["node"] == "Arad"
+    chrome = json.loads((tmp_path / "chrome.json").read_text(encoding="utf-8"))
+    phases = {e["ph"] for e in chrome["traceEvents"]}
+    assert phases == {"X", "i", "C"}
+
+
+def test_shared_tracer_keeps_bounded_history(agent):
+    tracer = SearchTracer(max_queries=2)
+    agent.enable_tracing(tracer)
+    for goal in ["Sibiu", "Fagaras", "Bucharest"]:
+        agent.astar_search("Arad", goal)
+    assert [q.goal for q in tracer.queries] == ["Fagaras", "Bucharest"]
+    assert tracer.slowest(1)[0] in tracer.queries
+
+
+def test_engine_callbacks_see_every_frontier_event(agent):
+    events = {"pop": 0, "stale": 0, "expand": 0, "push": 0}
+
+    def on_pop(u, key, g, stale):
+        events["pop"] += 1
+        events["stale"] += stale
+
+    engine = SearchEngine(
+        agent.compiled,
+        on_pop=on_pop,
+        on_expand=lambda u, g, size: events.__setitem__("expand", events["expand"] + 1),
+        on_push=lambda v, key, g: events.__setitem__("push", events["push"] + 1),
+    )
+    s, g = agent._ids("Arad", "Bucharest")
+    assert engine.uniform_cost(s, g)[1] == 418
+    assert (events["expand"], events["push"]) == (engine.stats.expanded, engine.stats.pushes)
+    assert events["pop"] == events["expand"] + events["stale"] + 1
+
+
+def test_every_search_method_records_counters(agent):
+    tracer = agent.enable_tracing()
+    agent.hill_climbing("Arad", "Bucharest")
+    agent.simulated_annealing("Arad", "Bucharest")
+    agent.parallel_simulated_annealing("Arad", "Bucharest", chains=2, restarts=2)
+    agent.k_shortest_paths("Arad", "Bucharest", 3)
+    agent.anytime_astar_search("Arad", "Bucharest")
+    agent.incremental_search("Arad", "Bucharest")
+    agent.bidirectional_dijkstra("Arad", "Bucharest")
+    by_name = {q.algorithm: q for q in tracer.queries if q.depth == 0}
+    assert set(by_name) == {
+        "hill_climbing", "simulated_annealing", "parallel_simulated_annealing", "k_shortest_paths",
+        "anytime_astar_search", "incremental_search", "bidirectional_dijkstra",
+    }
+    for name, trace in by_name.items():
+        assert trace.counters["expanded"] > 0, name
+    assert by_name["hill_climbing"].counters["heuristic_evals"] > 0
+    assert by_name["k_shortest_paths"].cost == 418
+    for name in ("k_shortest_paths", "anytime_astar_search", "incremental_search", "bidirectional_dijkstra"):
+        counters = by_name[name].counters
+        assert counters["pushes"] > 0 and counters["pops"] >= counters["expanded"], name
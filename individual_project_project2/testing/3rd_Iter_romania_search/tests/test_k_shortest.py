@@ -0,0 +1,42 @@
+import pytest
+
+
+def _all_simple_paths(agent, start, goal):
+    paths = []
+
+    def dfs(path, cost):
+        if path[-1] == goal:
+            paths.append((cost, list(path)))
+            return
+        for city, distance in agent.graph[path[-1]].items():
+            if city not in path:
+                path.append(city)
+                dfs(path, cost + distance)
+                path.pop()
+
+    dfs([start], 0)
+    return sorted(paths)
+
+
+def test_arad_bucharest_alternatives(agent):
+    routes = agent.k_shortest_paths("Arad", "Bucharest", 3)
+    assert routes[0] == agent.astar_search("Arad", "Bucharest")
+    assert [cost for _, cost in routes] == [418, 450, 575]
+
+
+@pytest.mark.parametrize("start,goal", [("Timisoara", "Neamt"), ("Oradea", "Eforie"), ("Craiova", "Sibiu")])
+def test_matches_enumeration(agent, start, goal):
+    expected = _all_simple_paths(agent, start, goal)[:8]
+    routes = agent.k_shortest_paths(start, goal, 8)
+    assert [cost for _, cost in routes] == [cost for cost, _ in expected]
+    for path, cost in routes:
+        assert len(set(path)) == len(path)
+        assert agent.calculate_path_cost(path) == cost
+    assert len({tuple(path) for path, _ in routes}) == len(routes)
+
+
+def test_fewer_paths_than_k(agent):
+    # Neamt and Iasi are joined by a single road and Neamt is a dead end
+    assert agent.k_shortest_paths("Neamt", "Iasi", 5) == [(["Neamt", "Iasi"], 87)]
+    assert agent.k_shortest_paths("Arad", "Arad", 3) == [(["Arad"], 0)]
+    assert agent.k_shortest_paths("Arad", "Sibiu", 0) == []
@@ -0,0 +1,23 @@
+import pytest
+from local_search import PathState
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+def test_path_state_tracks_cost_and_visits():
+    state = PathState(0)
+    state.extend(3, 75)
+    state.extend(5, 140)
+    assert state.path == [0, 3, 5]
+    assert state.head == 5
+    assert state.cost == 215
+    assert 3 in state.visited and 4 not in state.visited
+    assert len(state) == 3
+
+
+@pytest.mark.parametrize("method", ["hill_climbing", "simulated_annealing"])
+def test_running_cost_matches_path_sum(method):
+    agent = SimpleProblemSolvingAgent()
+    for goal in agent.graph:
+        path, cost = getattr(agent, method)("Arad", goal)
+        assert cost == agent.calculate_path_cost(path)
+        assert len(set(path)) == len(path)
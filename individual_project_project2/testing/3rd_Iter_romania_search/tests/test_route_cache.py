@@ -0,0 +1,55 @@
+import pytest
+from route_cache import RouteCache
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+@pytest.fixture
+# Provide a fresh SPSA agent instance with a route cache for each test
+def agent():
+    agent = SimpleProblemSolvingAgent()
+    agent.enable_cache(maxsize=4)
+    return agent
+
+
+def test_repeated_query_hits_cache(agent):
+    first = agent.astar_search("Arad", "Bucharest")
+    assert agent.astar_search("Arad", "Bucharest") == first
+    stats = agent.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_symmetric_results_shared(agent):
+    path, cost = agent.astar_search("Arad", "Bucharest")
+    assert agent.astar_search("Bucharest", "Arad") == (path[::-1], cost)
+    assert agent.cache.hits == 1
+    # Greedy is direction-dependent and must not be served reversed
+    agent.greedy_best_first_search("Arad", "Bucharest")
+    agent.greedy_best_first_search("Bucharest", "Arad")
+    assert agent.cache.hits == 1
+
+
+def test_lru_eviction(agent):
+    for goal in ["Sibiu", "Fagaras", "Pitesti", "Craiova", "Lugoj"]:
+        agent.astar_search("Arad", goal)
+    assert len(agent.cache) == 4
+    assert agent.cache.evictions == 1
+    agent.astar_search("Arad", "Sibiu")  # evicted first
+    assert agent.cache.hits == 0
+
+
+def test_version_change_invalidates(agent):
+    agent.astar_search("Arad", "Bucharest")
+    agent.compiled.version += 1
+    agent.astar_search("Arad", "Bucharest")
+    assert agent.cache.hits == 0
+    assert agent.cache.invalidations == 1
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = RouteCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("k", "v", version=0)
+    assert cache.get("k", 0) == "v"
+    now[0] = 11
+    assert cache.get("k", 0) is None
+    assert cache.expirations == 1
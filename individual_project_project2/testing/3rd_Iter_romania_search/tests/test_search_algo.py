@@ -1,13 +1,3 @@
-import pytest
-from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
-
-
-@pytest.fixture
-# Provide a fresh SPSA agent instance for each test
-def agent():
-    return SimpleProblemSolvingAgent()
-
-
 def test_greedy_best_first_search(agent):
     path, cost = agent.greedy_best_first_search("Arad", "Bucharest")
     assert path[0] == "Arad"
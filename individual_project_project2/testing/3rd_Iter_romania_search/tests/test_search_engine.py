@@ -0,0 +1,57 @@
+import pytest
+from compiled_graph import CompiledGraph
+from search_engine import SearchEngine
+
+
+def test_astar_reports_stats(agent):
+    path, cost = agent.astar_search("Arad", "Bucharest")
+    assert cost == 418
+    stats = agent.last_search_stats
+    assert 0 < stats.expanded < agent.compiled.num_nodes
+    assert stats.peak_frontier >= 1
+    assert stats.pushes >= stats.expanded
+
+
+def test_engine_reuse_between_queries(agent):
+    first = agent.astar_search("Arad", "Bucharest")
+    agent.greedy_best_first_search("Neamt", "Drobeta")
+    assert agent.astar_search("Arad", "Bucharest") == first
+
+
+def test_unreachable_goal():
+    graph = CompiledGraph.from_road_map(
+        {"A": {"B": 1}, "B": {"A": 1}, "C": {}}, {"A": (0, 0), "B": (1, 0), "C": (5, 5)}
+    )
+    engine = SearchEngine(graph)
+    assert engine.astar(0, 2, lambda u: 0) == ([], float("inf"))
+    assert engine.greedy(0, 2, lambda u: 0) == ([], float("inf"))
+    assert engine.astar(0, 1, lambda u: 0) == ([0, 1], 1)
+
+
+@pytest.mark.parametrize("method", ["bidirectional_dijkstra", "bidirectional_astar"])
+def test_bidirectional_matches_astar(agent, method):
+    for start in agent.graph:
+        for goal in agent.graph:
+            path, cost = getattr(agent, method)(start, goal)
+            assert cost == agent.astar_search(start, goal)[1]
+            assert path[0] == start and path[-1] == goal
+            assert cost == agent.calculate_path_cost(path)
+
+
+def test_uniform_cost_and_weighted_astar(agent):
+    for start in agent.graph:
+        for goal in agent.graph:
+            optimal = agent.astar_search(start, goal)[1]
+            assert agent.uniform_cost_search(start, goal)[1] == optimal
+            s, g = agent.compiled.node_id(start), agent.compiled.node_id(goal)
+            h = agent._astar_heuristic_table(g).__getitem__
+            path, cost = agent.engine.best_first(s, g, h, weight=2.0)
+            assert optimal <= cost <= 2.0 * optimal
+            assert cost == agent._path_cost_ids(path)
+
+
+def test_edge_index_matches_csr(agent):
+    graph = agent.compiled
+    for u in range(graph.num_nodes):
+        for v, w in graph.neighbors(u):
+            assert graph.edge_weight(u, v) == w
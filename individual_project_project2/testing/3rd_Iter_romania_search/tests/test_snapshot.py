@@ -0,0 +1,25 @@
+import itertools
+
+import numpy as np
+from compiled_graph import CompiledGraph
+from SimpleProblemSolvingAgent import SimpleProblemSolvingAgent
+
+
+def test_snapshot_is_memory_mapped(tmp_path):
+    SimpleProblemSolvingAgent().compiled.save(tmp_path / "romania")
+    graph = CompiledGraph.load(tmp_path / "romania")
+    assert isinstance(graph.targets.base, np.memmap) or isinstance(graph.targets, np.memmap)
+    assert not graph.weights.flags.writeable
+
+
+def test_snapshot_agent_matches_dict_agent(tmp_path):
+    agent = SimpleProblemSolvingAgent()
+    agent.compiled.save(tmp_path / "romania")
+    loaded = SimpleProblemSolvingAgent.from_snapshot(tmp_path / "romania")
+    assert sorted(loaded.graph) == sorted(agent.graph)
+    for start, goal in itertools.permutations(agent.graph, 2):
+        assert loaded.astar_search(start, goal) == agent.astar_search(start, goal)
+
+
+def test_default_agents_share_compiled_graph():
+    assert SimpleProblemSolvingAgent().compiled is SimpleProblemSolvingAgent().compiled
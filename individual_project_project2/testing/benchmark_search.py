@@ -0,0 +1,443 @@
+"""
+Benchmark harness for the three Romania route-search iterations.
+
+    1st_Iter_RomaniaCitySearch   module-level functions over a global dict map
+    2nd_Iter_assignment2         Graph / Node / best_first_graph_search design
+    3rd_Iter_romania_search      class-based agent on a compiled CSR graph
+
+Every algorithm of every iteration is run on the same workloads:
+
+  * all ordered city pairs of the Romania map (the 3rd-iteration map is injected
+    into the older iterations so that all of them answer the same questions);
+  * synthetic grid graphs and random geometric graphs of growing size.
+
+For each (graph, iteration, algorithm) the harness records latency percentiles,
+nodes expanded (where the implementation exposes it or it can be counted),
+peak traced memory, the fraction of queries solved and the ratio of the
+returned cost to the optimal cost; exceptions raised by an implementation are
+counted per query instead of aborting the run.  Results are written as JSON that can be
+diffed across commits:
+
+    python benchmark_search.py --sizes 100 400 1600 --queries 50 --output bench.json
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ITER1_DIR = os.path.join(HERE, "1st_Iter_RomaniaCitySearch")
+ITER2_DIR = os.path.join(HERE, "2nd_Iter_assignment2")
+ITER3_DIR = os.path.join(HERE, "3rd_Iter_romania_search")
+
+# The 1st-iteration annealing schedule never reaches 0, so a walk stuck in a local
+# minimum would loop forever; the harness caps it at this many steps.
+ITER1_ANNEALING_STEPS = 10000
+
+
+def _load_module(alias: str, directory: str, filename: str):
+    """Import 'filename' from 'directory' under a unique module name."""
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(alias, os.path.join(directory, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+iter1 = _load_module("iter1_search_algorithms", ITER1_DIR, "search_algorithms.py")
+iter2 = _load_module("iter2_agent", ITER2_DIR, "SimpleProblemSolvingAgent.py")
+iter3 = _load_module("iter3_agent", ITER3_DIR, "SimpleProblemSolvingAgent.py")
+iter3_engine = _load_module("iter3_search_engine", ITER3_DIR, "search_engine.py")
+
+
+# -----------------------------------------------------------------------------
+# Workloads
+# -----------------------------------------------------------------------------
+class Workload:
+    """A road map plus the (start, goal) queries to run on it."""
+
+    def __init__(self, name: str, road_map: dict, coords: dict, queries: list):
+        self.name = name
+        self.road_map = road_map
+        self.coords = coords
+        self.queries = queries
+        self.agent = iter3.SimpleProblemSolvingAgent(road_map, coords)
+        # Optimal costs from one shortest-path tree per distinct origin
+        graph = self.agent.compiled
+        self.optimal = {}
+        for start in {s for s, _ in queries}:
+            dist = iter3_engine.shortest_distances(graph, graph.node_id(start))
+            for s, goal in queries:
+                if s == start:
+                    self.optimal[(s, goal)] = dist[graph.node_id(goal)]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.road_map)
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(n) for n in self.road_map.values())
+
+
+def romania_workload() -> Workload:
+    road_map, coords = iter3.ROMANIA_ROAD_MAP, iter3.CITY_COORDINATES
+    queries = [(s, g) for s in road_map for g in road_map if s != g]
+    return Workload("romania", road_map, coords, queries)
+
+
+def _stretch(rng, a, b) -> int:
+    """Road length between two points: straight line times a detour factor (keeps h admissible)."""
+    return int(math.ceil(math.dist(a, b) * (1.0 + 0.3 * rng.random()))) + 1
+
+
+def grid_workload(n: int, queries: int, seed: int) -> Workload:
+    """Square grid with roughly n nodes and 4-neighbour roads."""
+    rng = random.Random(seed)
+    k = max(2, int(round(math.sqrt(n))))
+    coords = {f"g{r}_{c}": (c * 10.0, r * 10.0) for r in range(k) for c in range(k)}
+    road_map = {name: {} for name in coords}
+    for r in range(k):
+        for c in range(k):
+            a = f"g{r}_{c}"
+            for b in (f"g{r}_{c + 1}" if c + 1 < k else None, f"g{r + 1}_{c}" if r + 1 < k else None):
+                if b is not None:
+                    w = _stretch(rng, coords[a], coords[b])
+                    road_map[a][b] = w
+                    road_map[b][a] = w
+    return Workload(f"grid_{k * k}", road_map, coords, _sample_queries(road_map, queries, rng))
+
+
+def random_geometric_workload(n: int, queries: int, seed: int, degree: int = 3) -> Workload:
+    """
+    Random points in a square, each joined to its 'degree' nearest neighbours,
+    plus a chain through the points sorted by x so the graph is connected.
+    """
+    rng = random.Random(seed)
+    side = 10.0 * math.sqrt(n)
+    points = np.array([(rng.random() * side, rng.random() * side) for _ in range(n)])
+    names = [f"r{i}" for i in range(n)]
+    coords = {name: tuple(p) for name, p in zip(names, points.tolist())}
+    road_map = {name: {} for name in names}
+
+    def connect(i, j):
+        a, b = names[i], names[j]
+        if i != j and b not in road_map[a]:
+            w = _stretch(rng, coords[a], coords[b])
+            road_map[a][b] = w
+            road_map[b][a] = w
+
+    for start in range(0, n, 512):
+        block = points[start:start + 512]
+        d = ((block[:, None, :] - points[None, :, :]) ** 2).sum(axis=-1)
+        nearest = np.argsort(d, axis=1)[:, 1:degree + 1]
+        for offset, row in enumerate(nearest.tolist()):
+            for j in row:
+                connect(start + offset, j)
+    order = np.argsort(points[:, 0]).tolist()
+    for i, j in zip(order, order[1:]):
+        connect(i, j)
+    return Workload(f"rgg_{n}", road_map, coords, _sample_queries(road_map, queries, rng))
+
+
+def _sample_queries(road_map: dict, count: int, rng) -> list:
+    names = list(road_map)
+    return [tuple(rng.sample(names, 2)) for _ in range(count)]
+
+
+# -----------------------------------------------------------------------------
+# Runners: one per iteration, each returning (path or None, cost, nodes expanded or None)
+# -----------------------------------------------------------------------------
+class CountingMap(dict):
+    """Road map that counts adjacency lookups, i.e. node expansions of the 1st iteration."""
+
+    lookups = 0
+
+    def __getitem__(self, key):
+        CountingMap.lookups += 1
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        CountingMap.lookups += 1
+        return dict.get(self, key, default)
+
+
+class Iter1Runner:
+    iteration = "1st_iter"
+    algorithms = ("greedy_best_first_search", "a_star_search", "hill_climbing", "simulated_annealing")
+
+    def prepare(self, workload):
+        self.road_map = workload.road_map
+        # The 1st iteration reads its map and coordinates from module globals
+        iter1.romania_map = CountingMap(workload.road_map)
+        iter1.city_coordinates = workload.coords
+
+    def skip(self, algorithm, workload):
+        return False
+
+    def run(self, algorithm, start, goal):
+        CountingMap.lookups = 0
+        if algorithm == "simulated_annealing":
+            path = iter1.simulated_annealing(start, goal, schedule=_capped_iter1_schedule)
+        else:
+            path = getattr(iter1, algorithm)(start, goal)
+        if not path or path[-1] != goal:
+            return None, math.inf, CountingMap.lookups
+        cost = sum(self.road_map[a][b] for a, b in zip(path, path[1:]))
+        return path, cost, CountingMap.lookups
+
+
+def _capped_iter1_schedule(t):
+    """The 1st-iteration default schedule, returning 0 after ITER1_ANNEALING_STEPS steps."""
+    return max(0.01, 0.99 ** t) if t < ITER1_ANNEALING_STEPS else 0
+
+
+class CountingProblem(iter2.RomaniaProblem):
+    """2nd-iteration problem that counts successor generation, i.e. node expansions."""
+
+    expansions = 0
+
+    def successors(self, state):
+        CountingProblem.expansions += 1
+        return super().successors(state)
+
+
+class Iter2Runner:
+    iteration = "2nd_iter"
+    algorithms = (
+        "greedy_best_first_search", "uniform_cost_search", "astar_search", "hill_climbing", "simulated_annealing",
+    )
+
+    def prepare(self, workload):
+        self.graph = iter2.Graph({a: list(nbrs.items()) for a, nbrs in workload.road_map.items()})
+        self.coords = workload.coords
+
+    def skip(self, algorithm, workload):
+        return False
+
+    def run(self, algorithm, start, goal):
+        CountingProblem.expansions = 0
+        problem = CountingProblem(start, goal, self.graph, self.coords)
+        node = getattr(iter2, algorithm)(problem)
+        if node is None or node.state != goal:
+            return None, math.inf, CountingProblem.expansions
+        return node.solution_path(), node.path_cost, CountingProblem.expansions
+
+
+class Iter3Runner:
+    iteration = "3rd_iter"
+    algorithms = (
+        "greedy_best_first_search",
+        "uniform_cost_search",
+        "astar_search",
+        "astar_search+alt",
+        "weighted_astar_search",
+        "anytime_astar_search",
+        "bidirectional_dijkstra",
+        "bidirectional_astar",
+        "ch_search",
+        "hill_climbing",
+        "simulated_annealing",
+        "parallel_simulated_annealing",
+    )
+    # Methods that report SearchStats through agent.last_search_stats
+    counted = {
+        "greedy_best_first_search",
+        "uniform_cost_search",
+        "astar_search",
+        "astar_search+alt",
+        "weighted_astar_search",
+        "bidirectional_dijkstra",
+        "bidirectional_astar",
+        "ch_search",
+    }
+
+    def prepare(self, workload):
+        self.workload = workload
+        self.plain = workload.agent
+        self.plain.landmarks = None
+        self.alt = iter3.SimpleProblemSolvingAgent(compiled=workload.agent.compiled)
+        t = time.perf_counter()
+        self.alt.build_landmarks(k=8)
+        self.preprocess = {"astar_search+alt": time.perf_counter() - t}
+        t = time.perf_counter()
+        self.plain.build_hierarchy()
+        self.preprocess["ch_search"] = time.perf_counter() - t
+
+    def skip(self, algorithm, workload):
+        return False
+
+    def run(self, algorithm, start, goal):
+        if algorithm == "astar_search+alt":
+            agent, method = self.alt, "astar_search"
+        else:
+            agent, method = self.plain, algorithm
+        path, cost = getattr(agent, method)(start, goal)
+        expanded = agent.last_search_stats.expanded if algorithm in self.counted else None
+        if not path or path[-1] != goal:
+            return None, math.inf, expanded
+        return path, cost, expanded
+
+
+RUNNERS = (Iter1Runner, Iter2Runner, Iter3Runner)
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def benchmark(workload, runner, algorithm, memory_queries: int = 5) -> dict:
+    """Run one algorithm on every query of a workload and summarize the measurements."""
+    latencies, expanded, ratios = [], [], []
+    solved = 0
+    errors, first_error = 0, None
+    for start, goal in workload.queries:
+        t = time.perf_counter()
+        try:
+            path, cost, nodes = runner.run(algorithm, start, goal)
+        except Exception as exc:  # e.g. the 2nd iteration's heap cannot order tied Nodes
+            errors += 1
+            first_error = first_error or f"{type(exc).__name__}: {exc}"
+            continue
+        latencies.append((time.perf_counter() - t) * 1000.0)
+        if nodes is not None:
+            expanded.append(nodes)
+        if path is not None:
+            solved += 1
+            optimal = workload.optimal[(start, goal)]
+            if optimal > 0:
+                ratios.append(cost / optimal)
+
+    # Peak memory on a few queries, separately, because tracing slows everything down
+    peak = 0
+    for start, goal in workload.queries[:memory_queries]:
+        tracemalloc.start()
+        try:
+            runner.run(algorithm, start, goal)
+        except Exception:
+            pass  # already counted above
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    result = {
+        "graph": workload.name,
+        "nodes": workload.num_nodes,
+        "edges": workload.num_edges,
+        "iteration": runner.iteration,
+        "algorithm": algorithm,
+        "queries": len(workload.queries),
+        "solved": solved,
+        "errors": errors,
+        "latency_ms": {
+            "mean": float(np.mean(latencies)) if latencies else None,
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": float(np.max(latencies)) if latencies else None,
+        },
+        "nodes_expanded_mean": float(np.mean(expanded)) if expanded else None,
+        "peak_memory_kb": peak / 1024.0,
+        "quality_ratio": {
+            "mean": float(np.mean(ratios)) if ratios else None,
+            "max": float(np.max(ratios)) if ratios else None,
+        },
+    }
+    preprocess = getattr(runner, "preprocess", {}).get(algorithm)
+    if preprocess is not None:
+        result["preprocess_s"] = preprocess
+    if first_error is not None:
+        result["first_error"] = first_error
+    return result
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(sizes, queries: int, seed: int, iterations=None, algorithms=None, log=sys.stderr) -> dict:
+    """Benchmark every selected iteration/algorithm on Romania plus synthetic graphs."""
+    workloads = [romania_workload()]
+    for n in sizes:
+        workloads.append(grid_workload(n, queries, seed))
+        workloads.append(random_geometric_workload(n, queries, seed))
+
+    results = []
+    for workload in workloads:
+        for runner_cls in RUNNERS:
+            runner = runner_cls()
+            if iterations and runner.iteration not in iterations:
+                continue
+            runner.prepare(workload)
+            for algorithm in runner.algorithms:
+                if algorithms and algorithm not in algorithms:
+                    continue
+                if runner.skip(algorithm, workload):
+                    continue
+                random.seed(seed)  # the older iterations use the global RNG
+                result = benchmark(workload, runner, algorithm)
+                results.append(result)
+                if log is not None:
+                    p50 = result["latency_ms"]["p50"]
+                    print(
+                        f"{workload.name:>12} {runner.iteration} {algorithm:<30} "
+                        f"p50={'-' if p50 is None else f'{p50:.3f}ms'} "
+                        f"solved={result['solved']}/{result['queries']} errors={result['errors']}",
+                        file=log,
+                    )
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "queries": queries,
+            "seed": seed,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 400, 1600],
+                        help="approximate node counts of the synthetic graphs")
+    parser.add_argument("--queries", type=int, default=50, help="random queries per synthetic graph")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", nargs="*", choices=[r.iteration for r in RUNNERS])
+    parser.add_argument("--algorithms", nargs="*", help="only run these algorithm names")
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_all(args.sizes, args.queries, args.seed, args.iterations, args.algorithms)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from search import *
 
+import NQueensGA
+
 def fitness(q):
     non_attacking = 0
     for row1 in range(len(q)):
@@ -29,5 +31,10 @@ def main():
 
     print(fitness(solution))
 
+    # the same search on the vectorized engine: the population is one (100, 8) matrix
+    # and fitness, selection, crossover and mutation work on all individuals at once
+    result = NQueensGA.genetic_algorithm(NQueensGA.init_population(100, 8), f_thres=25)
+    print(result.individual.tolist(), result.fitness)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
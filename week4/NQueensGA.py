@@ -0,0 +1,146 @@
+"""
+Vectorized genetic algorithm for the N-Queens problem.
+
+An individual is the column of the queen in every row, as in EightQueen.py; a
+population is a (P, N) integer matrix with one individual per row.  Every step
+of a generation works on the whole matrix at once.
+
+Fitness is the number of non-attacking pairs.  Two queens in different rows
+attack each other when they share a column, a diagonal (row + col) or an
+anti-diagonal (row - col), and never in more than one of these, so
+
+    fitness = C(N, 2) - sum over columns and diagonals of C(k, 2)
+
+with k the number of queens on each line.  The counts come from one bincount
+per line family over a block of the flattened population (each individual
+shifted into its own range of bins), so fitness costs O(P * N) array work
+instead of EightQueen.fitness's O(N^2) Python loop per individual.
+
+Selection (tournament or roulette wheel), one-point crossover and mutation
+(one gene of an individual reset to a random column with probability pmut,
+as in search.mutate) are index and mask operations on the matrix.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+GAResult = namedtuple("GAResult", "individual fitness generations history")
+
+# Population elements per block of fitness work: the bincount bins of a block
+# stay in cache, which is several times faster than one pass over everything
+CHUNK_ELEMENTS = 1 << 16
+
+
+def max_fitness(n):
+    """ number of queen pairs: the fitness of a solution """
+    return n * (n - 1) // 2
+
+
+def gene_dtype(n):
+    """ smallest unsigned type holding the columns 0..n-1 """
+    return np.uint16 if n <= 1 << 16 else np.uint32
+
+
+def init_population(pop_number, n, rng=None):
+    """ (pop_number, n) matrix of random individuals """
+    rng = np.random.default_rng(rng)
+    return rng.integers(0, n, size=(pop_number, n), dtype=gene_dtype(n))
+
+
+def fitness(population):
+    """ non-attacking pairs of every individual (row) of 'population', as an int64 array """
+    population = np.atleast_2d(population)
+    p, n = population.shape
+    rows = np.arange(n, dtype=np.int32)
+    result = np.empty(p, dtype=np.int64)
+    step = max(1, CHUNK_ELEMENTS // max(n, 1))
+    for start in range(0, p, step):
+        cols = population[start:start + step].astype(np.int32)
+        m = len(cols)
+        squares = np.zeros(m, dtype=np.int64)
+        for lines, bins in ((cols, n), (cols + rows, 2 * n - 1), (rows - cols + (n - 1), 2 * n - 1)):
+            # shift individual i into bins [i * bins, (i + 1) * bins) and count all at once
+            flat = (lines + (np.arange(m, dtype=np.int32) * bins)[:, None]).ravel()
+            k = np.bincount(flat, minlength=m * bins).reshape(m, bins)
+            squares += np.einsum("ij,ij->i", k, k)
+        # sum of C(k, 2) = (sum of k^2 - sum of k) / 2, and every family sums k to n
+        result[start:start + step] = max_fitness(n) - (squares - 3 * n) // 2
+    return result
+
+
+def tournament_selection(fit, count, size=3, rng=None):
+    """ indices of 'count' winners of tournaments among 'size' random individuals """
+    rng = np.random.default_rng(rng)
+    entrants = rng.integers(0, len(fit), size=(count, size))
+    return entrants[np.arange(count), np.argmax(fit[entrants], axis=1)]
+
+
+def roulette_selection(fit, count, rng=None):
+    """ indices of 'count' individuals drawn with probability proportional to fitness """
+    rng = np.random.default_rng(rng)
+    wheel = np.cumsum(fit, dtype=np.float64)
+    if wheel[-1] <= 0:
+        return rng.integers(0, len(fit), size=count)
+    return np.minimum(np.searchsorted(wheel, rng.random(count) * wheel[-1], side="right"), len(fit) - 1)
+
+
+def crossover(mothers, fathers, rng=None):
+    """ one-point crossover of matching rows: the mother's genes before a random cut,
+        the father's after it """
+    rng = np.random.default_rng(rng)
+    count, n = mothers.shape
+    cut = rng.integers(0, n, size=count)
+    return np.where(np.arange(n)[None, :] < cut[:, None], mothers, fathers)
+
+
+def mutate(population, pmut, rng=None):
+    """ with probability pmut per individual, reset one random gene to a random column (in place) """
+    rng = np.random.default_rng(rng)
+    count, n = population.shape
+    rows = np.flatnonzero(rng.random(count) < pmut)
+    population[rows, rng.integers(0, n, size=len(rows))] = rng.integers(0, n, size=len(rows))
+    return population
+
+
+def genetic_algorithm(population, f_thres=None, ngen=1000, pmut=0.1, selection="tournament",
+                      tournament_size=3, elite=1, time_budget=None, rng=None):
+    """ evolve 'population' (a (P, N) matrix) until an individual reaches 'f_thres'
+        (default: a solution), 'ngen' generations pass or 'time_budget' seconds run out.
+        The 'elite' best individuals are copied into the next generation unchanged.
+        Returns GAResult(individual, fitness, generations, history) with the best
+        fitness of every generation in 'history' """
+    rng = np.random.default_rng(rng)
+    population = np.array(population)
+    p, n = population.shape
+    if f_thres is None:
+        f_thres = max_fitness(n)
+    if selection not in ("tournament", "roulette"):
+        raise ValueError("Unknown selection: {}".format(selection))
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    elite = min(elite, p)
+
+    fit = fitness(population)
+    history = [int(fit.max())]
+    generation = 0
+    while history[-1] < f_thres and generation < ngen:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        count = p - elite
+        if selection == "tournament":
+            parents = tournament_selection(fit, 2 * count, tournament_size, rng)
+        else:
+            parents = roulette_selection(fit, 2 * count, rng)
+        children = crossover(population[parents[:count]], population[parents[count:]], rng)
+        mutate(children, pmut, rng)
+        if elite:
+            best = np.argpartition(-fit, elite - 1)[:elite]
+            children = np.concatenate((population[best], children))
+        population = children
+        fit = fitness(population)
+        history.append(int(fit.max()))
+        generation += 1
+
+    best = int(np.argmax(fit))
+    return GAResult(population[best].copy(), int(fit[best]), generation, history)
@@ -0,0 +1,424 @@
+"""
+TSPLIB instances and tours: reading, checkpointing and checking against optima.
+
+    read_tsp(path)       .tsp file -> TSPInstance.  NODE_COORD_SECTION is read
+                         in blocks of lines straight into a NumPy array;
+                         EDGE_WEIGHT_SECTION (explicit instances) is written
+                         block by block into a memory-mapped .npy file next to
+                         the instance, which later reads reuse as long as it is
+                         newer than the .tsp file.
+    read_tour(path)      .tour / .opt.tour file -> 0-based order array
+    write_tour(path, ..) an order array as a TSPLIB tour file
+    DistanceRows         the TSPLIB distances of a coordinate instance as a
+                         matrix-like object computed on demand, so the local
+                         search works on GEO/ATT/... metrics without an n x n array
+    Checkpoint           best tour of a long run, saved every 'interval' seconds;
+                         load() gives it back to resume the run
+    compare_to_optimal   length of a tour, the known optimum and the gap
+
+Tour lengths use the TSPLIB distance functions (EUC_2D rounds every edge to the
+nearest integer, GEO works on the earth's surface, ...), so they match the
+published optimal values.  Run as a script to solve an instance:
+
+    python TSPLib.py a280.tsp --opt a280.opt.tour --checkpoint a280.best.tour --time 60
+"""
+
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import TSPMultiStart
+
+# Lines read per block while streaming a section
+BLOCK_LINES = 65536
+
+# Metrics whose tours the local search can rank from the coordinates alone
+PLANAR_TYPES = ("EUC_2D", "CEIL_2D")
+COORDINATE_TYPES = ("EUC_2D", "CEIL_2D", "ATT", "GEO", "MAN_2D", "MAX_2D")
+
+# Which triangle an explicit EDGE_WEIGHT_FORMAT lists, row by row; the column
+# formats of a symmetric matrix list the other triangle's rows in the same order
+_TRIANGLES = {
+    "FULL_MATRIX": ("full", False),
+    "UPPER_ROW": ("upper", False),
+    "LOWER_ROW": ("lower", False),
+    "UPPER_DIAG_ROW": ("upper", True),
+    "LOWER_DIAG_ROW": ("lower", True),
+    "UPPER_COL": ("lower", False),
+    "LOWER_COL": ("upper", False),
+    "UPPER_DIAG_COL": ("lower", True),
+    "LOWER_DIAG_COL": ("upper", True),
+}
+
+OptimalityGap = namedtuple("OptimalityGap", "length optimal gap")
+
+
+class TSPInstance:
+
+    """ A TSPLIB instance: its header fields and either coordinates or an explicit matrix """
+
+    def __init__(self, name, dimension, edge_weight_type, coordinates=None, matrix=None, header=None):
+        self.name = name
+        self.dimension = dimension
+        self.edge_weight_type = edge_weight_type
+        self.coordinates = coordinates
+        self.matrix = matrix
+        self.header = header or {}
+
+    def __len__(self):
+        return self.dimension
+
+    def distances(self, a, b):
+        """ TSPLIB distance between cities a[i] and b[i] (index arrays) """
+        a, b = np.asarray(a), np.asarray(b)
+        kind = self.edge_weight_type
+        if kind == "EXPLICIT":
+            return np.asarray(self.matrix[a, b], dtype=np.float64)
+        if kind not in COORDINATE_TYPES:
+            raise ValueError("Unsupported EDGE_WEIGHT_TYPE: {}".format(kind))
+        p, q = self.coordinates[a], self.coordinates[b]
+        dx, dy = p[..., 0] - q[..., 0], p[..., 1] - q[..., 1]
+        if kind == "EUC_2D":
+            return np.floor(np.sqrt(dx * dx + dy * dy) + 0.5)
+        if kind == "CEIL_2D":
+            return np.ceil(np.sqrt(dx * dx + dy * dy))
+        if kind == "MAN_2D":
+            return np.floor(np.abs(dx) + np.abs(dy) + 0.5)
+        if kind == "MAX_2D":
+            return np.maximum(np.floor(np.abs(dx) + 0.5), np.floor(np.abs(dy) + 0.5))
+        if kind == "ATT":
+            r = np.sqrt((dx * dx + dy * dy) / 10.0)
+            t = np.floor(r + 0.5)
+            return np.where(t < r, t + 1, t)
+        # GEO: x is the latitude, y the longitude, in DDD.MM degrees and minutes
+        lat_p, lon_p = _geo_radians(p[..., 0]), _geo_radians(p[..., 1])
+        lat_q, lon_q = _geo_radians(q[..., 0]), _geo_radians(q[..., 1])
+        q1, q2, q3 = np.cos(lon_p - lon_q), np.cos(lat_p - lat_q), np.cos(lat_p + lat_q)
+        arc = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+        return np.where(a == b, 0.0, np.trunc(6378.388 * arc + 1.0))
+
+    def tour_length(self, order):
+        """ TSPLIB length of the closed tour 'order' """
+        order = np.asarray(order)
+        return float(self.distances(order, np.roll(order, -1)).sum())
+
+    def distance_matrix(self):
+        """ all TSPLIB distances as an (n, n) array (the memory map itself for explicit instances) """
+        if self.matrix is not None:
+            return self.matrix
+        idx = np.arange(self.dimension)
+        return self.distances(idx[:, None], idx[None, :])
+
+    def search_input(self):
+        """ keyword arguments for LocalSearch / multi_start: the coordinates when the
+            straight-line distance ranks tours like the TSPLIB metric, the explicit
+            matrix, or else DistanceRows computing the TSPLIB distances as needed """
+        if self.edge_weight_type in PLANAR_TYPES:
+            return {"coordinates": self.coordinates}
+        if self.matrix is not None:
+            return {"matrix": self.matrix}
+        return {"matrix": DistanceRows(self)}
+
+
+class DistanceRows:
+
+    """ The TSPLIB distance matrix of a coordinate instance, computed on demand:
+        rows[a, b] for cities or index arrays and rows[i] / rows[start:stop] for
+        whole rows, which is all the local search asks of a matrix """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.shape = (instance.dimension, instance.dimension)
+        self.dtype = np.dtype(np.float64)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            a, b = key
+            return self.instance.distances(a, b)
+        rows = np.arange(self.shape[0])[key]
+        return self.instance.distances(rows[..., None], np.arange(self.shape[1]))
+
+
+def _geo_radians(value):
+    degrees = np.trunc(value)
+    return 3.141592 * (degrees + 5.0 * (value - degrees) / 3.0) / 180.0
+
+
+def _header_line(line):
+    key, _, value = line.partition(":")
+    return key.strip().upper(), value.strip()
+
+
+def read_tsp(path, matrix_path=None):
+    """ read a TSPLIB .tsp file; an explicit matrix goes to the memory-mapped
+        'matrix_path' (default: the instance path with .matrix.npy) """
+    header = {}
+    coordinates = matrix = None
+    with open(path) as f:
+        for line in f:
+            key, value = _header_line(line)
+            if not key or key == "EOF":
+                continue
+            if key.endswith("_SECTION"):
+                n = int(header["DIMENSION"])
+                if key == "NODE_COORD_SECTION":
+                    coordinates = _read_coordinates(f, n)
+                elif key == "EDGE_WEIGHT_SECTION":
+                    matrix = _read_matrix(f, n, header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"),
+                                          matrix_path or os.path.splitext(path)[0] + ".matrix.npy",
+                                          os.path.getmtime(path))
+                elif key == "DISPLAY_DATA_SECTION":
+                    for _ in itertools.islice(f, n):
+                        pass
+                else:  # FIXED_EDGES_SECTION and similar lists end with -1
+                    for skipped in f:
+                        if skipped.strip() == "-1":
+                            break
+                continue
+            header[key] = value
+    kind = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+    if kind == "EXPLICIT" and matrix is None:
+        raise ValueError("{}: EXPLICIT instance without EDGE_WEIGHT_SECTION".format(path))
+    if kind != "EXPLICIT" and coordinates is None:
+        raise ValueError("{}: no NODE_COORD_SECTION".format(path))
+    return TSPInstance(header.get("NAME", os.path.basename(path)), int(header["DIMENSION"]), kind,
+                       coordinates, matrix, header)
+
+
+def _read_coordinates(lines, n):
+    """ the next n 'id x y' lines as an (n, 2) array indexed by id - 1 """
+    coordinates = np.empty((n, 2), dtype=np.float64)
+    done = 0
+    while done < n:
+        block = list(itertools.islice(lines, min(BLOCK_LINES, n - done)))
+        if not block:
+            raise ValueError("NODE_COORD_SECTION ends after {} of {} cities".format(done, n))
+        rows = np.loadtxt(block, dtype=np.float64, ndmin=2)
+        coordinates[rows[:, 0].astype(np.int64) - 1] = rows[:, 1:3]
+        done += len(block)
+    return coordinates
+
+
+def _read_matrix(lines, n, weight_format, matrix_path, source_mtime):
+    """ stream an EDGE_WEIGHT_SECTION into a symmetric memory-mapped (n, n) .npy file """
+    weight_format = weight_format.upper()
+    if weight_format not in _TRIANGLES:
+        raise ValueError("Unsupported EDGE_WEIGHT_FORMAT: {}".format(weight_format))
+    triangle, diagonal = _TRIANGLES[weight_format]
+    row_spans = [_row_span(i, n, triangle, diagonal) for i in range(n)]
+    expected = sum(stop - start for start, stop in row_spans)
+
+    if os.path.exists(matrix_path) and os.path.getmtime(matrix_path) >= source_mtime:
+        cached = np.load(matrix_path, mmap_mode="r")
+        if cached.shape == (n, n):
+            _skip_values(lines, expected)
+            return cached
+
+    matrix = np.lib.format.open_memmap(matrix_path, mode="w+", dtype=np.float64, shape=(n, n))
+    row, col = 0, row_spans[0][0] if n else 0
+    pending = np.empty(0)
+    read = 0
+    while read < expected:
+        values = _next_values(lines, min(expected - read, BLOCK_LINES * 16))
+        if not len(values):
+            raise ValueError("EDGE_WEIGHT_SECTION ends after {} of {} values".format(read, expected))
+        read += len(values)
+        pending = np.concatenate((pending, values))
+        # Write whole runs of the current row, moving on when a row is complete
+        while len(pending) and row < n:
+            stop = row_spans[row][1]
+            take = min(stop - col, len(pending))
+            matrix[row, col:col + take] = pending[:take]
+            pending = pending[take:]
+            col += take
+            if col == stop:
+                row += 1
+                while row < n and row_spans[row][0] == row_spans[row][1]:
+                    row += 1
+                col = row_spans[row][0] if row < n else 0
+    if triangle != "full":
+        _mirror(matrix, triangle)
+    matrix.flush()
+    return np.load(matrix_path, mmap_mode="r")
+
+
+def _row_span(i, n, triangle, diagonal):
+    """ (first, stop) column of row i listed by a triangle format """
+    if triangle == "full":
+        return 0, n
+    if triangle == "upper":
+        return (i if diagonal else i + 1), n
+    return 0, (i + 1 if diagonal else i)
+
+
+def _next_values(lines, count):
+    """ at least 'count' numbers from the next lines (whole lines only, so nothing
+        after the section is consumed), or fewer at the end of the file """
+    tokens = []
+    for line in lines:
+        tokens.extend(line.split())
+        if len(tokens) >= count:
+            break
+    return np.array(tokens, dtype=np.float64)
+
+
+def _skip_values(lines, count):
+    for line in lines:
+        count -= len(line.split())
+        if count <= 0:
+            return
+
+
+def _mirror(matrix, triangle, rows=1024):
+    """ fill the missing triangle of a memory-mapped matrix, one block of rows at a time """
+    n = len(matrix)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        block = np.array(matrix[start:stop])
+        transposed = np.array(matrix[:, start:stop]).T
+        i = np.arange(start, stop)[:, None]
+        j = np.arange(n)[None, :]
+        missing = j > i if triangle == "lower" else j < i
+        matrix[start:stop] = np.where(missing, transposed, block)
+
+
+def read_tour(path):
+    """ the TOUR_SECTION of a TSPLIB tour file as a 0-based order array """
+    header = {}
+    order = []
+    with open(path) as f:
+        for line in f:
+            key, value = _header_line(line)
+            if key == "TOUR_SECTION":
+                for line in f:
+                    ids = [int(v) for v in line.split()]
+                    if -1 in ids:
+                        order.extend(ids[: ids.index(-1)])
+                        break
+                    order.extend(ids)
+                break
+            if key:
+                header[key] = value
+    order = np.array(order, dtype=np.int64) - 1
+    if "DIMENSION" in header and len(order) != int(header["DIMENSION"]):
+        raise ValueError("{}: tour has {} cities, DIMENSION is {}".format(path, len(order), header["DIMENSION"]))
+    return order
+
+
+def write_tour(path, order, name="", comment=""):
+    """ write 'order' (0-based) as a TSPLIB tour file """
+    order = np.asarray(order, dtype=np.int64)
+    with open(path, "w") as f:
+        f.write("NAME : {}\n".format(name or os.path.basename(path)))
+        if comment:
+            f.write("COMMENT : {}\n".format(comment))
+        f.write("TYPE : TOUR\nDIMENSION : {}\nTOUR_SECTION\n".format(len(order)))
+        f.write("\n".join(map(str, (order + 1).tolist())))
+        f.write("\n-1\nEOF\n")
+
+
+class Checkpoint:
+
+    """ Best tour of a long run, written to a TSPLIB tour file at most every 'interval' seconds.
+        With an 'instance' the saved length is its TSPLIB tour_length, not the length
+        the search ranked the tour by """
+
+    def __init__(self, path, interval=60.0, name="", clock=time.time, instance=None):
+        self.path = path
+        self.interval = interval
+        self.name = name
+        self.clock = clock
+        self.instance = instance
+        self.saved_at = clock()
+        self.pending = None
+
+    def update(self, order, length):
+        """ remember a new best tour and save it if the last save is 'interval' old """
+        self.pending = (np.array(order), length)
+        if self.clock() - self.saved_at >= self.interval:
+            self.save(*self.pending)
+
+    def save(self, order, length):
+        """ write the tour now; a temporary file is renamed over the old checkpoint,
+            so an interrupted write never leaves a broken one """
+        if self.instance is not None:
+            length = self.instance.tour_length(order)
+        temporary = self.path + ".tmp"
+        write_tour(temporary, order, self.name, "length {!r}".format(float(length)))
+        os.replace(temporary, self.path)
+        self.saved_at = self.clock()
+        self.pending = None
+
+    def load(self):
+        """ (order, length) of the saved tour, or None if there is no checkpoint yet """
+        if not os.path.exists(self.path):
+            return None
+        length = math.inf
+        with open(self.path) as f:
+            for line in f:
+                key, value = _header_line(line)
+                if key == "COMMENT" and value.startswith("length "):
+                    length = float(value.split()[1])
+                    break
+        return read_tour(self.path), length
+
+
+def compare_to_optimal(instance, order, optimal):
+    """ OptimalityGap of tour 'order': 'optimal' is an optimal tour (order array or
+        .tour path) or the optimal length itself """
+    if isinstance(optimal, str):
+        optimal = read_tour(optimal)
+    if np.ndim(optimal):
+        optimal = instance.tour_length(optimal)
+    length = instance.tour_length(order)
+    return OptimalityGap(length, float(optimal), length / optimal - 1.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TSPLib.py", description="Solve a TSPLIB instance with multi-start local search.")
+    parser.add_argument("instance", help="TSPLIB .tsp file")
+    parser.add_argument("--opt", help="optimal .tour file, or the optimal length, to report the gap")
+    parser.add_argument("--checkpoint", help="tour file for the best tour; resumed from when it exists")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between checkpoints (default 60)")
+    parser.add_argument("--time", type=float, help="wall-clock budget in seconds")
+    parser.add_argument("--restarts", type=int, default=16, help="number of restarts (default 16)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=None, help="root random seed")
+    args = parser.parse_args(argv)
+
+    instance = read_tsp(args.instance)
+    checkpoint = resumed = None
+    if args.checkpoint:
+        checkpoint = Checkpoint(args.checkpoint, args.interval, instance.name, instance=instance)
+        saved = checkpoint.load()
+        if saved is not None:
+            resumed = saved[0]
+            print("Resuming from {} (length {:.0f})".format(args.checkpoint, instance.tour_length(resumed)))
+
+    result = TSPMultiStart.multi_start(
+        restarts=args.restarts, workers=args.workers, time_budget=args.time, seed=args.seed,
+        order=resumed, checkpoint=checkpoint, **instance.search_input()
+    )
+    TSPMultiStart.print_log(result)
+    if result.order is None:
+        print("No restart finished within the time budget")
+        return 1
+    print("{}: {} cities, tour length {:.0f}".format(instance.name, len(instance), instance.tour_length(result.order)))
+    if args.opt:
+        optimal = args.opt if os.path.exists(args.opt) else float(args.opt)
+        gap = compare_to_optimal(instance, result.order, optimal)
+        print("optimum {:.0f}, gap {:.2%}".format(gap.optimal, gap.gap))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
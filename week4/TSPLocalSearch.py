@@ -0,0 +1,414 @@
+"""
+Neighbour-list local search for large Traveling Salesman instances.
+
+TSP_problem.two_opt tries random segments, and on a big instance almost all of
+them make the tour worse.  This module only tries moves that can pay off:
+
+  * candidate lists: every city only looks at its k nearest cities
+    (scipy's KD-tree when scipy is installed, a chunked NumPy search otherwise);
+    a move that adds an edge to a far-away city cannot shorten a good tour;
+  * don't-look bits: a queue of "active" cities; a city whose neighbourhood
+    gave no improvement is not looked at again until one of its tour edges
+    changes;
+  * first improvement: the first improving move found is applied.
+
+Three move types are tried from every active city, in both tour directions:
+
+    2-opt      replace two edges by two others (one segment reversal)
+    Or-opt     move a segment of 1-3 cities elsewhere, possibly reversed
+    LK step    Lin-Kernighan style 3-opt: a 2-opt that does not improve on its
+               own is applied tentatively and extended by a second 2-opt;
+               undone if the pair does not improve
+
+All moves are carried out as 2-opt segment reversals on an index array with a
+position array (the shorter side of the cycle is the one reversed), so a move
+costs O(segment) NumPy work and its gain is computed from at most six edges.
+"""
+
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+try:  # optional: much faster neighbour lists on big instances
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - depends on the environment
+    cKDTree = None
+
+EPSILON = 1e-9
+
+
+def neighbour_lists(coordinates=None, matrix=None, k=8, chunk_elements=4000000):
+    """ the k nearest cities of every city, nearest first, as an (n, k) int array.
+        From coordinates with a KD-tree when scipy is available, otherwise (or from an
+        explicit distance matrix) with a NumPy search over blocks of rows """
+    if coordinates is None and matrix is None:
+        raise ValueError("Need coordinates or a distance matrix")
+    n = len(coordinates) if coordinates is not None else len(matrix)
+    k = min(k, n - 1)
+    if coordinates is not None:
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        if cKDTree is not None:
+            _, idx = cKDTree(coordinates).query(coordinates, k + 1)
+            return _drop_self(np.asarray(idx, dtype=np.int64).reshape(n, k + 1), k)
+    rows = max(1, chunk_elements // max(n, 1))
+    result = np.empty((n, k), dtype=np.int64)
+    if matrix is None:
+        coordinates = coordinates - coordinates.mean(axis=0)  # smaller squares, less cancellation
+        squares = (coordinates * coordinates).sum(axis=1)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        if matrix is not None:
+            block = np.array(matrix[start:stop], dtype=np.float64)
+        else:
+            # squared distances |a|^2 + |b|^2 - 2 a.b: same ranking, one matrix product per block
+            block = squares[start:stop, None] + squares[None, :] - 2.0 * (coordinates[start:stop] @ coordinates.T)
+        block[np.arange(stop - start), np.arange(start, stop)] = np.inf  # not its own neighbour
+        part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, part, axis=1), axis=1, kind="stable")
+        result[start:stop] = np.take_along_axis(part, order, axis=1)
+    return result
+
+
+def _drop_self(idx, k):
+    """ remove each city from its own KD-tree result row """
+    n = len(idx)
+    own = idx == np.arange(n)[:, None]
+    # rows where the city itself is missing (duplicates) lose their last column instead
+    own[~own.any(axis=1), -1] = True
+    return idx[~own].reshape(n, k)
+
+
+def nearest_neighbour_tour(coordinates, neighbours, start=0):
+    """ greedy tour: always go to the nearest unvisited city, using the candidate
+        lists first and a vectorized scan of the unvisited cities when they are used up """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    n = len(coordinates)
+    visited = np.zeros(n, dtype=bool)
+    neighbour_rows = neighbours.tolist()
+    order = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        nxt = -1
+        for c in neighbour_rows[current]:
+            if not visited[c]:
+                nxt = c
+                break
+        if nxt == -1:
+            rest = np.flatnonzero(~visited)
+            diff = coordinates[rest] - coordinates[current]
+            nxt = int(rest[np.argmin((diff * diff).sum(axis=1))])
+        visited[nxt] = True
+        order.append(nxt)
+        current = nxt
+    return np.array(order, dtype=np.int64)
+
+
+def greedy_edge_tour(coordinates, neighbours):
+    """ greedy matching tour: take the candidate edges shortest first whenever both
+        ends still have degree < 2 and no cycle is closed, then chain the fragments
+        by nearest free end """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    n = len(coordinates)
+    if n < 3:
+        return np.arange(n, dtype=np.int64)
+    k = neighbours.shape[1]
+    a = np.repeat(np.arange(n), k)
+    b = neighbours.ravel()  # an edge listed from both ends is refused the second time
+    diff = coordinates[a] - coordinates[b]
+    by_length = np.argsort((diff * diff).sum(axis=1), kind="stable")
+
+    degree = [0] * n
+    parent = list(range(n))
+    links = [[] for _ in range(n)]
+
+    def root(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in zip(a[by_length].tolist(), b[by_length].tolist()):
+        if degree[u] < 2 and degree[v] < 2:
+            ru, rv = root(u), root(v)
+            if ru != rv:
+                parent[ru] = rv
+                degree[u] += 1
+                degree[v] += 1
+                links[u].append(v)
+                links[v].append(u)
+
+    # Walk the fragments; from the end of each one jump to the nearest free end
+    free = np.array([c for c in range(n) if degree[c] < 2], dtype=np.int64)
+    open_end = np.ones(len(free), dtype=bool)
+    slot = {c: i for i, c in enumerate(free.tolist())}
+    order = []
+    current = int(free[0])
+    while True:
+        open_end[slot[current]] = False
+        previous = -1
+        while True:  # to the other end of this fragment
+            order.append(current)
+            step = [c for c in links[current] if c != previous]
+            if not step:
+                break
+            previous, current = current, step[0]
+        open_end[slot[current]] = False
+        rest = np.flatnonzero(open_end)
+        if not len(rest):
+            break
+        diff = coordinates[free[rest]] - coordinates[current]
+        current = int(free[rest[np.argmin((diff * diff).sum(axis=1))]])
+    return np.array(order, dtype=np.int64)
+
+
+class LocalSearch:
+
+    """ 2-opt / Or-opt / LK-step local search with candidate lists and don't-look bits """
+
+    def __init__(self, coordinates=None, matrix=None, order=None, k=8, neighbours=None):
+        if coordinates is None and matrix is None:
+            raise ValueError("Need coordinates or a distance matrix")
+        if coordinates is not None:
+            coordinates = np.asarray(coordinates, dtype=np.float64)
+            xs, ys = coordinates[:, 0].tolist(), coordinates[:, 1].tolist()
+            hypot = math.hypot
+
+            def dist(a, b):
+                return hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+            n = len(coordinates)
+        else:
+            rows = matrix
+
+            def dist(a, b):
+                return float(rows[a, b])
+
+            n = len(matrix)
+        self.dist = dist
+        self.n = n
+        self.coordinates = coordinates
+        self.matrix = None if coordinates is not None else matrix
+        if neighbours is None:
+            neighbours = neighbour_lists(coordinates, matrix, k)
+        self.neighbours = [row.tolist() for row in np.asarray(neighbours)]
+        if order is None:
+            order = greedy_edge_tour(coordinates, np.asarray(neighbours)) if coordinates is not None \
+                else np.arange(n)
+        self.order = np.array(order, dtype=np.int64)
+        self.position = np.empty(n, dtype=np.int64)
+        self.position[self.order] = np.arange(n)
+        self.moves = {"2opt": 0, "oropt": 0, "lk": 0}
+        self.gain = 0.0  # total shortening by the moves applied so far
+
+    # -- tour primitives -------------------------------------------------------
+
+    def succ(self, city):
+        return int(self.order[(self.position[city] + 1) % self.n])
+
+    def pred(self, city):
+        return int(self.order[self.position[city] - 1])
+
+    def length(self):
+        """ length of the closed tour, measured from scratch in one vectorized pass """
+        order = self.order
+        following = np.roll(order, -1)
+        if self.coordinates is not None:
+            diff = self.coordinates[order] - self.coordinates[following]
+            return float(np.hypot(diff[:, 0], diff[:, 1]).sum())
+        return float(np.asarray(self.matrix[order, following], dtype=np.float64).sum())
+
+    def _reverse_path(self, first, last):
+        """ reverse the tour path first..last (forward direction), or the rest of
+            the cycle if that is shorter: both give the same undirected tour """
+        n, order, position = self.n, self.order, self.position
+        i, j = int(position[first]), int(position[last])
+        size = (j - i) % n + 1
+        if 2 * size > n:
+            i, size = (j + 1) % n, n - size
+        if size < 2:
+            return
+        idx = np.arange(i, i + size)
+        if i + size > n:
+            idx %= n
+        cities = order[idx][::-1]
+        order[idx] = cities
+        position[cities] = idx
+
+    def _move(self, a, b, c, d):
+        """ 2-opt: remove edges (a, b) and (c, d), add (a, c) and (b, d).
+            b and d must both follow (or both precede) a and c in the tour """
+        if self.succ(a) == b:
+            self._reverse_path(b, c)
+        else:
+            self._reverse_path(a, d)
+
+    # -- move search -------------------------------------------------------------
+
+    def _directions(self):
+        return ((self.succ, self.pred), (self.pred, self.succ))
+
+    def _try_two_opt(self, a):
+        dist = self.dist
+        for nxt, _ in self._directions():
+            b = nxt(a)
+            g1 = dist(a, b)
+            for c in self.neighbours[a]:
+                d_ac = dist(a, c)
+                if d_ac >= g1:
+                    break
+                d = nxt(c)
+                if c == b or d == a:
+                    continue
+                delta = d_ac + dist(b, d) - g1 - dist(c, d)
+                if delta < -EPSILON:
+                    self._move(a, b, c, d)
+                    self.moves["2opt"] += 1
+                    self.gain -= delta
+                    return (a, b, c, d)
+        return None
+
+    def _try_or_opt(self, s1):
+        dist = self.dist
+        for nxt, prv in self._directions():
+            p = prv(s1)
+            segment = [s1]
+            s2 = s1
+            for length in range(1, 4):
+                if length > 1:
+                    s2 = nxt(s2)
+                    segment.append(s2)
+                nx = nxt(s2)
+                if nx == p or s2 == p or self.n - length < 3:
+                    break
+                g1 = dist(p, s1) + dist(s2, nx) - dist(p, nx)
+                if g1 <= EPSILON:
+                    continue
+                inside = set(segment)
+                for end, other in ((s1, s2), (s2, s1)):
+                    for c in self.neighbours[end]:
+                        d_end = dist(end, c)
+                        if d_end >= g1:
+                            break
+                        if c in inside:
+                            continue
+                        for x, y in ((c, nxt(c)), (prv(c), c)):
+                            if x in inside or y in inside or y == p:
+                                continue
+                            if c == x:
+                                first, added = end, d_end + dist(other, y)
+                            else:
+                                first, added = other, dist(x, other) + d_end
+                            delta = added - dist(x, y) - g1
+                            if delta < -EPSILON:
+                                # x s2..s1 y after two reversals, x s1..s2 y after three
+                                self._move(p, s1, x, y)
+                                self._move(p, x, nx, s2)
+                                if first == s1:
+                                    self._move(x, s2, s1, y)
+                                self.moves["oropt"] += 1
+                                self.gain -= delta
+                                return (p, s1, s2, nx, x, y)
+        return None
+
+    def _oriented(self, a, b):
+        """ (nxt, prv) for the tour direction in which b follows a """
+        return (self.succ, self.pred) if self.succ(a) == b else (self.pred, self.succ)
+
+    def _try_lk(self, t1, breadth=5):
+        dist = self.dist
+        for t2 in (self.succ(t1), self.pred(t1)):
+            d12 = dist(t1, t2)
+            tried = 0
+            for t3 in self.neighbours[t2]:
+                g1 = d12 - dist(t2, t3)
+                if g1 <= EPSILON or tried >= breadth:
+                    break
+                # an undone tentative exchange may have reversed the rest of the cycle
+                # instead of the segment, so the direction of t1 -> t2 is read again
+                nxt, prv = self._oriented(t1, t2)
+                t4 = prv(t3)
+                if t3 in (t1, nxt(t2)) or t4 in (t1, t2):
+                    continue
+                tried += 1
+                g1 += dist(t4, t3)
+                # first exchange: (t1, t2), (t4, t3) -> (t1, t4), (t2, t3)
+                self._move(t1, t2, t4, t3)
+                if g1 - dist(t4, t1) > EPSILON:
+                    self.moves["2opt"] += 1  # improves on its own
+                    self.gain += g1 - dist(t4, t1)
+                    return (t1, t2, t3, t4)
+                step = self._lk_close(t1, t4, g1, breadth)
+                if step is not None:
+                    self.moves["lk"] += 1
+                    return (t1, t2, t3, t4) + step
+                self._move(t1, t4, t2, t3)  # undo
+        return None
+
+    def _lk_close(self, t1, t4, gain, breadth):
+        """ second level: break (t1, t4), which the first exchange created """
+        dist = self.dist
+        nxt, prv = self._oriented(t1, t4)
+        tried = 0
+        for t5 in self.neighbours[t4]:
+            g2 = gain - dist(t4, t5)  # (t1, t4) is broken again, (t4, t5) added
+            if g2 <= EPSILON or tried >= breadth:
+                break
+            t6 = prv(t5)
+            if t5 in (t1, nxt(t4)) or t6 in (t1, t4):
+                continue
+            tried += 1
+            if g2 + dist(t6, t5) - dist(t6, t1) > EPSILON:
+                self._move(t1, t4, t6, t5)
+                self.gain += g2 + dist(t6, t5) - dist(t6, t1)
+                return (t5, t6)
+        return None
+
+    # -- driver ------------------------------------------------------------------
+
+    def optimize(self, moves=("2opt", "oropt", "lk"), time_limit=None, stop=None):
+        """ run the enabled moves from every active city until none improves (a local
+            optimum) or 'time_limit' seconds pass; returns the tour length.
+            Every 256 cities the length is measured again (a RuntimeError reports moves
+            whose claimed gain did not shorten the tour, which would otherwise loop
+            forever), and 'stop(length, steps)' is asked with that length and the number
+            of cities looked at so far, ending the search by returning True """
+        tries = [{"2opt": self._try_two_opt, "oropt": self._try_or_opt, "lk": self._try_lk}[m] for m in moves]
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        checked_length, checked_gain = self.length(), self.gain
+        queue = deque(self.order.tolist())
+        active = [True] * self.n
+        steps = 0
+        while queue:
+            city = queue.popleft()
+            active[city] = False
+            for attempt in tries:
+                touched = attempt(city)
+                if touched is not None:
+                    for t in touched:
+                        if not active[t]:
+                            active[t] = True
+                            queue.append(t)
+                    break
+            steps += 1
+            if steps % 256 == 0:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                length = self.length()
+                if self.gain > checked_gain + EPSILON and length >= checked_length:
+                    raise RuntimeError("moves claimed a gain of {} but the tour went from {} to {}".format(
+                        self.gain - checked_gain, checked_length, length))
+                checked_length, checked_gain = length, self.gain
+                if stop is not None and stop(length, steps):
+                    break
+        return self.length()
+
+
+def solve(coordinates=None, matrix=None, order=None, k=8, moves=("2opt", "oropt", "lk"), time_limit=None):
+    """ greedy-edge start (unless 'order' is given) improved to a local optimum;
+        returns (order array, length) """
+    search = LocalSearch(coordinates, matrix, order, k)
+    length = search.optimize(moves, time_limit)
+    return search.order.copy(), length
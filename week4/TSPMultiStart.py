@@ -0,0 +1,229 @@
+"""
+Parallel multi-start driver for the TSP local search.
+
+Every restart builds its own start tour from an independent seed (nearest
+neighbour from a random city on coordinate instances, a random permutation on
+matrix instances) and improves it with TSPLocalSearch.LocalSearch.  Restarts
+run on a process pool; the instance is put once into shared memory, so every
+worker reads the same coordinates, distance matrix and neighbour lists instead
+of a private copy.
+
+The best tour length found so far lives in a shared multiprocessing.Value.
+Workers read it while they search and
+
+  * stop as soon as it reaches the caller's target length or the wall-clock
+    budget runs out;
+  * prune a restart that is still more than 'prune' (a fraction) above it after
+    every city has been looked at once: that run is unlikely to end below it.
+
+The driver returns the best tour with a convergence log: one entry per new
+best tour, with the time since the start.  A checkpoint (TSPLib.Checkpoint)
+saves the best tour while the run goes on, and a saved tour passed back as
+'order' is the start of the first restart, so a long run can be resumed.
+"""
+
+import math
+import multiprocessing
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import TSPLocalSearch
+
+INF = float("inf")
+
+Improvement = namedtuple("Improvement", "elapsed restart length")
+Restart = namedtuple("Restart", "restart seed length elapsed pruned")
+MultiStartResult = namedtuple("MultiStartResult", "order length log restarts")
+
+
+def restart_seeds(seed, restarts):
+    """ independent integer seeds for 'restarts' runs, derived from one root seed """
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(restarts)]
+
+
+def _shared_array(ctx, array, typecode):
+    """ copy 'array' into an unlocked shared-memory buffer; returns (buffer, shape) """
+    array = np.ascontiguousarray(array)
+    buffer = ctx.RawArray(typecode, array.size)
+    np.frombuffer(buffer, dtype=array.dtype).reshape(array.shape)[...] = array
+    return buffer, array.shape
+
+
+def _view(shared, dtype):
+    if not isinstance(shared, tuple):
+        return shared  # None, or a matrix that computes its entries on demand
+    buffer, shape = shared
+    return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+
+# (coordinates, matrix, neighbours, best, settings) installed in every worker by _init_worker
+_worker_state = None
+
+
+def _init_worker(coordinates, matrix, neighbours, best, settings):
+    global _worker_state
+    _worker_state = (
+        _view(coordinates, np.float64),
+        _view(matrix, np.float64),
+        _view(neighbours, np.int64),
+        best,
+        settings,
+    )
+
+
+def _run_restart_task(task):
+    return run_restart(*_worker_state, *task)
+
+
+def run_restart(coordinates, matrix, neighbours, best, settings, restart, seed, order=None):
+    """
+    One restart: a seeded start tour (or 'order') improved by the local search.
+
+    Returns:
+        (restart, seed, length, order or None, finished, pruned); the order is only
+        sent back when it improved the shared best length.  A restart that found
+        the budget already used up returns length inf.
+    """
+    began = settings["began"]
+    deadline, target, prune = settings["deadline"], settings["target"], settings["prune"]
+    if (deadline is not None and time.time() >= deadline) or (target is not None and best.value <= target):
+        return restart, seed, INF, None, time.time() - began, False
+
+    rng = np.random.default_rng(seed)
+    n = len(neighbours)
+    if order is None and coordinates is not None:
+        order = TSPLocalSearch.nearest_neighbour_tour(coordinates, neighbours, start=int(rng.integers(n)))
+    elif order is None:
+        order = rng.permutation(n)
+    search = TSPLocalSearch.LocalSearch(coordinates, matrix, order, neighbours=neighbours)
+    pruned = []
+
+    def stop(length, steps):
+        if deadline is not None and time.time() >= deadline:
+            return True
+        shared = best.value
+        if target is not None and shared <= target:
+            return True
+        if prune is not None and steps >= n and length > shared * (1 + prune):
+            pruned.append(steps)
+            return True
+        return False
+
+    search.optimize(settings["moves"], stop=stop)
+    length = search.length()  # measured from the tour itself, not from the gains of the moves
+    with best.get_lock():
+        improved = length < best.value
+        if improved:
+            best.value = length
+    return restart, seed, length, search.order if improved else None, time.time() - began, bool(pruned)
+
+
+def multi_start(
+    coordinates=None,
+    matrix=None,
+    restarts=16,
+    workers=None,
+    time_budget=None,
+    target=None,
+    prune=None,
+    k=8,
+    moves=("2opt", "oropt", "lk"),
+    seed=None,
+    order=None,
+    checkpoint=None,
+):
+    """
+    Best of many independently seeded local-search restarts.
+
+    Args:
+        coordinates: (n, 2) city positions, or None with an explicit 'matrix'.
+        matrix: (n, n) distance matrix (used when no coordinates are given), or an
+            object computing its entries on demand, such as TSPLib.DistanceRows.
+        restarts: number of restarts.
+        workers: processes (None = one per CPU, 1 = run in this process).
+        time_budget: wall-clock seconds for the whole run (None = no limit); restarts
+            in progress stop at the deadline and the ones not begun are skipped.
+        target: length at which every worker stops (e.g. a known optimum).
+        prune: give up a restart still this fraction above the best length after its
+            first pass over all cities (None = never prune).
+        k: neighbour-list size.
+        moves: move types for LocalSearch.optimize.
+        seed: root seed; restart i uses the i-th child of numpy's SeedSequence(seed).
+        order: start tour of the first restart, e.g. a checkpoint being resumed.
+        checkpoint: object with update(order, length) and save(order, length), such
+            as TSPLib.Checkpoint; update() is called on every new best tour, save()
+            once at the end.
+
+    Returns:
+        MultiStartResult(order, length, log, restarts) with 'log' the convergence
+        log of Improvement(elapsed, restart, length) entries and 'restarts' a list of
+        Restart(restart, seed, length, elapsed, pruned), both in completion order.
+    """
+    if coordinates is None and matrix is None:
+        raise ValueError("Need coordinates or a distance matrix")
+    began = time.time()
+    if coordinates is not None:
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        matrix = None
+    elif isinstance(matrix, np.ndarray) or not hasattr(matrix, "shape"):
+        matrix = np.asarray(matrix, dtype=np.float64)
+    neighbours = TSPLocalSearch.neighbour_lists(coordinates, matrix, k)
+    settings = {
+        "began": began,
+        "deadline": None if time_budget is None else began + time_budget,
+        "target": target,
+        "prune": prune,
+        "moves": tuple(moves),
+    }
+    tasks = [(restart, restart_seed, None) for restart, restart_seed in enumerate(restart_seeds(seed, restarts))]
+    if order is not None and tasks:
+        tasks[0] = tasks[0][:2] + (np.asarray(order, dtype=np.int64),)
+    workers = workers or multiprocessing.cpu_count()
+
+    best_order, best_length, log, finished = None, INF, [], []
+
+    def record(result):
+        # Results arrive in completion order, which need not be the order in which the
+        # workers improved the shared best, so keep the tour and its length as one pair
+        nonlocal best_order, best_length
+        restart, restart_seed, length, order, elapsed, pruned = result
+        finished.append(Restart(restart, restart_seed, length, elapsed, pruned))
+        if order is not None and length < best_length:
+            best_order, best_length = order, length
+            log.append(Improvement(elapsed, restart, length))
+            if checkpoint is not None:
+                checkpoint.update(order, length)
+
+    if workers <= 1:
+        best = multiprocessing.Value("d", INF)
+        for task in tasks:
+            record(run_restart(coordinates, matrix, neighbours, best, settings, *task))
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        best = ctx.Value("d", INF)
+        shared = (
+            None if coordinates is None else _shared_array(ctx, coordinates, "d"),
+            _shared_array(ctx, matrix, "d") if isinstance(matrix, np.ndarray) else matrix,
+            _shared_array(ctx, neighbours.astype(np.int64), "q"),
+        )
+        with ctx.Pool(workers, initializer=_init_worker, initargs=shared + (best, settings)) as pool:
+            for result in pool.imap_unordered(_run_restart_task, tasks):
+                record(result)
+
+    if best_order is None:
+        return MultiStartResult(None, INF, log, finished)
+    if checkpoint is not None:
+        checkpoint.save(best_order, best_length)
+    return MultiStartResult(np.asarray(best_order), best_length, log, finished)
+
+
+def print_log(result, file=None):
+    """ print the convergence log of a multi_start result """
+    for entry in result.log:
+        print("{:8.2f}s  restart {:3d}  length {:.2f}".format(entry.elapsed, entry.restart, entry.length), file=file)
+    pruned = sum(1 for r in result.restarts if r.pruned)
+    skipped = sum(1 for r in result.restarts if math.isinf(r.length))
+    print("{} restarts, {} pruned, {} skipped".format(len(result.restarts), pruned, skipped), file=file)
@@ -1,6 +1,9 @@
 from search import *
 import numpy as np
 
+import TSPLocalSearch
+import TSPTour
+
 distances = {}
 all_cities = []
 
@@ -81,17 +84,29 @@ def main():
     print(all_cities)
     print()
 
-    for name_1, coordinates_1 in romania_map.locations.items():
-            for name_2, coordinates_2 in romania_map.locations.items():
-                distances[name_1][name_2] = np.linalg.norm(
-                    [coordinates_1[0] - coordinates_2[0], coordinates_1[1] - coordinates_2[1]])
-                distances[name_2][name_1] = np.linalg.norm(
-                    [coordinates_1[0] - coordinates_2[0], coordinates_1[1] - coordinates_2[1]])
+    # all pairwise straight-line distances in one vectorized broadcast
+    names = list(romania_map.locations.keys())
+    matrix = TSPTour.euclidean_matrix([romania_map.locations[name] for name in names])
+    for i, name_1 in enumerate(names):
+        distances[name_1] = dict(zip(names, matrix[i].tolist()))
 
     tsp = TSP_problem(all_cities)
 
     print("One shortest possible route that visits each city exactly once and returns to the origin city:")
     print(hill_climbing(tsp))
+    print()
+
+    # the same search on the array engine: the tour is an index array over the matrix
+    # (rows in all_cities order) and every 2-opt candidate is scored as an O(1) edge delta
+    order = [names.index(city) for city in all_cities]
+    tour = TSPTour.hill_climbing(matrix[np.ix_(order, order)])
+    print("The same search on the array-based tour engine (length {:.1f}):".format(tour.length))
+    print(tour.cities(all_cities))
+
+    # neighbour-list 2-opt / Or-opt / LK-step search from TSPLocalSearch
+    order, length = TSPLocalSearch.solve(matrix=tour.matrix)
+    print("Local search with candidate lists (length {:.1f}):".format(length))
+    print([all_cities[k] for k in order])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Array-based tour engine for the Traveling Salesman Problem.
+
+A tour is an index array over a dense NumPy distance matrix (city i is row i)
+together with its inverse, the position of every city in the tour.  A 2-opt
+move reverses the segment order[i..j]; on a closed tour only two edges change,
+
+    (a, b) and (c, d)   become   (a, c) and (b, d)
+    with a = order[i - 1], b = order[i], c = order[j], d = order[j + 1],
+
+so its effect on the length is the O(1) edge delta
+
+    dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+
+and a candidate move is scored without building or re-measuring the reversed
+tour.  Many candidates are scored at once by evaluating the same formula on
+index arrays.
+"""
+
+import numpy as np
+
+
+def euclidean_matrix(coordinates):
+    """ straight-line distance between every pair of (x, y) points as an (n, n) array """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    diff = coordinates[:, None, :] - coordinates[None, :, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+distance_matrix = euclidean_matrix
+
+
+class Tour:
+
+    """ Closed tour stored as an index array, with O(1) 2-opt deltas """
+
+    def __init__(self, matrix, order=None):
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        n = len(self.matrix)
+        if self.matrix.shape != (n, n):
+            raise ValueError("Distance matrix must be square")
+        self.order = np.arange(n, dtype=np.int64) if order is None else np.array(order, dtype=np.int64)
+        if len(self.order) != n or not np.array_equal(np.sort(self.order), np.arange(n)):
+            raise ValueError("Tour must visit every city exactly once")
+        self.position = np.empty(n, dtype=np.int64)
+        self.position[self.order] = np.arange(n)
+        self.length = self.tour_length()
+
+    def __len__(self):
+        return len(self.order)
+
+    def tour_length(self, order=None):
+        """ length of the closed tour 'order' (default: this tour), in one vectorized pass """
+        order = self.order if order is None else np.asarray(order)
+        return float(self.matrix[order, np.roll(order, -1)].sum())
+
+    def recompute(self):
+        """ re-measure the length from scratch, discarding rounding drift of the deltas """
+        self.length = self.tour_length()
+        return self.length
+
+    def two_opt_delta(self, i, j):
+        """ change in length if order[i..j] (0 <= i <= j < n) were reversed """
+        n = len(self.order)
+        if j - i + 1 >= n - 1:
+            return 0.0  # reversing all (or all but one) cities gives the same cycle
+        order, dist = self.order, self.matrix
+        a, b, c, d = order[i - 1], order[i], order[j], order[(j + 1) % n]
+        return dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+
+    def two_opt_deltas(self, i, j):
+        """ two_opt_delta for index arrays i, j (element-wise, i <= j) """
+        n = len(self.order)
+        order, dist = self.order, self.matrix
+        a, b, c, d = order[i - 1], order[i], order[j], order[(j + 1) % n]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        return np.where(j - i + 1 >= n - 1, 0.0, delta)
+
+    def reverse(self, i, j, delta=None):
+        """ apply the 2-opt move reversing order[i..j] and update the length """
+        if delta is None:
+            delta = self.two_opt_delta(i, j)
+        n = len(self.order)
+        if j - i + 1 > n // 2:
+            # Reversing the complementary segment yields the same cycle with fewer writes
+            idx = np.arange(j + 1, i + n) % n
+        else:
+            idx = np.arange(i, j + 1)
+        cities = self.order[idx][::-1]
+        self.order[idx] = cities
+        self.position[cities] = idx
+        self.length += delta
+
+    def cities(self, names):
+        """ the tour as a list of city names """
+        return [names[k] for k in self.order]
+
+
+def hill_climbing(matrix, order=None, iterations=10000, neighbours=100, rng=None):
+    """ 2-opt hill climbing on a Tour: every iteration scores 'neighbours' random
+        reversals of the current tour with the O(1) delta and applies the best one
+        if it shortens the tour """
+    rng = np.random.default_rng(rng)
+    tour = Tour(matrix, order)
+    n = len(tour)
+    if n < 4:
+        return tour
+    for _ in range(iterations):
+        ends = rng.integers(0, n, size=(neighbours, 2))
+        i, j = ends.min(axis=1), ends.max(axis=1)
+        deltas = tour.two_opt_deltas(i, j)
+        best = int(np.argmin(deltas))
+        if deltas[best] < -1e-12:
+            tour.reverse(int(i[best]), int(j[best]), float(deltas[best]))
+    tour.recompute()
+    return tour
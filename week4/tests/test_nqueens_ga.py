@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import NQueensGA
+from NQueensGA import crossover, fitness, genetic_algorithm, init_population, max_fitness, mutate
+
+
+def _non_attacking(q):
+    """ brute-force count of non-attacking pairs, as in EightQueen.fitness """
+    pairs = 0
+    for r1 in range(len(q)):
+        for r2 in range(r1 + 1, len(q)):
+            c1, c2 = int(q[r1]), int(q[r2])
+            if c1 != c2 and r1 - r2 != c1 - c2 and r1 - r2 != c2 - c1:
+                pairs += 1
+    return pairs
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 8, 13, 40])
+def test_fitness_matches_brute_force(n):
+    population = init_population(200, n, rng=n)
+    assert fitness(population).tolist() == [_non_attacking(q) for q in population]
+
+
+def test_fitness_is_the_same_in_small_blocks(monkeypatch):
+    population = init_population(300, 11, rng=0)
+    expected = fitness(population)
+    monkeypatch.setattr(NQueensGA, "CHUNK_ELEMENTS", 50)
+    assert np.array_equal(fitness(population), expected)
+
+
+def test_a_solution_has_maximum_fitness():
+    assert fitness(np.array([0, 4, 7, 5, 2, 6, 1, 3]))[0] == max_fitness(8) == 28
+
+
+def test_crossover_and_mutation_keep_valid_genes():
+    rng = np.random.default_rng(0)
+    mothers, fathers = init_population(50, 20, rng), init_population(50, 20, rng)
+    children = crossover(mothers, fathers, rng)
+    assert ((children == mothers) | (children == fathers)).all()
+    mutated = mutate(children.copy(), 1.0, rng)
+    assert ((mutated != children).sum(axis=1) <= 1).all()
+    assert mutated.max() < 20
+
+
+@pytest.mark.parametrize("selection", ["tournament", "roulette"])
+def test_genetic_algorithm_solves_eight_queens(selection):
+    result = genetic_algorithm(init_population(100, 8, rng=1), ngen=3000, selection=selection, rng=1)
+    assert result.fitness == 28 == _non_attacking(result.individual)
+    assert result.history == sorted(result.history)  # elitism keeps the best individual
+
+
+def test_genetic_algorithm_stops_at_the_threshold():
+    result = genetic_algorithm(init_population(100, 8, rng=1), f_thres=25, rng=1)
+    assert result.fitness >= 25
+    assert result.generations == len(result.history) - 1
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from TSPLocalSearch import LocalSearch, greedy_edge_tour, nearest_neighbour_tour, neighbour_lists
+from TSPTour import Tour, distance_matrix
+
+
+def _instance(seed, n, scale=100.0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 2)) * scale, rng.permutation(n)
+
+
+def _is_tour(order, n):
+    return sorted(order.tolist()) == list(range(n))
+
+
+def test_neighbour_lists_match_brute_force():
+    points, _ = _instance(0, 300)
+    matrix = distance_matrix(points)
+    np.fill_diagonal(matrix, np.inf)
+    expected = np.argsort(matrix, axis=1, kind="stable")[:, :6]
+    assert np.array_equal(neighbour_lists(points, k=6, chunk_elements=1000), expected)
+    assert np.array_equal(neighbour_lists(matrix=matrix, k=6), expected)
+
+
+@pytest.mark.parametrize("build", [nearest_neighbour_tour, greedy_edge_tour])
+def test_start_tours_visit_every_city(build):
+    points, _ = _instance(1, 500)
+    assert _is_tour(build(points, neighbour_lists(points, k=5)), 500)
+
+
+@pytest.mark.parametrize("move", ["_try_two_opt", "_try_or_opt", "_try_lk"])
+def test_every_move_shortens_the_tour_by_its_claimed_gain(move):
+    for seed in range(60):
+        points, order = _instance(seed, 12 + seed % 30)
+        matrix = distance_matrix(points)
+        search = LocalSearch(points, order=order, k=6)
+        for city in list(range(search.n)) * 3:
+            before, claimed = Tour(matrix, search.order).length, search.gain
+            touched = getattr(search, move)(city)
+            after = Tour(matrix, search.order).length  # also checks the tour is a permutation
+            if touched is None:
+                assert after == pytest.approx(before)
+            else:
+                assert after < before
+                assert before - after == pytest.approx(search.gain - claimed)
+            assert np.array_equal(search.position[search.order], np.arange(search.n))
+
+
+@pytest.mark.parametrize("moves", [("2opt",), ("oropt",), ("lk",), ("2opt", "oropt", "lk")])
+def test_optimize_terminates_on_small_instances(moves):
+    for seed in range(300):
+        rng = np.random.default_rng(seed)
+        n = int(rng.integers(4, 21))
+        points = rng.random((n, 2)) * 100
+        search = LocalSearch(points, order=rng.permutation(n), k=min(8, n - 1))
+        before = search.length()
+        steps = []
+        after = search.optimize(moves, stop=lambda length, looked_at: steps.append(looked_at) or looked_at > 20000)
+        assert not steps or steps[-1] <= 20000, "no local optimum after 20000 cities on n = {}".format(n)
+        assert _is_tour(search.order, n)
+        assert after <= before + 1e-9
+        assert before - after == pytest.approx(search.gain)
+
+
+def test_claimed_gain_is_real_on_200_cities():
+    points = np.random.default_rng(7).random((200, 2)) * 1000
+    search = LocalSearch(points)
+    before = search.length()
+    after = search.optimize()
+    assert before - after == pytest.approx(search.gain)
+    assert after == pytest.approx(Tour(distance_matrix(points), search.order).length)
+
+
+def test_optimize_reports_gains_the_tour_does_not_show(monkeypatch):
+    search = LocalSearch(np.random.default_rng(7).random((50, 2)) * 1000)
+
+    def phantom(city):
+        search.gain += 1.0  # claims an improvement without touching the tour
+        return [city]
+
+    monkeypatch.setattr(search, "_try_two_opt", phantom)
+    with pytest.raises(RuntimeError, match="claimed a gain"):
+        search.optimize(("2opt",))
+
+
+def test_matrix_and_coordinate_searches_agree_on_lengths():
+    points, order = _instance(3, 60)
+    matrix = distance_matrix(points)
+    search = LocalSearch(matrix=matrix, order=order, k=8)
+    length = search.optimize()
+    assert length == pytest.approx(Tour(matrix, search.order).length)
+    assert length < Tour(matrix, order).length
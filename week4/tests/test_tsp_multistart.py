@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+import TSPMultiStart
+from TSPMultiStart import multi_start, restart_seeds
+from TSPTour import Tour, distance_matrix
+
+
+@pytest.fixture
+def points():
+    return np.random.default_rng(5).random((120, 2)) * 1000
+
+
+def test_restart_seeds_are_reproducible_and_distinct():
+    assert restart_seeds(3, 8) == restart_seeds(3, 8)
+    assert len(set(restart_seeds(3, 8))) == 8
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_best_length_is_the_length_of_the_returned_tour(points, workers):
+    result = multi_start(points, restarts=6, workers=workers, seed=0)
+    assert sorted(result.order.tolist()) == list(range(120))
+    assert result.length == pytest.approx(Tour(distance_matrix(points), result.order).length)
+    assert result.length == min(r.length for r in result.restarts)
+    assert len(result.restarts) == 6
+    lengths = [entry.length for entry in result.log]
+    assert lengths == sorted(lengths, reverse=True) and lengths[-1] == result.length
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_same_seed_gives_the_same_tour(points, workers):
+    first = multi_start(points, restarts=4, workers=workers, seed=9)
+    second = multi_start(points, restarts=4, workers=1, seed=9)
+    assert first.length == pytest.approx(second.length)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reaching_the_target_skips_the_remaining_restarts(points, workers):
+    result = multi_start(points, restarts=12, workers=workers, seed=0, target=1e12)
+    skipped = [r for r in result.restarts if r.length == float("inf")]
+    assert result.order is not None
+    assert len(skipped) >= 12 - workers
+
+
+def test_matrix_instances_and_resumed_tours(points):
+    matrix = distance_matrix(points[:40])
+    start = np.arange(40)
+    result = multi_start(matrix=matrix, restarts=1, workers=1, seed=0, order=start)
+    assert result.length < Tour(matrix, start).length
+    assert result.length == pytest.approx(Tour(matrix, result.order).length)
+
+
+def test_checkpoint_receives_every_new_best_and_the_final_tour(points):
+    class Recorder:
+        def __init__(self):
+            self.updates, self.saved = [], None
+
+        def update(self, order, length):
+            self.updates.append(length)
+
+        def save(self, order, length):
+            self.saved = (np.array(order), length)
+
+    recorder = Recorder()
+    result = multi_start(points, restarts=4, workers=1, seed=0, checkpoint=recorder)
+    assert recorder.updates == [entry.length for entry in result.log]
+    assert np.array_equal(recorder.saved[0], result.order) and recorder.saved[1] == result.length
+
+
+def test_results_arriving_out_of_order_keep_the_best_tour(points, monkeypatch):
+    # Two workers both improve the shared best, but the better tour is reported first
+    results = iter([(0, 0, 10.0, np.arange(3), 1.0, False), (1, 1, 12.0, np.arange(3)[::-1], 2.0, False)])
+    monkeypatch.setattr(TSPMultiStart, "run_restart", lambda *args: next(results))
+    result = multi_start(points, restarts=2, workers=1, seed=0)
+    assert np.array_equal(result.order, np.arange(3)) and result.length == 10.0
+    assert [entry.length for entry in result.log] == [10.0]
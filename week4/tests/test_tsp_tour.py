@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from TSPTour import Tour, distance_matrix, hill_climbing
+
+
+@pytest.fixture
+def matrix():
+    return distance_matrix(np.random.default_rng(0).random((30, 2)) * 100)
+
+
+def test_two_opt_delta_matches_recomputed_length(matrix):
+    tour = Tour(matrix, np.random.default_rng(1).permutation(30))
+    for i in range(30):
+        for j in range(i, 30):
+            reversed_order = tour.order.copy()
+            reversed_order[i:j + 1] = reversed_order[i:j + 1][::-1]
+            expected = tour.tour_length(reversed_order) - tour.length
+            assert tour.two_opt_delta(i, j) == pytest.approx(expected, abs=1e-9)
+
+
+def test_batched_deltas_match_single_deltas(matrix):
+    tour = Tour(matrix)
+    i, j = np.triu_indices(30)
+    single = [tour.two_opt_delta(a, b) for a, b in zip(i, j)]
+    assert np.allclose(tour.two_opt_deltas(i, j), single)
+
+
+def test_reverse_keeps_length_and_positions_in_step(matrix):
+    rng = np.random.default_rng(2)
+    tour = Tour(matrix)
+    for _ in range(200):
+        i, j = sorted(rng.integers(0, 30, size=2))
+        tour.reverse(int(i), int(j))
+        assert np.array_equal(tour.position[tour.order], np.arange(30))
+        assert tour.length == pytest.approx(tour.tour_length())
+
+
+def test_tour_rejects_a_non_permutation(matrix):
+    with pytest.raises(ValueError):
+        Tour(matrix, [0] * 30)
+
+
+def test_hill_climbing_never_lengthens_the_tour(matrix):
+    start = np.random.default_rng(3).permutation(30)
+    tour = hill_climbing(matrix, start, iterations=500, rng=0)
+    assert sorted(tour.order.tolist()) == list(range(30))
+    assert tour.length <= Tour(matrix, start).length
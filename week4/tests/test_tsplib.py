@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from TSPLib import Checkpoint, DistanceRows, compare_to_optimal, read_tour, read_tsp, write_tour
+from TSPMultiStart import multi_start
+
+BURMA14 = """NAME: burma14
+TYPE: TSP
+DIMENSION: 14
+EDGE_WEIGHT_TYPE: GEO
+NODE_COORD_SECTION
+1 16.47 96.10
+2 16.47 94.44
+3 20.09 92.54
+4 22.39 93.37
+5 25.23 97.24
+6 22.00 96.05
+7 20.47 97.02
+8 17.20 96.29
+9 16.30 97.38
+10 14.05 98.12
+11 16.53 97.38
+12 21.52 95.59
+13 19.41 97.13
+14 20.09 94.55
+EOF
+"""
+
+
+def _rows(matrix, weight_format):
+    n = len(matrix)
+    spans = {
+        "FULL_MATRIX": lambda i: matrix[i, :],
+        "UPPER_ROW": lambda i: matrix[i, i + 1:],
+        "LOWER_ROW": lambda i: matrix[i, :i],
+        "UPPER_DIAG_ROW": lambda i: matrix[i, i:],
+        "LOWER_DIAG_ROW": lambda i: matrix[i, :i + 1],
+        "UPPER_COL": lambda i: matrix[:i, i],
+        "LOWER_DIAG_COL": lambda i: matrix[i:, i],
+    }
+    return np.concatenate([spans[weight_format](i) for i in range(n)]).astype(int).tolist()
+
+
+@pytest.fixture
+def matrix():
+    m = np.triu(np.random.default_rng(0).integers(1, 100, (17, 17)), 1).astype(float)
+    return m + m.T
+
+
+def test_geo_lengths_match_the_published_optimum(tmp_path):
+    path = tmp_path / "burma14.tsp"
+    path.write_text(BURMA14)
+    instance = read_tsp(str(path))
+    assert instance.edge_weight_type == "GEO" and len(instance) == 14
+    # the optimal burma14 tour has length 3323
+    optimal = np.array([1, 2, 14, 3, 4, 5, 6, 12, 7, 13, 8, 11, 9, 10]) - 1
+    assert instance.tour_length(optimal) == 3323
+
+
+@pytest.mark.parametrize(
+    "weight_format",
+    ["FULL_MATRIX", "UPPER_ROW", "LOWER_ROW", "UPPER_DIAG_ROW", "LOWER_DIAG_ROW", "UPPER_COL", "LOWER_DIAG_COL"],
+)
+def test_explicit_matrix_is_streamed_into_a_memory_map(tmp_path, matrix, weight_format):
+    values = _rows(matrix, weight_format)
+    text = "\n".join(" ".join(map(str, values[i:i + 7])) for i in range(0, len(values), 7))
+    path = tmp_path / "x.tsp"
+    path.write_text(
+        "NAME: x\nDIMENSION: 17\nEDGE_WEIGHT_TYPE: EXPLICIT\nEDGE_WEIGHT_FORMAT: {}\n"
+        "EDGE_WEIGHT_SECTION\n{}\nEOF\n".format(weight_format, text)
+    )
+    instance = read_tsp(str(path))
+    assert isinstance(instance.matrix, np.memmap)
+    assert np.array_equal(instance.matrix, matrix)
+    assert np.array_equal(read_tsp(str(path)).matrix, matrix)  # reuses the .npy file
+
+
+def test_coordinates_and_tours_round_trip(tmp_path):
+    points = np.random.default_rng(1).random((50, 2)) * 1000
+    path = tmp_path / "r50.tsp"
+    path.write_text(
+        "NAME : r50\nDIMENSION : 50\nEDGE_WEIGHT_TYPE : EUC_2D\nNODE_COORD_SECTION\n"
+        + "".join("{} {!r} {!r}\n".format(i + 1, x, y) for i, (x, y) in enumerate(points.tolist()))
+        + "EOF\n"
+    )
+    instance = read_tsp(str(path))
+    assert np.array_equal(instance.coordinates, points)
+
+    order = np.random.default_rng(2).permutation(50)
+    write_tour(str(tmp_path / "r50.tour"), order, "r50")
+    again = read_tour(str(tmp_path / "r50.tour"))
+    assert np.array_equal(again, order)
+    write_tour(str(tmp_path / "copy.tour"), again, "r50")
+    assert (tmp_path / "copy.tour").read_text() == (tmp_path / "r50.tour").read_text()
+
+    gap = compare_to_optimal(instance, order, str(tmp_path / "r50.tour"))
+    assert gap.gap == 0 and gap.length == instance.tour_length(order)
+
+
+def test_checkpoint_saves_at_the_interval_and_loads_back(tmp_path):
+    now = [0.0]
+    checkpoint = Checkpoint(str(tmp_path / "best.tour"), interval=10, clock=lambda: now[0])
+    assert checkpoint.load() is None
+    checkpoint.update(np.arange(5), 12.5)
+    assert checkpoint.load() is None  # not yet due
+    now[0] = 11.0
+    checkpoint.update(np.array([4, 3, 2, 1, 0]), 11.0)
+    order, length = checkpoint.load()
+    assert order.tolist() == [4, 3, 2, 1, 0] and length == 11.0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_geo_instances_are_searched_without_a_dense_matrix(tmp_path, workers):
+    path = tmp_path / "burma14.tsp"
+    path.write_text(BURMA14)
+    instance = read_tsp(str(path))
+    rows = instance.search_input()["matrix"]
+    assert isinstance(rows, DistanceRows)
+    dense = instance.distance_matrix()
+    assert np.array_equal(rows[2:5], dense[2:5]) and np.array_equal(rows[3], dense[3])
+    assert rows[4, 7] == dense[4, 7]
+    result = multi_start(restarts=4, workers=workers, seed=0, **instance.search_input())
+    assert result.length == instance.tour_length(result.order) == 3323
+
+
+def test_checkpoint_saves_the_tsplib_length_of_the_instance(tmp_path):
+    path = tmp_path / "burma14.tsp"
+    path.write_text(BURMA14)
+    instance = read_tsp(str(path))
+    checkpoint = Checkpoint(str(tmp_path / "best.tour"), instance=instance)
+    order = np.arange(14)
+    checkpoint.save(order, 1.5)  # e.g. a length the search measured on another scale
+    assert checkpoint.load()[1] == instance.tour_length(order)